@@ -6,7 +6,6 @@ import 'package:image_picker/image_picker.dart';
 import 'package:http/http.dart' as http;
 import 'package:open_file/open_file.dart';
 import 'wallet_month_db_helper.dart';
-import '../api_client.dart';
 
 enum ActivePopup {
   none,
@@ -212,6 +211,7 @@ class WalletMonthScreenState extends State<WalletMonthScreen> {
             description: e['description'] ?? '',
             date: e['receiptdate'] ?? '',
             imagePath: e['fileurl'] ?? '',
+            thumbUrl: e['thumburl'] ?? '',
           )).toList();
         });
       }
@@ -1173,7 +1173,7 @@ class WalletMonthScreenState extends State<WalletMonthScreen> {
                                       );
                                       
                                       final url = await WalletMonthDbHelper.getArchiveDownloadUrl(a.id);
-                                      final response = await http.get(Uri.parse(url), headers: ApiClient.getHeaders());
+                                      final response = await WalletMonthDbHelper.fetchReportFile(url);
                                       
                                       if (response.statusCode == 200) {
                                         final dir = Directory('/storage/emulated/0/Download');
@@ -1902,7 +1902,7 @@ class WalletMonthScreenState extends State<WalletMonthScreen> {
                                         );
                                         
                                         final url = await WalletMonthDbHelper.getPreviewUrl(widget.folderId);
-                                        final response = await http.get(Uri.parse(url), headers: ApiClient.getHeaders());
+                                        final response = await WalletMonthDbHelper.fetchReportFile(url);
                                         
                                         if (response.statusCode == 200) {
                                           final dir = Directory('/storage/emulated/0/Download');
@@ -2386,12 +2386,15 @@ class ReceiptItem {
   final String description;
   final String date;
   final String imagePath;
+  // Public URL ng maliit na thumbnail (empty kung wala pa)
+  final String thumbUrl;
 
   ReceiptItem({
     required this.id,
     required this.description,
     required this.date,
     required this.imagePath,
+    this.thumbUrl = '',
   });
 }
 
@@ -2410,6 +2413,30 @@ class ReceiptCard extends StatelessWidget {
     required this.onDelete,
   });
 
+  Widget _placeholderIcon() {
+    return Image.asset(
+      'assets/Icons/receipts.png',
+      width: 50,
+      height: 50,
+      fit: BoxFit.contain,
+    );
+  }
+
+  Widget _thumbnail() {
+    if (item.thumbUrl.isEmpty) return _placeholderIcon();
+    return ClipRRect(
+      borderRadius: BorderRadius.circular(6),
+      child: Image.network(
+        item.thumbUrl,
+        width: 50,
+        height: 50,
+        fit: BoxFit.cover,
+        cacheWidth: 150,
+        errorBuilder: (context, error, stackTrace) => _placeholderIcon(),
+      ),
+    );
+  }
+
   @override
   Widget build(BuildContext context) {
     return Container(
@@ -2428,12 +2455,7 @@ class ReceiptCard extends StatelessWidget {
         children: [
           Column(
             children: [
-              Image.asset(
-                'assets/Icons/receipts.png',
-                width: 50,
-                height: 50,
-                fit: BoxFit.contain,
-              ),
+              _thumbnail(),
               const SizedBox(height: 12),
               Text(
                 item.description,
@@ -1,3 +1,4 @@
+import 'dart:async';
 import 'dart:io';
 import 'dart:convert';
 import 'package:http/http.dart' as http;
@@ -23,7 +24,7 @@ class WalletMonthDbHelper {
       'income_type': data['income_type'],
       'description': data['description'],
       'price': data['price'],
-    });
+    }, idempotent: true);
   }
 
   static Future<void> saveExpense(int folderId, Map<String, dynamic> data) async {
@@ -35,7 +36,7 @@ class WalletMonthDbHelper {
       'particulars': data['particulars'],
       'description': data['description'],
       'price': data['price'],
-    });
+    }, idempotent: true);
   }
 
   static Future<List<Map<String, dynamic>>> loadReceipts(int folderId) async {
@@ -162,7 +163,7 @@ class WalletMonthDbHelper {
   static Future<void> submitReport(int folderId) async {
     final apiClient = ApiClient();
     final walletId = await _getWalletId(folderId);
-    await apiClient.postJson('/pres/reports/$walletId/submit', {});
+    await apiClient.postJson('/pres/reports/$walletId/submit', {}, idempotent: true);
   }
 
   static Future<Map<String, dynamic>?> checkReportStatus(int folderId) async {
@@ -200,4 +201,30 @@ class WalletMonthDbHelper {
   static Future<String> getArchiveDownloadUrl(int archiveId) async {
     return '${ApiClient.baseUrl}/pres/api/archives/$archiveId/download';
   }
+
+  // GET ng report DOCX (preview / archive). Background render sa server:
+  // 202 + job status hanggang tapos, kaya i-poll ang status_url bago kunin
+  // ang result_url.
+  static Future<http.Response> fetchReportFile(String url) async {
+    var response = await http.get(Uri.parse(url), headers: ApiClient.getHeaders());
+    if (response.statusCode != 202) return response;
+
+    var job = ApiClient.parseJson(response.body);
+    final apiClient = ApiClient();
+    var attempts = 0;
+    while (job['status'] == 'queued' || job['status'] == 'running') {
+      if (++attempts > 120) {
+        throw TimeoutException('Report is still rendering');
+      }
+      await Future.delayed(const Duration(seconds: 1));
+      job = {...job, ...await apiClient.getJson(job['status_url'])};
+    }
+    if (job['status'] != 'done') {
+      throw Exception(job['error'] ?? 'Failed to render report');
+    }
+    return http.get(
+      Uri.parse('${ApiClient.baseUrl}${job['result_url']}?download=1'),
+      headers: ApiClient.getHeaders(),
+    );
+  }
 }
@@ -1,4 +1,7 @@
+import 'dart:async';
 import 'dart:convert';
+import 'dart:io';
+import 'dart:math';
 import 'package:http/http.dart' as http;
 
 class ApiClient {
@@ -8,10 +11,21 @@ class ApiClient {
   // Store session cookie after login
   static String? _sessionCookie;
 
+  // Random key para sa Idempotency-Key header (same key sa bawat retry)
+  static String newIdempotencyKey() {
+    final rnd = Random.secure();
+    return List.generate(16, (_) => rnd.nextInt(256).toRadixString(16).padLeft(2, '0'))
+        .join();
+  }
+
+  // idempotent: true -> may Idempotency-Key at nire-retry kapag
+  // network error / timeout (hindi madodoble sa server)
   Future<Map<String, dynamic>> postJson(
     String path,
-    Map<String, dynamic> body,
-  ) async {
+    Map<String, dynamic> body, {
+    bool idempotent = false,
+    int retries = 2,
+  }) async {
     final headers = {
       'Content-Type': 'application/json',
       'Accept': 'application/json',
@@ -19,14 +33,35 @@ class ApiClient {
     if (_sessionCookie != null) {
       headers['Cookie'] = _sessionCookie!;
     }
+    if (idempotent) {
+      headers['Idempotency-Key'] = newIdempotencyKey();
+    }
 
-    final res = await http
-        .post(
-          Uri.parse('$baseUrl$path'),
-          headers: headers,
-          body: jsonEncode(body),
-        )
-        .timeout(const Duration(seconds: 30));
+    late http.Response res;
+    var attempt = 0;
+    while (true) {
+      try {
+        res = await http
+            .post(
+              Uri.parse('$baseUrl$path'),
+              headers: headers,
+              body: jsonEncode(body),
+            )
+            .timeout(const Duration(seconds: 30));
+        // 409 = nasa gitna pa ang unang request na may parehong key
+        if (!(idempotent && res.statusCode == 409 && attempt < retries)) {
+          break;
+        }
+      } on SocketException {
+        if (!idempotent || attempt >= retries) rethrow;
+      } on TimeoutException {
+        if (!idempotent || attempt >= retries) rethrow;
+      } on http.ClientException {
+        if (!idempotent || attempt >= retries) rethrow;
+      }
+      attempt++;
+      await Future.delayed(Duration(seconds: attempt));
+    }
 
     // Save session cookie from login response
     if (res.headers['set-cookie'] != null) {
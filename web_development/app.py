@@ -1,8 +1,10 @@
 from flask import Flask, redirect, url_for, session, jsonify, request
-from supabase import create_client
 import os
 from dotenv import load_dotenv
-from flask_mail import Mail
+
+import request_metrics
+from mail_outbox import outbox
+from passwords import HashingBusy
 
 # Blueprints
 from osas_view.app import osas
@@ -10,35 +12,50 @@ from pres_view.app import pres
 
 # Load environment variables
 load_dotenv()
-mail = Mail()
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY")
 
-# Email (Gmail SMTP)
-app.config["MAIL_SERVER"] = "smtp.gmail.com"
-app.config["MAIL_PORT"] = 587
-app.config["MAIL_USE_TLS"] = True
+# Email (Gmail SMTP; env override para sa local SMTP sink)
+app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+app.config["MAIL_PORT"] = int(os.getenv("MAIL_PORT", 587))
+app.config["MAIL_USE_TLS"] = os.getenv("MAIL_USE_TLS", "1").lower() in ("1", "true", "yes")
 app.config["MAIL_USE_SSL"] = False
 app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
 app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
 app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_USERNAME")
 
-mail.init_app(app)
+# Background sender (see mail_outbox.py); handlers enqueue lang
+outbox.init_app(app)
 
 # Session configuration
 app.config["SESSION_COOKIE_NAME"] = "pockitrack_session"
 app.config["SESSION_PERMANENT"] = False
 
+# Supabase round trips per request (Server-Timing + log, see request_metrics.py)
+# Default budget: SUPABASE_ROUNDTRIP_BUDGET env (10). Per-route overrides:
+app.config["SUPABASE_ROUNDTRIP_BUDGETS"] = {
+    "pres.preview_report_for_budget": 12,
+    "pres.print_report_for_budget": 12,
+    "pres.submitreportwalletid": 15,
+    "osas.osas_print_monthly_report": 12,
+}
+request_metrics.init_app(app)
+
+
+@app.errorhandler(HashingBusy)
+def hashing_busy(e):
+    # login burst: puno ang password hashing queue (see passwords.py)
+    resp = jsonify({"error": "Server busy, please try again."})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "2"
+    return resp
+
+
 # Register Blueprints
 app.register_blueprint(osas, url_prefix="/osas")
 app.register_blueprint(pres, url_prefix="/pres")
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-
 @app.route("/")
 def home():
     if request.accept_mimetypes.best == "application/json":
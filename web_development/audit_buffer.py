@@ -0,0 +1,327 @@
+"""
+Write-behind buffer para sa OSAS activity log at audit trail.
+
+Ang log_activity / log_admin_audit ay nag-a-append lang sa memory (walang
+network round trip sa request); isang background thread ang nagfa-flush
+bilang multi-row inserts, per table:
+
+    audit.add("osas_activity_log", {"admin_id": 3, "action_type": "login", ...})
+    audit.flush()     # sync flush (tests / CLI); kusa rin sa size / time / exit
+
+Kapag pumalya ang flush (network / Supabase down), ang rows ay isinusulat
+sa local spool (JSON lines, fsync'd) at nire-replay sa susunod na
+successful flush, o manually:
+    flask --app app osas flush-audit
+
+Bawat worker ay may sariling spool-<pid>.jsonl; ang replay ay kumukuha
+lang ng sariling file (naka-lock laban sa sabayang _spool) at ng files ng
+patay nang workers. Rows na paulit-ulit tinatanggihan ng DB (hindi network
+error) ay inililipat sa dead-letter.jsonl pagkatapos ng AUDIT_MAX_REPLAYS.
+
+Config (env):
+    AUDIT_BATCH_SIZE       flush agad kapag ganito na karami (default 50)
+    AUDIT_FLUSH_SECONDS    max age ng buffered rows (default 2)
+    AUDIT_MAX_PENDING      lampas dito, diretso sa spool (default 10000)
+    AUDIT_MAX_REPLAYS      DB rejections bago ma-dead-letter (default 5)
+    AUDIT_SPOOL_DIR        default <tmp>/pockitrack-audit
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+from postgrest.exceptions import APIError
+
+from db import supabase
+
+INSERT_CHUNK = 500
+SPOOL_PREFIX = "spool-"
+DEAD_LETTER = "dead-letter.jsonl"
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class AuditBuffer:
+    def __init__(self, client=None):
+        self.client = client or supabase
+        self.batch_size = max(1, _env_int("AUDIT_BATCH_SIZE", 50))
+        self.flush_seconds = max(1, _env_int("AUDIT_FLUSH_SECONDS", 2))
+        self.max_pending = max(self.batch_size, _env_int("AUDIT_MAX_PENDING", 10000))
+        self.max_replays = max(1, _env_int("AUDIT_MAX_REPLAYS", 5))
+        self.spool_dir = os.getenv("AUDIT_SPOOL_DIR") or os.path.join(
+            tempfile.gettempdir(), "pockitrack-audit"
+        )
+        self._pending = []  # (table, row)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spool_lock = threading.Lock()  # sariling spool file: write vs claim
+        self._wake = threading.Event()
+        self._thread = None
+
+    # -------- API
+
+    def add(self, table, row):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                overflow = True
+            else:
+                overflow = False
+                self._pending.append((table, row))
+                full = len(self._pending) >= self.batch_size
+        if overflow:
+            self._spool([(table, row)])
+            return
+        self._ensure_flusher()
+        if full:
+            self._wake.set()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Insert lahat ng buffered rows (+ spool replay). Returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            written = self._insert(batch)
+            if written == len(batch):
+                written += self._replay_spool()
+            return written
+
+    def close(self):
+        # atexit: huling flush; kung pumalya, nasa spool na
+        try:
+            self.flush()
+        except Exception as e:
+            print("Error flushing audit log at exit:", e)
+
+    # -------- flusher
+
+    def _ensure_flusher(self):
+        # lazy start: huwag mag-spawn ng thread bago mag-fork ang gunicorn
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-flush", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print("Error in audit flusher:", e)
+
+    def _insert(self, batch):
+        """Multi-row insert per table; ang hindi naisulat ay napupunta sa spool."""
+        by_table = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        written = 0
+        for table, rows in by_table.items():
+            for i in range(0, len(rows), INSERT_CHUNK):
+                chunk = rows[i:i + INSERT_CHUNK]
+                try:
+                    self.client.table(table).insert(chunk).execute()
+                    written += len(chunk)
+                except Exception as e:
+                    print(f"Error flushing {len(chunk)} {table} rows, spooling:", e)
+                    self._spool([(table, r) for r in chunk])
+        return written
+
+    # -------- spool
+
+    def _spool_path(self):
+        return os.path.join(self.spool_dir, f"{SPOOL_PREFIX}{os.getpid()}.jsonl")
+
+    def _append(self, path, entries):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for table, row, attempts in entries:
+                f.write(
+                    json.dumps(
+                        {"table": table, "row": row, "attempts": attempts}, default=str
+                    )
+                    + "\n"
+                )
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _spool(self, entries, attempts=0):
+        """entries: (table, row) o (table, row, attempts)."""
+        entries = [e if len(e) == 3 else (*e, attempts) for e in entries]
+        with self._spool_lock:
+            self._append(self._spool_path(), entries)
+
+    def _dead_letter(self, entries):
+        for table, row, attempts in entries:
+            print(f"Error: {table} row rejected {attempts}x, moved to {DEAD_LETTER}:", row)
+        self._append(os.path.join(self.spool_dir, DEAD_LETTER), entries)
+
+    def _count_lines(self, names):
+        total = 0
+        for name in names:
+            try:
+                with open(os.path.join(self.spool_dir, name), encoding="utf-8") as f:
+                    total += sum(1 for line in f if line.strip())
+            except OSError:
+                pass
+        return total
+
+    def spooled_count(self):
+        if not os.path.isdir(self.spool_dir):
+            return 0
+        return self._count_lines(
+            n for n in os.listdir(self.spool_dir)
+            if n.startswith(SPOOL_PREFIX) and (n.endswith(".jsonl") or n.endswith(".replay"))
+        )
+
+    def dead_letter_count(self):
+        if not os.path.isdir(self.spool_dir):
+            return 0
+        return self._count_lines([DEAD_LETTER]) if DEAD_LETTER in os.listdir(self.spool_dir) else 0
+
+    def _replay_spool(self):
+        """Sariling spool + spool ng patay nang workers -> DB."""
+        if not os.path.isdir(self.spool_dir):
+            return 0
+        me = os.getpid()
+        written = 0
+        for name in sorted(os.listdir(self.spool_dir)):
+            owner = _spool_owner(name)
+            if owner is False:
+                continue
+            # buhay na ibang worker: siya ang magre-replay ng sarili niyang
+            # file (baka nagsusulat pa siya doon ngayon)
+            if owner != me and _pid_alive(owner):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            claimed = os.path.join(
+                self.spool_dir, f"{name.split('.jsonl')[0]}.jsonl.{me}.replay"
+            )
+            try:
+                if owner == me:
+                    with self._spool_lock:  # walang _spool habang nire-rename
+                        os.replace(path, claimed)
+                else:
+                    os.replace(path, claimed)  # atomic claim
+            except OSError:
+                continue
+            entries = []
+            with open(claimed, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                        entries.append(
+                            (item["table"], item["row"], int(item.get("attempts") or 0))
+                        )
+                    except (ValueError, KeyError, TypeError):
+                        continue  # putol na huling linya
+            written += self._insert_spooled(entries)
+            os.remove(claimed)
+        return written
+
+    def _insert_spooled(self, entries):
+        """
+        Replay insert. Network error: balik sa spool (walang bilang).
+        Tinanggihan ng DB: isa-isa, at ang sirang row lang ang may attempts++.
+        """
+        by_table = {}
+        for table, row, attempts in entries:
+            by_table.setdefault(table, []).append((row, attempts))
+        written = 0
+        for table, items in by_table.items():
+            for i in range(0, len(items), INSERT_CHUNK):
+                chunk = items[i:i + INSERT_CHUNK]
+                try:
+                    self.client.table(table).insert([r for r, _ in chunk]).execute()
+                    written += len(chunk)
+                    continue
+                except APIError as e:
+                    print(f"Error replaying {len(chunk)} {table} rows, retrying per row:", e)
+                except Exception as e:
+                    print(f"Error replaying {len(chunk)} {table} rows, spooling:", e)
+                    self._spool([(table, r, n) for r, n in chunk])
+                    continue
+
+                retry, dead = [], []
+                for row, attempts in chunk:
+                    try:
+                        self.client.table(table).insert(row).execute()
+                        written += 1
+                    except APIError:
+                        attempts += 1
+                        (dead if attempts >= self.max_replays else retry).append(
+                            (table, row, attempts)
+                        )
+                    except Exception:
+                        retry.append((table, row, attempts))
+                if retry:
+                    self._spool(retry)
+                if dead:
+                    self._dead_letter(dead)
+        return written
+
+
+def _spool_owner(name):
+    """
+    Pid na may-ari ng spool file: spool-<pid>.jsonl, o ang nagre-replay
+    para sa spool-<pid>.jsonl.<pid>.replay. None kung hindi mabasa ang pid;
+    False kung hindi spool file (hal. dead-letter.jsonl).
+    """
+    if not name.startswith(SPOOL_PREFIX):
+        return False
+    try:
+        if name.endswith(".jsonl"):
+            return int(name[len(SPOOL_PREFIX):-len(".jsonl")])
+        if name.endswith(".replay"):
+            return int(name.rsplit(".", 2)[1])
+    except ValueError:
+        return None
+    return False
+
+
+def _pid_alive(pid):
+    if pid is None:
+        return False
+    if os.name == "nt":
+        # walang signal 0 sa Windows; hindi rin nare-rename ang bukas na file
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # e.g. EPERM: may process pero hindi atin
+    return True
+
+
+audit = AuditBuffer()
+atexit.register(audit.close)
+
+
+def _reset_after_fork():
+    # flusher thread ng parent ay wala sa child; buffered rows ay sa parent
+    audit._lock = threading.Lock()
+    audit._flush_lock = threading.Lock()
+    audit._spool_lock = threading.Lock()
+    audit._wake = threading.Event()
+    audit._thread = None
+    audit._pending = []
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
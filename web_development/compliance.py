@@ -0,0 +1,163 @@
+"""
+OSAS compliance matrix: org x academic month (received / submitted / missing).
+
+Ang matrix ay precomputed sa DB (public.osas_compliance, maintained ng
+triggers, see supabase/migrations/0009_osas_compliance_matrix.sql), kaya
+ang buong grid ay isang select lang; dito naka-cache per process:
+
+    matrix, stamp = compliance.get(supabase)            # lahat ng active orgs
+    matrix, stamp = compliance.get(supabase, department_id=4)
+    # {"months": ["august", ...],
+    #  "organizations": [{"org_id": 7, "org_name": "...", "department": "...",
+    #                     "months": {"august": "received", ...},
+    #                     "received": 3, "submitted": 1, "missing": 6, ...}],
+    #  "departments": [{"department_id": 4, "department": "...", "orgs": 12,
+    #                   "received": 30, "submitted": 5, "missing": 85,
+    #                   "complete": 2}],
+    #  "totals": {...}}
+    # stamp: content hash ng mismong rows ng matrix (para sa ETag)
+
+    compliance.invalidate()    # pagkatapos sumulat ng checklist sa process na ito
+
+Ibang workers: makikita ang bago pagkalipas ng COMPLIANCE_CACHE_SECONDS.
+
+Config (env):
+    COMPLIANCE_CACHE_SECONDS   TTL ng cached grid (default 30)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+MATRIX_VIEW = "osas_compliance_matrix"
+MATRIX_COLUMNS = (
+    "organization_id, org_name, department_id, dept_name, report_id, status, "
+    "months, submitted_months, received, submitted, missing"
+)
+MONTH_KEYS = (
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+)
+STATES = ("received", "submitted", "missing")
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _org_entry(row):
+    months = row.get("months") or {}
+    # org na wala pang precomputed row (hal. bago pa ang trigger): lahat missing
+    months = {k: months.get(k, "missing") for k in MONTH_KEYS}
+    counts = {s: 0 for s in STATES}
+    for state in months.values():
+        counts[state] = counts.get(state, 0) + 1
+    return {
+        "org_id": row["organization_id"],
+        "org_name": row.get("org_name"),
+        "department_id": row.get("department_id"),
+        "department": row.get("dept_name") or "-",
+        "report_id": row.get("report_id"),
+        "status": row.get("status"),
+        "months": months,
+        "submitted_months": row.get("submitted_months") or [],
+        **counts,
+    }
+
+
+def _summarize(orgs):
+    departments = {}
+    totals = {"orgs": 0, "complete": 0, **{s: 0 for s in STATES}}
+    for org in orgs:
+        dept = departments.setdefault(
+            org["department_id"],
+            {
+                "department_id": org["department_id"],
+                "department": org["department"],
+                "orgs": 0,
+                "complete": 0,
+                **{s: 0 for s in STATES},
+            },
+        )
+        for bucket in (dept, totals):
+            bucket["orgs"] += 1
+            bucket["complete"] += org["received"] == len(MONTH_KEYS)
+            for s in STATES:
+                bucket[s] += org[s]
+    return (
+        sorted(departments.values(), key=lambda d: (d["department"] or "").lower()),
+        totals,
+    )
+
+
+def build_matrix(rows, department_id=None):
+    orgs = [_org_entry(r) for r in rows]
+    if department_id is not None:
+        orgs = [o for o in orgs if o["department_id"] == department_id]
+    orgs.sort(key=lambda o: ((o["org_name"] or "").lower(), o["org_id"]))
+    departments, totals = _summarize(orgs)
+    return {
+        "months": list(MONTH_KEYS),
+        "organizations": orgs,
+        "departments": departments,
+        "totals": totals,
+    }
+
+
+class ComplianceCache:
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else max(0, _env_int("COMPLIANCE_CACHE_SECONDS", 30))
+        self._lock = threading.Lock()
+        self._rows = None
+        self._loaded_at = 0.0
+        self._stamp = None  # content hash ng cached rows (ETag)
+
+    def snapshot(self, client):
+        """(rows, stamp) -- sabay kinuha sa lock para laging magkatugma."""
+        with self._lock:
+            if self._rows is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._rows, self._stamp
+        rows = client.table(MATRIX_VIEW).select(MATRIX_COLUMNS).execute().data or []
+        stamp = hashlib.sha256(
+            json.dumps(rows, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        with self._lock:
+            self._rows = rows
+            self._loaded_at = time.monotonic()
+            self._stamp = stamp
+        return rows, stamp
+
+    def rows(self, client):
+        return self.snapshot(client)[0]
+
+    def get(self, client, department_id=None):
+        """(matrix, stamp); ang stamp ay ng mismong rows na pinagbuhatan."""
+        rows, stamp = self.snapshot(client)
+        return build_matrix(rows, department_id), stamp
+
+    def org(self, client, org_id):
+        """Cached entry ng isang org, o None."""
+        for row in self.rows(client):
+            if row["organization_id"] == org_id:
+                return _org_entry(row)
+        return None
+
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+
+
+compliance = ComplianceCache()
@@ -0,0 +1,174 @@
+"""
+Shared Supabase data-access layer.
+
+Lahat ng gumagamit ng Supabase (app.py, pres_view, osas_view,
+pres_desktop.py) ay kumukuha ng client dito, para iisang pooled,
+keep-alive (HTTP/2) httpx connection pool lang ang gamit per process
+imbes na tig-iisang client per module.
+
+    from db import supabase
+    supabase.table("wallets").select("id").execute()
+
+Config (env / .env):
+    SUPABASE_URL, SUPABASE_KEY
+    SUPABASE_POOL_SIZE         max open connections (default 20)
+    SUPABASE_POOL_KEEPALIVE    idle keep-alive connections (default 10)
+    SUPABASE_KEEPALIVE_EXPIRY  seconds bago isara ang idle conn (default 30)
+    SUPABASE_CONNECT_TIMEOUT   seconds (default 5)
+    SUPABASE_READ_TIMEOUT      seconds (default 30)
+    SUPABASE_HTTP2             "0" para i-disable ang HTTP/2 (default on)
+    SUPABASE_READ_RETRIES      retries para sa idempotent reads (default 2)
+    SUPABASE_RETRY_BACKOFF     base backoff seconds, doubles per try (default 0.2)
+"""
+
+import atexit
+import os
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+from supabase import ClientOptions, create_client
+
+import request_metrics
+
+load_dotenv()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class RetryTransport(httpx.HTTPTransport):
+    """
+    HTTPTransport na nire-retry (with exponential backoff) ang idempotent
+    reads (GET/HEAD) kapag may network error o 502/503/504.
+    Writes (POST/PATCH/DELETE, pati RPC) ay hindi nire-retry.
+    """
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+    RETRY_STATUSES = (502, 503, 504)
+    RETRY_ERRORS = (
+        httpx.ConnectError,
+        httpx.ConnectTimeout,
+        httpx.ReadError,
+        httpx.ReadTimeout,
+        httpx.RemoteProtocolError,
+    )
+
+    def __init__(self, read_retries=2, backoff=0.2, **kwargs):
+        super().__init__(**kwargs)
+        self.read_retries = read_retries
+        self.backoff = backoff
+
+    def handle_request(self, request):
+        retryable = request.method in self.IDEMPOTENT_METHODS
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                response = super().handle_request(request)
+            except self.RETRY_ERRORS:
+                if not retryable or attempt >= self.read_retries:
+                    request_metrics.track_error(request, started)
+                    raise
+            else:
+                if (
+                    not retryable
+                    or response.status_code not in self.RETRY_STATUSES
+                    or attempt >= self.read_retries
+                ):
+                    # round-trip accounting (Server-Timing), see request_metrics.py
+                    return request_metrics.track(request, response, started)
+                response.close()
+
+            time.sleep(self.backoff * (2**attempt))
+            attempt += 1
+
+
+def build_http_client():
+    """Pooled keep-alive httpx client shared by PostgREST, storage and auth."""
+    limits = httpx.Limits(
+        max_connections=_env_int("SUPABASE_POOL_SIZE", 20),
+        max_keepalive_connections=_env_int("SUPABASE_POOL_KEEPALIVE", 10),
+        keepalive_expiry=_env_float("SUPABASE_KEEPALIVE_EXPIRY", 30.0),
+    )
+    timeout = httpx.Timeout(
+        _env_float("SUPABASE_READ_TIMEOUT", 30.0),
+        connect=_env_float("SUPABASE_CONNECT_TIMEOUT", 5.0),
+    )
+    http2 = os.getenv("SUPABASE_HTTP2", "1") != "0"
+    transport = RetryTransport(
+        read_retries=_env_int("SUPABASE_READ_RETRIES", 2),
+        backoff=_env_float("SUPABASE_RETRY_BACKOFF", 0.2),
+        http2=http2,
+        limits=limits,
+        retries=1,  # connect retries (safe for any method)
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=timeout,
+        http2=http2,
+        follow_redirects=True,
+    )
+
+
+_lock = threading.Lock()
+_client = None
+_http_client = None
+
+
+def get_client():
+    """Process-wide Supabase client (created on first use)."""
+    global _client, _http_client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _http_client = build_http_client()
+                _client = create_client(
+                    os.getenv("SUPABASE_URL"),
+                    os.getenv("SUPABASE_KEY"),
+                    options=ClientOptions(httpx_client=_http_client),
+                )
+    return _client
+
+
+def close_client():
+    global _client, _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = None
+        _http_client = None
+
+
+def _reset_after_fork():
+    # gunicorn --preload: huwag i-share ang sockets ng parent sa workers
+    global _client, _http_client, _lock
+    _lock = threading.Lock()
+    _client = None
+    _http_client = None
+
+
+class _LazyClient:
+    """Forwards to get_client() so importing modules never opens sockets."""
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+
+supabase = _LazyClient()
+
+atexit.register(close_client)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,130 @@
+"""
+Process-wide cache ng folder (wallet_budgets.id) -> wallet + month info.
+
+Hindi nagbabago ang wallet / year / month ng isang folder pagkagawa nito,
+kaya hindi na kailangang mag-query sa wallet_budgets bago ang bawat
+insert / update / receipt upload:
+
+    info = folders.get(supabase, folder_id)
+    # {"wallet_id": 3, "organization_id": 7, "year": 2025,
+    #  "month_name": "January", "month_order": 1}  or None
+
+    folders.warm_org(supabase, org_id)   # sa login: lahat ng folders ng org
+    folders.forget(folder_id)            # kapag na-create / na-delete ang folder
+
+Bounded (LRU). Misses ay hindi kina-cache, kaya bagong folder ay
+makikita agad kahit walang explicit invalidation.
+
+Config (env):
+    FOLDER_CACHE_SIZE    max folders na itatabi (default 5000)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+FOLDER_COLUMNS = (
+    "id, wallet_id, year, months (month_name, month_order), wallets (organization_id)"
+)
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _entry(row, organization_id=None):
+    month = row.get("months") or {}
+    if organization_id is None:
+        organization_id = (row.get("wallets") or {}).get("organization_id")
+    return {
+        "wallet_id": row["wallet_id"],
+        "organization_id": organization_id,
+        "year": row.get("year"),
+        "month_name": month.get("month_name"),
+        "month_order": month.get("month_order"),
+    }
+
+
+class FolderCache:
+    def __init__(self, max_items=None):
+        self.max_items = max_items or max(1, _env_int("FOLDER_CACHE_SIZE", 5000))
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _put(self, folder_id, entry):
+        with self._lock:
+            self._items[int(folder_id)] = entry
+            self._items.move_to_end(int(folder_id))
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def peek(self, folder_id):
+        """Cached entry lang (walang query), or None."""
+        with self._lock:
+            entry = self._items.get(int(folder_id))
+            if entry is not None:
+                self._items.move_to_end(int(folder_id))
+            return entry
+
+    def get(self, client, folder_id):
+        """Folder info (cache muna, tapos isang query). None kung wala."""
+        entry = self.peek(folder_id)
+        if entry is not None:
+            return entry
+
+        res = (
+            client.table("wallet_budgets")
+            .select(FOLDER_COLUMNS)
+            .eq("id", folder_id)
+            .limit(1)
+            .execute()
+        )
+        if not res.data:
+            return None
+        entry = _entry(res.data[0])
+        self._put(folder_id, entry)
+        return entry
+
+    def warm_org(self, client, org_id):
+        """Load lahat ng folders ng org (2 queries). Returns count."""
+        wallets = (
+            client.table("wallets")
+            .select("id")
+            .eq("organization_id", org_id)
+            .execute()
+            .data
+            or []
+        )
+        if not wallets:
+            return 0
+        rows = (
+            client.table("wallet_budgets")
+            .select(FOLDER_COLUMNS)
+            .in_("wallet_id", [w["id"] for w in wallets])
+            .execute()
+            .data
+            or []
+        )
+        for row in rows[: self.max_items]:
+            self._put(row["id"], _entry(row, org_id))
+        return len(rows)
+
+    def forget(self, folder_id):
+        with self._lock:
+            self._items.pop(int(folder_id), None)
+
+    def forget_wallet(self, wallet_id):
+        """Folder(s) ng isang wallet (e.g. wallet deleted)."""
+        with self._lock:
+            for fid in [f for f, e in self._items.items() if e["wallet_id"] == wallet_id]:
+                del self._items[fid]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+folders = FolderCache()
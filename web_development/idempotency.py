@@ -0,0 +1,232 @@
+"""
+Idempotency-Key support para sa write endpoints (retries sa mahinang Wi-Fi).
+
+Kapag may `Idempotency-Key` header ang request, ang unang successful
+response ay tinatabi (TTL). Ang retry na may parehong key ay
+makakatanggap ng parehong response, hindi na uulitin ang inserts:
+
+    @pres.route("/api/wallets/<int:folder_id>/transactions", methods=["POST"])
+    @idempotent
+    def add_wallet_transaction(folder_id):
+        ...
+
+  * walang header            -> normal (walang nagbago)
+  * replay                    -> stored response + `Idempotent-Replayed: true`
+  * same key, nasa gitna pa   -> 409
+  * same key, ibang body      -> 422
+  * 4xx responses             -> hindi tinatabi (pwedeng i-retry agad)
+  * 5xx / exception           -> naka-PENDING hanggang IDEMPOTENCY_PENDING_TTL
+                                 (baka na-commit na ang write bago pumalya;
+                                 409 ang retry hanggang mag-expire)
+
+Keys are scoped per org + endpoint. Store is pluggable: anything with
+claim() / save() / release(). MemoryStore = in-process lang (isang
+worker); RedisStore = shared ng lahat ng gunicorn workers / hosts, kaya
+ang retry na napunta sa ibang worker ay replay pa rin (needs
+`pip install redis`).
+
+Config (env):
+    IDEMPOTENCY_BACKEND      memory (default) | redis
+    IDEMPOTENCY_REDIS_URL    default NOTIFY_REDIS_URL o redis://localhost:6379/0
+    IDEMPOTENCY_TTL          seconds na tinatabi ang response (default 86400)
+    IDEMPOTENCY_PENDING_TTL  max seconds ng "in progress" claim; lampas dito
+                             (hal. patay na worker) pwede nang i-retry (default 300)
+    IDEMPOTENCY_MAX_KEYS     max stored keys, memory store (default 10000)
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, make_response, request, session
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+PENDING = "pending"
+
+# response headers na kasama sa replay
+REPLAY_HEADERS = ("Content-Type", "Location", "ETag")
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class MemoryStore:
+    """key -> (expires_at, record). Bounded; oldest keys drop first."""
+
+    def __init__(self, max_items=None):
+        self.max_items = max_items or max(1, _env_int("IDEMPOTENCY_MAX_KEYS", 10000))
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._items.get(key)
+        if item and item[0] <= now:
+            del self._items[key]
+            return None
+        return item[1] if item else None
+
+    def claim(self, key, fingerprint, ttl):
+        """
+        Atomic: existing record kung meron na, else None at naka-reserve
+        na ang key (status PENDING) para sa caller.
+        """
+        now = time.time()
+        with self._lock:
+            record = self._live(key, now)
+            if record is not None:
+                return record
+            self._items[key] = (now + ttl, {"status": PENDING, "fingerprint": fingerprint})
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            return None
+
+    def save(self, key, record, ttl):
+        with self._lock:
+            self._items[key] = (time.time() + ttl, record)
+            self._items.move_to_end(key)
+
+    def release(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class RedisStore:
+    """SET NX / GET / DEL sa Redis; expiry ay Redis TTL na."""
+
+    def __init__(self, url=None, prefix="pockitrack:idem:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("IDEMPOTENCY_BACKEND=redis needs the redis package")
+        self._redis = redis.Redis.from_url(
+            url
+            or os.getenv("IDEMPOTENCY_REDIS_URL")
+            or os.getenv("NOTIFY_REDIS_URL", "redis://localhost:6379/0")
+        )
+        self.prefix = prefix
+
+    @staticmethod
+    def _dump(record):
+        record = dict(record)
+        if "body" in record:
+            record["body"] = base64.b64encode(record["body"]).decode("ascii")
+        return json.dumps(record)
+
+    @staticmethod
+    def _load(raw):
+        record = json.loads(raw)
+        if "body" in record:
+            record["body"] = base64.b64decode(record["body"])
+        record["headers"] = [tuple(h) for h in record.get("headers", [])]
+        return record
+
+    def claim(self, key, fingerprint, ttl):
+        pending = self._dump({"status": PENDING, "fingerprint": fingerprint})
+        for _ in range(2):
+            if self._redis.set(self.prefix + key, pending, nx=True, ex=int(ttl)):
+                return None
+            raw = self._redis.get(self.prefix + key)
+            if raw is not None:
+                return self._load(raw)
+            # nag-expire sa pagitan ng SET at GET: subukan ulit
+        return None
+
+    def save(self, key, record, ttl):
+        self._redis.set(self.prefix + key, self._dump(record), ex=int(ttl))
+
+    def release(self, key):
+        self._redis.delete(self.prefix + key)
+
+
+def _store_from_env():
+    if os.getenv("IDEMPOTENCY_BACKEND", "memory").lower() == "redis":
+        return RedisStore()
+    return MemoryStore()
+
+
+store = _store_from_env()
+
+
+def _fingerprint():
+    h = hashlib.sha256()
+    h.update(request.method.encode())
+    # full_path: kasama ang query (hal. ?dry_run=1 ay ibang request)
+    h.update(request.full_path.encode())
+    h.update(request.get_data(cache=True))
+    return h.hexdigest()
+
+
+def _replay(record):
+    resp = make_response(record["body"], record["status"])
+    for name, value in record["headers"]:
+        resp.headers[name] = value
+    resp.headers["Idempotent-Replayed"] = "true"
+    return resp
+
+
+def idempotent(view):
+    """Decorator: honor `Idempotency-Key` on a write endpoint."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.headers.get(HEADER) or "").strip()
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{HEADER} is too long"}), 400
+
+        scoped = f"{session.get('org_id')}:{request.endpoint}:{key}"
+        fingerprint = _fingerprint()
+        ttl = max(1, _env_int("IDEMPOTENCY_TTL", 86400))
+        pending_ttl = max(1, min(ttl, _env_int("IDEMPOTENCY_PENDING_TTL", 300)))
+
+        record = store.claim(scoped, fingerprint, pending_ttl)
+        if record is not None:
+            if record.get("fingerprint") != fingerprint:
+                return (
+                    jsonify({"error": f"{HEADER} was already used for a different request"}),
+                    422,
+                )
+            if record.get("status") == PENDING:
+                return (
+                    jsonify({"error": "A request with this Idempotency-Key is still in progress"}),
+                    409,
+                )
+            return _replay(record)
+
+        # exception / 5xx: huwag i-release; baka na-commit na ang insert /
+        # RPC bago pumalya, kaya ang retry ay 409 hanggang pending_ttl
+        resp = make_response(view(*args, **kwargs))
+
+        if resp.status_code >= 500:
+            return resp
+        if resp.status_code >= 400 or resp.is_streamed:
+            # 4xx: tinanggihan bago sumulat (or hindi ma-replay): pwedeng ulitin
+            store.release(scoped)
+            return resp
+
+        store.save(
+            scoped,
+            {
+                "status": resp.status_code,
+                "fingerprint": fingerprint,
+                "body": resp.get_data(),
+                "headers": [
+                    (h, resp.headers[h]) for h in REPLAY_HEADERS if h in resp.headers
+                ],
+            },
+            ttl,
+        )
+        return resp
+
+    return wrapper
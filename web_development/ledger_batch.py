@@ -0,0 +1,134 @@
+"""
+Batch create / update / delete ng wallet_transactions sa isang folder.
+
+Isang RPC lang (apply_wallet_transaction_batch, see
+supabase/migrations/0005_wallet_transaction_batch.sql): lahat ng ops
+(at ang rollup triggers nila) ay nasa isang DB transaction, kaya
+all-or-nothing. Kasama sa resulta ang bagong folder totals (galing sa rollups).
+
+    ops = parse_ops(request.get_json().get("ops"))
+    result = apply_batch(supabase, wallet_id, folder_id, ops)
+    # {"results": [{"index": 0, "op": "create", "id": 51, "transaction": {...}}],
+    #  "totals": {"count": 12, "income": 1500.0, "expense": 320.0}}
+
+Op shapes (same fields as the single add / edit endpoints):
+    {"op": "create", "data": {kind, date_issued, quantity, price, ...}}
+    {"op": "update", "id": 12, "data": {...}}
+    {"op": "delete", "id": 13}
+"""
+
+from ledger_import import validate_row
+
+BATCH_RPC = "apply_wallet_transaction_batch"
+OPS = ("create", "update", "delete")
+MAX_OPS = 200
+
+# Postgres errcodes na galing sa RPC -> HTTP status
+ERROR_STATUS = {
+    "P0002": 404,  # transaction wala sa folder
+    "22023": 400,  # unknown op
+    "22P02": 400,  # invalid input (date / number)
+    "22007": 400,  # invalid date format
+    "23502": 400,  # not null
+    "23514": 400,  # check constraint
+}
+
+
+class BatchError(Exception):
+    """Failed batch (walang na-apply). status = HTTP status para sa API."""
+
+    def __init__(self, message, status=400, index=None):
+        super().__init__(message)
+        self.status = status
+        self.index = index
+
+
+def parse_ops(ops):
+    """Validate ang buong batch bago pa tumawag sa DB. BatchError kung may mali."""
+    if not isinstance(ops, list) or not ops:
+        raise BatchError("ops must be a non-empty list")
+    if len(ops) > MAX_OPS:
+        raise BatchError(f"Too many operations (max {MAX_OPS})")
+
+    parsed = []
+    touched = set()
+    for i, op in enumerate(ops):
+        if not isinstance(op, dict) or op.get("op") not in OPS:
+            raise BatchError("op must be create, update or delete", index=i)
+        kind = op["op"]
+        item = {"op": kind}
+
+        if kind != "create":
+            try:
+                tx_id = int(op.get("id"))
+            except (TypeError, ValueError):
+                raise BatchError("id is required", index=i)
+            # isang op lang per row para malinaw ang resulta
+            if tx_id in touched:
+                raise BatchError(f"Transaction {tx_id} appears more than once", index=i)
+            touched.add(tx_id)
+            item["id"] = tx_id
+
+        if kind != "delete":
+            try:
+                item["data"] = validate_row(op.get("data") or {})
+            except ValueError as e:
+                raise BatchError(str(e), index=i)
+        parsed.append(item)
+    return parsed
+
+
+def tx_payload(row):
+    """DB row -> same shape as the single add / edit endpoints."""
+    return {
+        "id": row["id"],
+        "wallet_id": row["wallet_id"],
+        "kind": row["kind"],
+        "date_issued": row["date_issued"],
+        "description": row["description"],
+        "quantity": row["quantity"],
+        "price": float(row["price"]),
+        "total_amount": float(row["price"]) * int(row["quantity"]),
+        "income_type": row.get("income_type"),
+        "particulars": row.get("particulars"),
+    }
+
+
+def apply_batch(client, wallet_id, budget_id, ops):
+    """
+    Apply parsed ops (see parse_ops) in one RPC. BatchError kung
+    ni-reject ng DB (walang na-apply); other errors are raised as is.
+    """
+    try:
+        res = client.rpc(
+            BATCH_RPC,
+            {"p_wallet_id": wallet_id, "p_budget_id": budget_id, "p_ops": ops},
+        ).execute()
+    except Exception as e:
+        status = ERROR_STATUS.get(getattr(e, "code", None))
+        if status is None:
+            raise
+        raise BatchError(getattr(e, "message", None) or str(e), status=status)
+
+    data = res.data or {}
+    results = []
+    for i, item in enumerate(data.get("results") or []):
+        row = item.get("row")
+        results.append(
+            {
+                "index": i,
+                "op": item.get("op"),
+                "id": item.get("id"),
+                "transaction": tx_payload(row) if row else None,
+            }
+        )
+
+    totals = data.get("totals") or {}
+    return {
+        "results": results,
+        "totals": {
+            "count": int(totals.get("count") or 0),
+            "income": float(totals.get("income") or 0),
+            "expense": float(totals.get("expense") or 0),
+        },
+    }
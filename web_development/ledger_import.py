@@ -0,0 +1,268 @@
+"""
+CSV / XLSX import ng ledger rows sa isang wallet folder.
+
+Streaming: ang CSV ay binabasa row by row (csv module) at ang XLSX via
+openpyxl read_only mode, kaya hindi buong file ang nasa memory. Valid
+rows ay ini-insert by batch (isang multi-row insert bawat batch; ang
+rollups ay inaayos ng DB trigger); invalid rows ay nire-report per row number.
+
+    result = import_ledger(supabase, wallet_id, folder_id, f.filename, f.stream)
+    # {"inserted": 120, "failed": 2, "errors": [{"row": 5, "error": "..."}]}
+
+Header row (case-insensitive, see HEADER_ALIASES):
+    date, kind, quantity, price, description, income_type, particulars
+Same required fields as the add-transaction form: income needs
+income_type, expense needs particulars.
+
+Config (env):
+    IMPORT_BATCH_SIZE   rows per insert (default 500)
+    IMPORT_MAX_ROWS     max data rows per file (default 10000)
+"""
+
+import csv
+import io
+import os
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from postgrest.exceptions import APIError
+
+from ledger_rollups import KINDS
+
+TX_TABLE = "wallet_transactions"
+MAX_ERRORS = 500  # detailed errors sa response (counts are always complete)
+
+HEADER_ALIASES = {
+    "date": "date_issued",
+    "date issued": "date_issued",
+    "kind": "kind",
+    "type": "kind",
+    "qty": "quantity",
+    "quantity": "quantity",
+    "price": "price",
+    "unit price": "price",
+    "description": "description",
+    "income type": "income_type",
+    "type of income": "income_type",
+    "particulars": "particulars",
+}
+REQUIRED_COLUMNS = ("date_issued", "kind", "quantity", "price", "description")
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d", "%m/%d/%y")
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _column_map(header):
+    """Header cells -> {index: field}. ValueError kung kulang ang columns."""
+    cols = {}
+    for i, cell in enumerate(header):
+        key = " ".join(str(cell or "").strip().lower().replace("_", " ").split())
+        field = HEADER_ALIASES.get(key)
+        if field and field not in cols.values():
+            cols[i] = field
+    missing = [c for c in REQUIRED_COLUMNS if c not in cols.values()]
+    if missing:
+        raise ValueError("Missing column(s): " + ", ".join(missing))
+    return cols
+
+
+def _is_blank(cells):
+    return all(c is None or str(c).strip() == "" for c in cells)
+
+
+def _iter_csv(stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    for cells in reader:
+        yield reader.line_num, cells
+
+
+def _iter_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import is not available (openpyxl not installed)")
+    try:
+        wb = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Invalid XLSX file: {e}")
+    try:
+        for row_no, cells in enumerate(wb.active.iter_rows(values_only=True), 1):
+            yield row_no, list(cells)
+    finally:
+        wb.close()
+
+
+def iter_rows(filename, stream):
+    """(row number, {field: value}) per data row (blank rows skipped)."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        source = _iter_csv(stream)
+    elif name.endswith(".xlsx"):
+        source = _iter_xlsx(stream)
+    else:
+        raise ValueError("Unsupported file type (use .csv or .xlsx)")
+
+    cols = None
+    for row_no, cells in source:
+        if _is_blank(cells):
+            continue
+        if cols is None:
+            cols = _column_map(cells)
+            continue
+        yield row_no, {
+            field: cells[i] if i < len(cells) else None for i, field in cols.items()
+        }
+    if cols is None:
+        raise ValueError("File is empty")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    # "2025-01-31 00:00:00" / "2025-01-31T..." -> date part lang
+    text = _text(value).split(" ")[0].split("T")[0]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {_text(value) or '(blank)'}")
+
+
+def _parse_number(value, label):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return Decimal(str(value))
+    text = _text(value).upper().replace("PHP", "").replace(",", "").strip()
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Invalid {label}: {_text(value) or '(blank)'}")
+
+
+def validate_row(raw):
+    """{field: cell} -> insert payload (walang wallet/folder). ValueError kung mali."""
+    kind = _text(raw.get("kind")).lower()
+    if kind not in KINDS:
+        raise ValueError("Kind must be income or expense")
+
+    quantity = _parse_number(raw.get("quantity"), "quantity")
+    if quantity != quantity.to_integral_value() or quantity <= 0:
+        raise ValueError("Quantity must be a whole number greater than zero")
+    price = _parse_number(raw.get("price"), "price")
+    if price < 0:
+        raise ValueError("Price must be zero or more")
+
+    description = _text(raw.get("description"))
+    if not description:
+        raise ValueError("Description is required")
+    income_type = _text(raw.get("income_type"))
+    particulars = _text(raw.get("particulars"))
+    if kind == "income" and not income_type:
+        raise ValueError("Type of income is required")
+    if kind == "expense" and not particulars:
+        raise ValueError("Particulars are required")
+
+    return {
+        "kind": kind,
+        "date_issued": _parse_date(raw.get("date_issued")),
+        "quantity": int(quantity),
+        "price": float(round(price, 2)),
+        "description": description,
+        "income_type": income_type or None,
+        "particulars": particulars or None,
+    }
+
+
+def import_ledger(
+    client, wallet_id, budget_id, filename, stream, dry_run=False, batch_size=None
+):
+    """
+    Parse + validate + batch insert. ValueError kung hindi mabasa ang file
+    (unsupported type / walang header); row problems are in result["errors"].
+    dry_run=True -> validate lang, walang insert.
+    """
+    batch_size = batch_size or max(1, _env_int("IMPORT_BATCH_SIZE", 500))
+    max_rows = _env_int("IMPORT_MAX_ROWS", 10000)
+    result = {"inserted": 0, "failed": 0, "errors": [], "dry_run": bool(dry_run)}
+    batch = []
+
+    def error(row_no, message):
+        result["failed"] += 1
+        if len(result["errors"]) < MAX_ERRORS:
+            result["errors"].append({"row": row_no, "error": message})
+
+    def flush():
+        if not batch:
+            return
+        if dry_run:
+            result["inserted"] += len(batch)
+        else:
+            try:
+                res = client.table(TX_TABLE).insert([tx for _, tx in batch]).execute()
+                inserted = res.data or []
+            except APIError as e:
+                # tinanggihan ng DB ang buong insert (atomic, walang na-save):
+                # isa-isa na lang para ang sirang row lang ang ma-reject
+                print("Error importing ledger batch, retrying per row:", e)
+                inserted = []
+                for row_no, tx in batch:
+                    try:
+                        res = client.table(TX_TABLE).insert(tx).execute()
+                        inserted.extend(res.data or [])
+                    except Exception as row_err:
+                        error(row_no, f"Insert failed: {row_err}")
+            except Exception as e:
+                # timeout / network: baka na-save na ang batch, kaya walang
+                # per-row retry (madodoble); i-report para ma-check ng user
+                print("Error importing ledger batch (outcome unknown):", e)
+                for row_no, _ in batch:
+                    error(
+                        row_no,
+                        "Insert status unknown (network error); check the "
+                        "folder before importing these rows again",
+                    )
+                inserted = []
+            result["inserted"] += len(inserted)
+        batch.clear()
+
+    count = 0
+    row_no = None
+    try:
+        for row_no, raw in iter_rows(filename, stream):
+            count += 1
+            if count > max_rows:
+                error(row_no, f"Row limit ({max_rows}) reached; remaining rows not imported")
+                break
+            try:
+                tx = validate_row(raw)
+            except ValueError as e:
+                error(row_no, str(e))
+                continue
+            tx["wallet_id"] = wallet_id
+            tx["budget_id"] = budget_id
+            batch.append((row_no, tx))
+            if len(batch) >= batch_size:
+                flush()
+    except (ValueError, csv.Error) as e:
+        # sira ang file sa gitna: i-report, pero ituloy ang na-validate na
+        if not count:
+            raise ValueError(str(e))
+        error(row_no, f"Could not read the file after this row: {e}")
+    flush()
+
+    result["rows"] = min(count, max_rows)
+    return result
@@ -0,0 +1,221 @@
+"""
+Keyset pagination ng wallet_transactions (per folder).
+
+Order ay (date_issued, id) -- stable kahit may bagong rows, at walang
+OFFSET scan sa malalaking folders. Ang cursor ay opaque token ng huling
+row ng page (buong date_issued value, date man o timestamp, para pareho
+ang comparison ng cursor at ng ORDER BY):
+
+    rows, next_after = fetch_transaction_page(
+        client, wallet_id, folder_id, kind="income", limit=50, after=token
+    )
+    totals = page_totals(client, folder_id, kind="income")
+
+Org history (History views): same keyset, date range sa indexed
+date_issued (see supabase/migrations/0004_ledger_keyset_indexes.sql):
+
+    start, end = month_range(2025, 1)
+    rows, next_after = fetch_history_page(client, wallet_ids, start, end, limit=50)
+    totals = period_totals(client, wallet_ids, start, end)
+
+Totals (count / income / expense) ay galing sa wallet_ledger_rollups
+(see ledger_rollups.py), hindi sa pag-scan ng buong folder.
+Gamit ng web API (pres_view) at ng desktop app.
+"""
+
+import base64
+import calendar
+from datetime import date, datetime, timedelta
+
+from ledger_rollups import KINDS, fetch_rollups, sum_rollups, tx_amount
+
+TX_TABLE = "wallet_transactions"
+TX_COLUMNS = (
+    "id, kind, date_issued, description, quantity, price, income_type, particulars"
+)
+HISTORY_COLUMNS = "wallet_id, budget_id, " + TX_COLUMNS
+DEFAULT_PAGE = 50
+MAX_PAGE = 500
+
+
+def encode_cursor(row):
+    """Opaque 'after' token for a transaction row."""
+    raw = f"{row['date_issued']}|{int(row['id'])}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Token -> (date_issued, id). ValueError kung sira."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        date_issued, tx_id = (
+            base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split("|")
+        )
+        tx_id = int(tx_id)
+        # date o timestamp (may "Z" / offset), galing sa PostgREST
+        datetime.fromisoformat(date_issued.replace("Z", "+00:00"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return date_issued, tx_id
+
+
+def parse_date(value, default=None):
+    """'YYYY-MM-DD' query param -> date. ValueError kung mali."""
+    if value in (None, ""):
+        return default
+    return date.fromisoformat(str(value)[:10])
+
+
+def month_range(year, month):
+    """(first day, last day) ng isang buwan."""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def parse_limit(value, default=DEFAULT_PAGE):
+    """'limit' query param -> 1..MAX_PAGE. ValueError kung hindi number."""
+    if value in (None, ""):
+        return default
+    return max(1, min(MAX_PAGE, int(value)))
+
+
+def fetch_transaction_page(
+    client, wallet_id, budget_id, kind=None, limit=None, after=None, desc=False
+):
+    """
+    One page ng folder transactions, ordered by (date_issued, id).
+    limit=None -> lahat (legacy). Returns (rows, next_after or None).
+    """
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+
+    query = (
+        client.table(TX_TABLE)
+        .select(TX_COLUMNS)
+        .eq("wallet_id", wallet_id)
+        .eq("budget_id", budget_id)
+    )
+    if kind:
+        query = query.eq("kind", kind)
+    return _run_keyset(query, limit, after, desc)
+
+
+def _run_keyset(query, limit, after, desc):
+    if after:
+        date_issued, tx_id = decode_cursor(after)
+        op = "lt" if desc else "gt"
+        # quoted: ang timestamp ay may ":" / "+"
+        query = query.or_(
+            f'date_issued.{op}."{date_issued}",'
+            f'and(date_issued.eq."{date_issued}",id.{op}.{tx_id})'
+        )
+    query = query.order("date_issued", desc=desc).order("id", desc=desc)
+    if limit is None:
+        return query.execute().data or [], None
+
+    # +1 row para malaman kung may kasunod pa
+    rows = query.limit(limit + 1).execute().data or []
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def _day_after(day):
+    # exclusive upper bound: kasama ang buong huling araw kahit timestamp
+    return (day + timedelta(days=1)).isoformat()
+
+
+def fetch_history_page(
+    client, wallet_ids, date_from, date_to, kind=None, limit=DEFAULT_PAGE,
+    after=None, desc=True,
+):
+    """
+    One page ng org transactions na date_from <= date_issued <= date_to
+    (newest first by default). Returns (rows, next_after or None).
+    """
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+    if not wallet_ids:
+        return [], None
+
+    query = (
+        client.table(TX_TABLE)
+        .select(HISTORY_COLUMNS)
+        .in_("wallet_id", list(wallet_ids))
+        .gte("date_issued", date_from.isoformat())
+        .lt("date_issued", _day_after(date_to))
+    )
+    if kind:
+        query = query.eq("kind", kind)
+    return _run_keyset(query, limit, after, desc)
+
+
+def page_totals(client, budget_id, kind=None):
+    """{'count', 'income', 'expense'} ng buong folder (count: per kind filter)."""
+    rows = fetch_rollups(client, budget_ids=[budget_id])
+    income, expense = sum_rollups(rows)
+    count = sum(
+        int(r.get("tx_count") or 0)
+        for r in rows
+        if kind is None or r.get("kind") == kind
+    )
+    return {"count": count, "income": income, "expense": expense}
+
+
+def _whole_months(date_from, date_to):
+    """
+    Split [date_from, date_to] into buong buwan (year, month) + mga
+    partial na dulo [(start, end), ...].
+    """
+    months, partial = [], []
+    cur = date_from
+    while cur <= date_to:
+        first, last = month_range(cur.year, cur.month)
+        end = min(last, date_to)
+        if cur == first and end == last:
+            months.append((cur.year, cur.month))
+        else:
+            partial.append((cur, end))
+        cur = end + timedelta(days=1)
+    return months, partial
+
+
+def period_totals(client, wallet_ids, date_from, date_to, kind=None):
+    """
+    {'count', 'income', 'expense'} ng org para sa date range.
+    Buong buwan -> rollups (precomputed); partial na buwan lang ang
+    binabasa mula sa raw rows (hanggang dalawang dulo ng range).
+    """
+    totals = {"count": 0, "income": 0.0, "expense": 0.0}
+    if not wallet_ids or date_from > date_to:
+        return totals
+
+    months, partial = _whole_months(date_from, date_to)
+    if months:
+        wanted = set(months)
+        for r in fetch_rollups(client, wallet_ids=wallet_ids):
+            if (r.get("year"), r.get("month")) not in wanted:
+                continue
+            amt = float(r.get("total") or 0)
+            if r.get("kind") in KINDS:
+                totals[r["kind"]] += amt
+            if kind is None or r.get("kind") == kind:
+                totals["count"] += int(r.get("tx_count") or 0)
+
+    for start, end in partial:
+        rows = (
+            client.table(TX_TABLE)
+            .select("kind, quantity, price")
+            .in_("wallet_id", list(wallet_ids))
+            .gte("date_issued", start.isoformat())
+            .lt("date_issued", _day_after(end))
+            .execute()
+            .data
+            or []
+        )
+        for r in rows:
+            if r.get("kind") in KINDS:
+                totals[r["kind"]] += tx_amount(r)
+            if kind is None or r.get("kind") == kind:
+                totals["count"] += 1
+    return totals
@@ -0,0 +1,72 @@
+"""
+Ledger rollups (wallet_ledger_rollups table).
+
+Isang row per (wallet_id, budget_id, year, month, kind) na may total,
+tx_count at last_activity, para ang dashboard ay magbasa ng
+O(wallets x months) rows imbes na buong ledger.
+
+Read-only dito: ang rollups ay inaayos ng statement-level triggers sa
+wallet_transactions, sa parehong transaction ng add / edit / delete /
+import (kahit galing sa desktop o mobile app). Rebuild / verify ay para
+sa repair at checks lang.
+
+Schema, triggers + RPCs: supabase/migrations/0001_wallet_ledger_rollups.sql
+Ang bawat rollup write ay nagbu-bump din ng view_versions
+(0010_rollup_view_versions.sql).
+"""
+
+ROLLUP_TABLE = "wallet_ledger_rollups"
+KINDS = ("income", "expense")
+
+
+def tx_amount(tx):
+    qty = int(tx.get("quantity") or 0)
+    price = float(tx.get("price") or 0)
+    return qty * price
+
+
+def fetch_rollups(client, wallet_ids=None, budget_ids=None):
+    """Rollup rows for the given wallets or folders."""
+    query = client.table(ROLLUP_TABLE).select(
+        "wallet_id, budget_id, year, month, kind, total, tx_count, last_activity"
+    )
+    if wallet_ids is not None:
+        if not wallet_ids:
+            return []
+        query = query.in_("wallet_id", list(wallet_ids))
+    if budget_ids is not None:
+        if not budget_ids:
+            return []
+        query = query.in_("budget_id", list(budget_ids))
+    return query.execute().data or []
+
+
+def sum_rollups(rows, year=None, month=None):
+    """Return (income, expense) totals, optionally for one year/month."""
+    income = 0.0
+    expense = 0.0
+    for r in rows:
+        if year is not None and r.get("year") != year:
+            continue
+        if month is not None and r.get("month") != month:
+            continue
+        amt = float(r.get("total") or 0)
+        if r.get("kind") == "income":
+            income += amt
+        elif r.get("kind") == "expense":
+            expense += amt
+    return income, expense
+
+
+def rebuild_rollups(client, budget_ids=None):
+    """Recompute rollups from raw rows (lahat kung walang budget_ids)."""
+    params = {"p_budget_ids": list(budget_ids) if budget_ids else None}
+    res = client.rpc("rebuild_wallet_ledger_rollups", params).execute()
+    return res.data
+
+
+def verify_rollups(client, budget_ids=None):
+    """List of mismatching (stored vs raw) rollup keys; empty = OK."""
+    params = {"p_budget_ids": list(budget_ids) if budget_ids else None}
+    res = client.rpc("verify_wallet_ledger_rollups", params).execute()
+    return res.data or []
@@ -0,0 +1,362 @@
+"""
+Outbound email outbox (background sender).
+
+Request handlers enqueue lang; isang background thread ang nagpapadala
+gamit ang iisang authenticated SMTP connection (reused hangga't hindi
+idle nang matagal). Pending mail ay JSON files sa disk, kaya hindi
+nawawala kapag nag-restart ang server: sa unang request ng bawat worker,
+sinisimulan ang sender kapag may naiwang pending. Failed sends are
+retried with exponential backoff.
+
+    outbox.init_app(app)        # sa app.py (MAIL_* config)
+    outbox.enqueue("Subject", ["to@example.com"], body="...", html="...")
+
+Multiple gunicorn workers sa iisang host ay pwedeng mag-share ng
+MAIL_OUTBOX_DIR: bawat file ay kine-claim via atomic rename bago ipadala.
+May reset links / codes ang mail, kaya ang dir ay 0700 at ang files ay
+0600; ang failed/ entries ay binubura pagkalipas ng MAIL_FAILED_TTL.
+
+Local SMTP sink (dev / tests), prints every message it receives:
+    flask --app app pres mail-sink --port 1025
+    MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=0 flask --app app run
+
+Tests (against the sink): python -m unittest tests.test_mail_outbox
+
+Config (app.config / env):
+    MAIL_SERVER, MAIL_PORT, MAIL_USE_TLS, MAIL_USE_SSL, MAIL_USERNAME,
+    MAIL_PASSWORD, MAIL_DEFAULT_SENDER   (same keys as Flask-Mail)
+    MAIL_OUTBOX_DIR        default <tmp>/pockitrack-mail
+    MAIL_MAX_ATTEMPTS      bago ilipat sa failed/ (default 6)
+    MAIL_RETRY_BASE        seconds, doubles per attempt (default 10)
+    MAIL_IDLE_CLOSE        isara ang SMTP connection after N idle seconds (default 60)
+    MAIL_FAILED_TTL        seconds bago burahin ang failed/ entries (default 604800)
+"""
+
+import json
+import os
+import smtplib
+import socketserver
+import tempfile
+import threading
+import time
+import uuid
+from email.message import EmailMessage
+from email.utils import make_msgid
+
+POLL_SECONDS = 5
+PURGE_EVERY = 3600
+STALE_CLAIM_SECONDS = 300
+MAX_BACKOFF = 3600
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class MailOutbox:
+    def __init__(self):
+        self.config = {}
+        self.root = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._smtp = None
+        self._last_used = 0.0
+        self._last_purge = 0.0
+        self._checked_pending = False
+
+    # -------- setup
+
+    def init_app(self, app):
+        cfg = app.config
+        self.config = {
+            "server": cfg.get("MAIL_SERVER") or "localhost",
+            "port": int(cfg.get("MAIL_PORT") or 25),
+            "use_tls": bool(cfg.get("MAIL_USE_TLS")),
+            "use_ssl": bool(cfg.get("MAIL_USE_SSL")),
+            "username": cfg.get("MAIL_USERNAME"),
+            "password": cfg.get("MAIL_PASSWORD"),
+            "sender": cfg.get("MAIL_DEFAULT_SENDER") or cfg.get("MAIL_USERNAME"),
+        }
+        self.max_attempts = max(1, _env_int("MAIL_MAX_ATTEMPTS", 6))
+        self.retry_base = max(1, _env_int("MAIL_RETRY_BASE", 10))
+        self.idle_close = max(1, _env_int("MAIL_IDLE_CLOSE", 60))
+        self.failed_ttl = max(1, _env_int("MAIL_FAILED_TTL", 7 * 86400))
+        self.root = os.getenv("MAIL_OUTBOX_DIR") or os.path.join(
+            tempfile.gettempdir(), "pockitrack-mail"
+        )
+        # private: reset links / codes ay plain text sa JSON files
+        for path in (self.root, os.path.join(self.root, "failed")):
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            os.chmod(path, 0o700)
+        app.extensions["mail_outbox"] = self
+        app.before_request(self._resume_pending)
+
+    def _resume_pending(self):
+        # mail na naiwan ng nakaraang run (o ng namatay na worker): simulan
+        # ang sender sa unang request, hindi sa import (bago mag-fork)
+        if self._checked_pending:
+            return
+        self._checked_pending = True
+        try:
+            if self.pending_count() or self._claimed_files():
+                self._ensure_sender()
+        except OSError as e:
+            print("Error checking mail outbox:", e)
+
+    def _ensure_sender(self):
+        # lazy start: huwag mag-spawn ng thread bago mag-fork ang gunicorn
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="mail-outbox", daemon=True
+                )
+                self._thread.start()
+
+    # -------- API
+
+    def enqueue(self, subject, recipients, body="", html=None, sender=None):
+        """Persist + wake the sender. Returns the outbox id."""
+        if self.root is None:
+            raise RuntimeError("mail outbox not initialized (outbox.init_app)")
+        mail_id = f"{time.time():.6f}-{uuid.uuid4().hex}"
+        item = {
+            "id": mail_id,
+            "subject": subject,
+            "recipients": list(recipients),
+            "sender": sender or self.config.get("sender"),
+            "body": body or "",
+            "html": html,
+            "attempts": 0,
+            "next_attempt_at": 0,
+            "last_error": None,
+        }
+        self._write(self._path(mail_id), item)
+        self._ensure_sender()
+        self._wake.set()
+        return mail_id
+
+    def pending_count(self):
+        return len(self._pending_files())
+
+    def failed_count(self):
+        return len(
+            [f for f in os.listdir(os.path.join(self.root, "failed")) if f.endswith(".json")]
+        )
+
+    # -------- storage
+
+    def _path(self, mail_id):
+        return os.path.join(self.root, f"{mail_id}.json")
+
+    def _write(self, path, item):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(item, f)
+        os.replace(tmp, path)
+
+    def _pending_files(self):
+        return sorted(f for f in os.listdir(self.root) if f.endswith(".json"))
+
+    def _claimed_files(self):
+        return [f for f in os.listdir(self.root) if f.endswith(".sending")]
+
+    def _recover_stale_claims(self):
+        # worker na namatay habang nagpapadala -> ibalik sa queue
+        now = time.time()
+        for name in self._claimed_files():
+            path = os.path.join(self.root, name)
+            try:
+                if now - os.path.getmtime(path) > STALE_CLAIM_SECONDS:
+                    os.replace(path, os.path.join(self.root, name.split(".json.")[0] + ".json"))
+            except OSError:
+                pass
+
+    def purge_failed(self):
+        """Burahin ang failed/ entries na lampas MAIL_FAILED_TTL. Returns count."""
+        failed_dir = os.path.join(self.root, "failed")
+        cutoff = time.time() - self.failed_ttl
+        removed = 0
+        for name in os.listdir(failed_dir):
+            path = os.path.join(failed_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    # -------- sender
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                self._recover_stale_claims()
+                self._drain()
+                if time.time() - self._last_purge > PURGE_EVERY:
+                    self._last_purge = time.time()
+                    self.purge_failed()
+            except Exception as e:
+                print("Error in mail outbox:", e)
+            if self._smtp is not None and time.time() - self._last_used > self.idle_close:
+                self._close()
+            self._wake.wait(POLL_SECONDS)
+
+    def _drain(self):
+        for name in self._pending_files():
+            path = os.path.join(self.root, name)
+            claimed = f"{path}.{os.getpid()}.sending"
+            try:
+                os.replace(path, claimed)  # atomic claim
+                with open(claimed, encoding="utf-8") as f:
+                    item = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if item.get("next_attempt_at", 0) > time.time():
+                os.replace(claimed, path)
+                continue
+
+            try:
+                self._send(item)
+            except Exception as e:
+                item["attempts"] = int(item.get("attempts") or 0) + 1
+                item["last_error"] = str(e)
+                print(f"Error sending mail {item['id']} (attempt {item['attempts']}):", e)
+                if item["attempts"] >= self.max_attempts:
+                    self._write(os.path.join(self.root, "failed", name), item)
+                else:
+                    delay = min(MAX_BACKOFF, self.retry_base * 2 ** (item["attempts"] - 1))
+                    item["next_attempt_at"] = time.time() + delay
+                    self._write(path, item)
+                os.remove(claimed)
+                continue
+            os.remove(claimed)
+
+    def _connect(self):
+        cfg = self.config
+        if cfg["use_ssl"]:
+            smtp = smtplib.SMTP_SSL(cfg["server"], cfg["port"], timeout=30)
+        else:
+            smtp = smtplib.SMTP(cfg["server"], cfg["port"], timeout=30)
+            if cfg["use_tls"]:
+                smtp.starttls()
+        if cfg["username"] and cfg["password"]:
+            smtp.login(cfg["username"], cfg["password"])
+        return smtp
+
+    def _close(self):
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+    def _send(self, item):
+        msg = EmailMessage()
+        msg["Subject"] = item["subject"]
+        msg["From"] = item["sender"]
+        msg["To"] = ", ".join(item["recipients"])
+        msg["Message-ID"] = make_msgid(domain="pockitrack")
+        msg.set_content(item["body"] or "")
+        if item.get("html"):
+            msg.add_alternative(item["html"], subtype="html")
+
+        for attempt in (1, 2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(msg)
+                self._last_used = time.time()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # reused connection na na-drop ng server: isang reconnect
+                self._smtp = None
+                if attempt == 2:
+                    raise
+
+
+outbox = MailOutbox()
+
+
+def _reset_after_fork():
+    # gunicorn --preload: bawat worker ay may sariling sender + SMTP connection
+    outbox._lock = threading.Lock()
+    outbox._wake = threading.Event()
+    outbox._thread = None
+    outbox._smtp = None
+    outbox._checked_pending = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# -----------------------
+# Local SMTP sink (dev / tests)
+# -----------------------
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP: tinatanggap lahat, ipinapasa sa server.on_message."""
+
+    def _reply(self, line):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        self.server.connections += 1
+        self._reply("220 pockitrack-sink ready")
+        mail_from, rcpts = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode("utf-8", "replace").strip()
+            verb = cmd[:4].upper()
+            if verb in ("HELO", "EHLO"):
+                self._reply("250 pockitrack-sink")
+            elif verb == "MAIL":
+                mail_from, rcpts = cmd[10:].strip(" <>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpts.append(cmd[8:].strip(" <>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                self.server.on_message(mail_from, rcpts, b"".join(data))
+                self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=1025, on_message=None):
+        self.messages = []
+        self.connections = 0
+        self._on_message = on_message
+        super().__init__((host, port), _SinkHandler)
+
+    def on_message(self, mail_from, rcpts, data):
+        self.messages.append((mail_from, rcpts, data))
+        if self._on_message:
+            self._on_message(mail_from, rcpts, data)
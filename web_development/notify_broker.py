@@ -0,0 +1,204 @@
+"""
+Pub/sub broker para sa OSAS notifications (Server-Sent Events).
+
+Imbes na mag-poll ang bawat OSAS tab, naka-subscribe sila sa isang SSE
+stream; ang mga gumagawa ng notification ay nagpa-publish dito:
+
+    broker.publish(OSAS_CHANNEL, {"type": "notification", "report_id": 88})
+
+    with broker.subscribe(OSAS_CHANNEL) as sub:
+        event = sub.get(timeout=15)   # dict, or None kapag walang dumating
+
+Backend is pluggable: anything with start(deliver) / publish(channel, data)
+works. LocalBackend = in-process lang (isang worker); RedisBackend =
+shared ng lahat ng gunicorn workers / hosts (needs `pip install redis`).
+
+Config (env):
+    NOTIFY_BACKEND       local (default) | redis
+    NOTIFY_REDIS_URL     default redis://localhost:6379/0
+    NOTIFY_QUEUE_SIZE    max pending events per subscriber (default 100)
+    NOTIFY_REDIS_RETRY   max seconds between Redis reconnects (default 30)
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+OSAS_CHANNEL = "osas"
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class LocalBackend:
+    """In-process fan-out (default)."""
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, channel, data):
+        self._deliver(channel, data)
+
+
+class RedisBackend:
+    """Redis PUBLISH / PSUBSCRIBE: events reach every worker."""
+
+    def __init__(self, url=None, prefix="pockitrack:notify:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("NOTIFY_BACKEND=redis needs the redis package")
+        self._redis = redis.Redis.from_url(
+            url or os.getenv("NOTIFY_REDIS_URL", "redis://localhost:6379/0")
+        )
+        self.prefix = prefix
+
+    def start(self, deliver):
+        max_wait = max(1, _env_int("NOTIFY_REDIS_RETRY", 30))
+
+        def listen():
+            # reconnect loop: kapag naputol ang Redis, subscribe ulit
+            # (events habang disconnected ay wala na; magre-reload ang JS
+            # sa susunod na event / reconnect ng SSE)
+            wait = 1
+            while True:
+                pubsub = None
+                try:
+                    pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                    pubsub.psubscribe(self.prefix + "*")
+                    wait = 1
+                    for msg in pubsub.listen():
+                        try:
+                            channel = msg["channel"].decode()[len(self.prefix):]
+                            deliver(channel, msg["data"].decode())
+                        except Exception as e:
+                            print("Error delivering notification event:", e)
+                except Exception as e:
+                    print(f"Error in Redis notification listener, retrying in {wait}s:", e)
+                finally:
+                    if pubsub is not None:
+                        try:
+                            pubsub.close()
+                        except Exception:
+                            pass
+                time.sleep(wait)
+                wait = min(wait * 2, max_wait)
+
+        threading.Thread(target=listen, name="notify-redis", daemon=True).start()
+
+    def publish(self, channel, data):
+        self._redis.publish(self.prefix + channel, data)
+
+
+class Subscription:
+    def __init__(self, broker, channel, maxsize):
+        self._broker = broker
+        self.channel = channel
+        self._q = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        try:
+            self._q.put_nowait(event)
+        except queue.Full:
+            # mabagal na client: i-drop (magre-reload naman ng list ang JS)
+            pass
+
+    def get(self, timeout=None):
+        try:
+            return self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Broker:
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._subs = {}  # channel -> set of Subscription
+        self._lock = threading.Lock()
+        self._started = False
+
+    def set_backend(self, backend):
+        with self._lock:
+            self.backend = backend
+            self._started = False
+
+    def _ensure_started(self):
+        # lazy start: huwag mag-spawn ng threads bago mag-fork ang gunicorn
+        with self._lock:
+            if self._started:
+                return
+            if self.backend is None:
+                self.backend = _backend_from_env()
+            self.backend.start(self._deliver)
+            self._started = True
+
+    def _deliver(self, channel, data):
+        try:
+            event = json.loads(data)
+        except ValueError:
+            return
+        with self._lock:
+            subs = list(self._subs.get(channel, ()))
+        for sub in subs:
+            sub.put(event)
+
+    def publish(self, channel, event):
+        """Best effort: hindi pinapabagsak ang caller kapag may error."""
+        try:
+            self._ensure_started()
+            self.backend.publish(channel, json.dumps(event, default=str))
+        except Exception as e:
+            print("Error publishing notification event:", e)
+
+    def subscribe(self, channel):
+        self._ensure_started()
+        sub = Subscription(self, channel, max(1, _env_int("NOTIFY_QUEUE_SIZE", 100)))
+        with self._lock:
+            self._subs.setdefault(channel, set()).add(sub)
+        return sub
+
+    def _unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subs.get(sub.channel)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subs.get(channel, ()))
+
+
+def _backend_from_env():
+    if os.getenv("NOTIFY_BACKEND", "local").lower() == "redis":
+        return RedisBackend()
+    return LocalBackend()
+
+
+def _reset_after_fork():
+    # subscribers / listener thread ng parent ay hindi kasama sa child
+    broker._lock = threading.Lock()
+    broker._subs = {}
+    broker._started = False
+
+
+broker = Broker()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
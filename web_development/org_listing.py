@@ -0,0 +1,143 @@
+"""
+OSAS organization listing: projected, searchable, keyset-paginated.
+
+Binabasa ang public.osas_organization_list view (see
+supabase/migrations/0008_organization_listing.sql) -- walang password
+hash, may dept_name na, at lahat ng filter ay sa server:
+
+    orgs, next_cursor = fetch_org_page(
+        supabase, status="Active", department_id=4, search="acc",
+        match="contains", sort="name", limit=50, after=token,
+    )
+
+sort: name | username | created (id); "-name" para descending.
+limit=None -> lahat (legacy callers, e.g. dashboard).
+"""
+
+import base64
+import json
+
+ORG_VIEW = "osas_organization_list"
+ORG_COLUMNS = (
+    "id, org_name, username, department_id, dept_name, "
+    "accreditation_date, status, created_by"
+)
+SORTS = {"name": "org_name", "username": "username", "created": "id"}
+MATCHES = ("prefix", "contains")
+DEFAULT_PAGE = 50
+MAX_PAGE = 200
+MAX_SEARCH = 100
+
+
+def parse_limit(value, default=DEFAULT_PAGE):
+    """'limit' query param -> 1..MAX_PAGE. ValueError kung hindi number."""
+    if value in (None, ""):
+        return default
+    return max(1, min(MAX_PAGE, int(value)))
+
+
+def parse_sort(value):
+    """'name' / '-username' / ... -> (column, desc). ValueError kung hindi kilala."""
+    value = (value or "name").strip()
+    desc = value.startswith("-")
+    key = value.lstrip("-")
+    if key not in SORTS:
+        raise ValueError(f"Unknown sort: {key}")
+    return SORTS[key], desc
+
+
+def encode_cursor(row, column):
+    raw = json.dumps([row.get(column), int(row["id"])])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Token -> (sort value, id). ValueError kung sira."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, org_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return value, int(org_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _quote(value):
+    # PostgREST or=(...) value: i-quote para safe ang comma / parens
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _search_pattern(term, match):
+    # literal ang \ / % / _ ng user (LIKE escape = backslash). Ang * ay
+    # ginagawang % ng PostgREST kahit naka-escape, kaya "_" (isang kahit
+    # anong char) ang pinakamalapit: "a*b" -> tumutugma pa rin sa "a*b".
+    term = (
+        term.replace("\\", "\\\\")
+        .replace("%", "\\%")
+        .replace("_", "\\_")
+        .replace("*", "_")
+    )
+    return f"{term}*" if match == "prefix" else f"*{term}*"
+
+
+def to_api(row):
+    """View row -> shape na gamit ng OSAS JS (walang password)."""
+    return {
+        "id": row["id"],
+        "name": row["org_name"],
+        "department_id": row.get("department_id"),
+        "department": row.get("dept_name") or "-",
+        "username": row["username"],
+        "date": str(row.get("accreditation_date")),
+        "status": row.get("status"),
+        "created_by": row.get("created_by"),
+    }
+
+
+def fetch_org_page(
+    client, status="Active", department_id=None, search=None, match="contains",
+    sort="name", limit=DEFAULT_PAGE, after=None,
+):
+    """One page (API shape). Returns (orgs, next_cursor or None)."""
+    if match not in MATCHES:
+        raise ValueError(f"Unknown match: {match}")
+    column, desc = parse_sort(sort)
+
+    query = client.table(ORG_VIEW).select(ORG_COLUMNS)
+    if status:
+        query = query.eq("status", status)
+    if department_id:
+        query = query.eq("department_id", int(department_id))
+
+    term = (search or "").strip()[:MAX_SEARCH]
+    if term:
+        pattern = _search_pattern(term, match)
+        query = query.or_(
+            f"org_name.ilike.{_quote(pattern)},username.ilike.{_quote(pattern)}"
+        )
+
+    if after:
+        value, org_id = decode_cursor(after)
+        op = "lt" if desc else "gt"
+        if column == "id":
+            query = query.filter("id", op, org_id)
+        else:
+            query = query.or_(
+                f"{column}.{op}.{_quote(value)},"
+                f"and({column}.eq.{_quote(value)},id.{op}.{org_id})"
+            )
+
+    query = query.order(column, desc=desc)
+    if column != "id":
+        query = query.order("id", desc=desc)
+
+    if limit is None:
+        return [to_api(r) for r in (query.execute().data or [])], None
+
+    # +1 row para malaman kung may kasunod pa
+    rows = query.limit(limit + 1).execute().data or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1], column)
+    return [to_api(r) for r in rows], next_cursor
@@ -0,0 +1,102 @@
+"""
+OSAS notification feed, per-admin unread counter at bulk mark-read.
+
+Ang read state ay per admin (see
+supabase/migrations/0007_osas_notification_unread.sql); ang unread count
+ay maintained ng trigger kaya ang bell ay isang single-row read:
+
+    unread_count(supabase, admin_id)                       # -> 3
+    items, next_cursor, unread = fetch_feed(supabase, admin_id, limit=20)
+    mark_read(supabase, admin_id, ids=[4, 5])              # -> new unread count
+    mark_read(supabase, admin_id, before="2025-11-03T08:00:00+00:00")
+
+Feed order is (created_at, id) newest first; cursor = opaque token ng
+huling item ng page.
+"""
+
+import base64
+from datetime import datetime
+
+STATE_TABLE = "osas_notification_state"
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_IDS = 500
+
+
+def encode_cursor(item):
+    raw = f"{item['created_at']}|{int(item['id'])}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Token -> (created_at iso, id). ValueError kung sira."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, notif_id = (
+            base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        )
+        datetime.fromisoformat(created_at)
+        return created_at, int(notif_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_limit(value):
+    if value in (None, ""):
+        return DEFAULT_LIMIT
+    return max(1, min(MAX_LIMIT, int(value)))
+
+
+def parse_timestamp(value):
+    """ISO timestamp (body / query) -> normalized string. ValueError kung mali."""
+    text = str(value or "").strip().replace("Z", "+00:00")
+    return datetime.fromisoformat(text).isoformat()
+
+
+def _refresh(client, admin_id):
+    res = client.rpc("refresh_osas_unread", {"p_admin_id": admin_id}).execute()
+    return int(res.data or 0)
+
+
+def unread_count(client, admin_id):
+    """Bell badge: isang row lang (gagawin ang row sa unang beses)."""
+    res = (
+        client.table(STATE_TABLE)
+        .select("unread_count")
+        .eq("admin_id", admin_id)
+        .limit(1)
+        .execute()
+    )
+    if res.data:
+        return int(res.data[0]["unread_count"] or 0)
+    return _refresh(client, admin_id)
+
+
+def fetch_feed(client, admin_id, limit=DEFAULT_LIMIT, after=None):
+    """One page (isang RPC). Returns (items, next_cursor or None, unread_count)."""
+    params = {"p_admin_id": admin_id, "p_limit": limit}
+    if after:
+        params["p_before_at"], params["p_before_id"] = decode_cursor(after)
+    data = client.rpc("osas_notification_feed", params).execute().data or {}
+
+    items = data.get("items") or []
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1])
+
+    unread = data.get("unread_count")
+    if unread is None:
+        unread = _refresh(client, admin_id)
+    return items, next_cursor, int(unread)
+
+
+def mark_read(client, admin_id, ids=None, before=None):
+    """ids (list) at/o before (ISO timestamp). Returns the new unread count."""
+    params = {"p_admin_id": admin_id, "p_ids": None, "p_before": None}
+    if ids:
+        params["p_ids"] = [int(i) for i in ids][:MAX_IDS]
+    if before:
+        params["p_before"] = parse_timestamp(before)
+    res = client.rpc("mark_osas_notifications_read", params).execute()
+    return int(res.data or 0)
@@ -7,19 +7,37 @@ from flask import (
     flash,
     session,
     jsonify,
+    g,
 )
-from werkzeug.security import check_password_hash, generate_password_hash
-from supabase import create_client
 import os
+import json
+import time
 from dotenv import load_dotenv
 import random
 import string
 from datetime import datetime
 import uuid
+import click
 from io import BytesIO
 from docx import Document
-from flask import send_file
+from flask import send_file, Response, stream_with_context
+from functools import partial
 from docx.shared import Inches
+from receipt_renditions import print_path_of
+from receipt_fetcher import fetch_receipts
+from report_export import stream_zip, render_in_pool, safe_name
+from passwords import hash_password, verify_password
+from audit_buffer import audit
+from org_listing import fetch_org_page, parse_limit as parse_org_limit
+from compliance import compliance
+from view_versions import is_not_modified, make_etag, not_modified, with_etag
+from pres_view.app import (
+    BUCKET_ARCHIVES,
+    BUCKET_RECEIPTS,
+    gather_archive_report,
+    persist_archive_artifact,
+    render_archive_report_docx,
+)
 
 load_dotenv()
 
@@ -31,9 +49,11 @@ osas = Blueprint(
     static_folder="static",
 )
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Shared pooled Supabase client (see db.py)
+from db import supabase
+from folder_cache import folders
+from notify_broker import OSAS_CHANNEL, broker
+import osas_notifications as notif_feed
 
 
 def generate_username():
@@ -52,6 +72,47 @@ def get_admin_data(username):
     return None
 
 
+def remember_admin(admin):
+    """Login: id + role sa session para wala nang username lookup per request."""
+    session["osas_admin"] = admin["username"]
+    session["osas_admin_id"] = admin["id"]
+    session["osas_role"] = admin.get("role")
+    g.osas_admin = {
+        "id": admin["id"],
+        "username": admin["username"],
+        "role": admin.get("role"),
+    }
+
+
+def current_admin():
+    """{"id", "username", "role"} ng logged-in admin, o None.
+
+    Galing sa session (set sa login); memoized sa flask.g per request.
+    Lumang session na walang id -> isang lookup, tapos naka-session na.
+    """
+    if "osas_admin" not in g:
+        admin = None
+        username = session.get("osas_admin")
+        if username and session.get("osas_admin_id") is not None:
+            admin = {
+                "id": session["osas_admin_id"],
+                "username": username,
+                "role": session.get("osas_role"),
+            }
+        elif username:
+            row = get_admin_data(username)
+            if row:
+                remember_admin(row)
+                admin = g.osas_admin
+        g.osas_admin = admin
+    return g.osas_admin
+
+
+def current_admin_id():
+    admin = current_admin()
+    return admin["id"] if admin else None
+
+
 MONTH_LABELS = {
     "august": "August",
     "september": "September",
@@ -69,7 +130,7 @@ MONTH_LABELS = {
 def create_report_notification(org_id, report_id, org_name, status, month_key):
     month_label = MONTH_LABELS.get(month_key.lower(), month_key.title())
     message = f'has a report "{status} for {month_label}"'
-    supabase.table("osas_notifications").insert(
+    res = supabase.table("osas_notifications").insert(
         {
             "org_id": org_id,
             "report_id": report_id,
@@ -81,29 +142,35 @@ def create_report_notification(org_id, report_id, org_name, status, month_key):
             "created_at": datetime.utcnow().isoformat(),
         }
     ).execute()
+    # push sa naka-open na OSAS tabs (SSE)
+    for row in res.data or []:
+        broker.publish(OSAS_CHANNEL, {"type": "notification", **row})
 
 
 def log_activity(admin_id, action_type, description):
-    supabase.table("osas_activity_log").insert(
+    # write-behind: buffered, flushed as multi-row inserts (see audit_buffer.py)
+    audit.add(
+        "osas_activity_log",
         {
             "admin_id": admin_id,
             "action_type": action_type,
             "description": description,
             "created_at": datetime.utcnow().isoformat(),
-        }
-    ).execute()
+        },
+    )
 
 
 def log_admin_audit(admin_id, field, old_value, new_value):
-    supabase.table("osas_admin_audit").insert(
+    audit.add(
+        "osas_admin_audit",
         {
             "admin_id": admin_id,
             "changed_field": field,
             "old_value": old_value,
             "new_value": new_value,
             "changed_at": datetime.utcnow().isoformat(),
-        }
-    ).execute()
+        },
+    )
 
 
 # ========== AUTH & NAV ===========
@@ -114,8 +181,16 @@ def osas_login():
         password = request.form["password"]
         admin = get_admin_data(username)
         if admin:
-            if check_password_hash(admin["password"], password):
-                session["osas_admin"] = username
+            ok, new_hash = verify_password(admin["password"], password)
+            if ok:
+                if new_hash:
+                    try:
+                        supabase.table("osas_admin").update({"password": new_hash}).eq(
+                            "id", admin["id"]
+                        ).eq("password", admin["password"]).execute()
+                    except Exception as e:
+                        print("Error rehashing password:", e)
+                remember_admin(admin)
                 log_activity(admin["id"], "login", f"Admin {username} logged in")
                 # ... sessions insert ...
                 flash("OSAS login successful!", "success")
@@ -136,22 +211,22 @@ def osas_dashboard():
 
 @osas.route("/logout")
 def osas_logout():
-    username = session.get("osas_admin")
-    if username:
-        admin = get_admin_data(username)
-        if admin:
-            log_activity(admin["id"], "logout", f"Admin {username} logged out")
-            device_info = request.user_agent.string
-            ip_address = request.remote_addr or "Unknown"
-            supabase.table("osas_sessions").update(
-                {"is_current": False, "last_active_at": datetime.utcnow().isoformat()}
-            ).eq("admin_id", admin["id"]).eq("device_info", device_info).eq(
-                "ip_address", ip_address
-            ).execute()
+    admin = current_admin()
+    if admin:
+        username = admin["username"]
+        log_activity(admin["id"], "logout", f"Admin {username} logged out")
+        device_info = request.user_agent.string
+        ip_address = request.remote_addr or "Unknown"
+        supabase.table("osas_sessions").update(
+            {"is_current": False, "last_active_at": datetime.utcnow().isoformat()}
+        ).eq("admin_id", admin["id"]).eq("device_info", device_info).eq(
+            "ip_address", ip_address
+        ).execute()
 
     # HUWAG na session.clear() para di ma‑logout ang PRES
     session.pop("osas_admin", None)
-    session.pop("osas_role", None)  # kung meron kang ganitong key
+    session.pop("osas_admin_id", None)
+    session.pop("osas_role", None)
     session.pop("osas_permissions", None)  # at iba pang OSAS-only keys
 
     return redirect(url_for("osas.osas_login"))
@@ -166,35 +241,125 @@ def osas_reports():
 
 @osas.route("/api/admin/notifications", methods=["GET"])
 def get_admin_notifications():
+    """
+    Feed ng current admin (newest first, per-admin is_read).
+    ?limit=20&cursor=<next_cursor>; unread_count ay galing sa counter,
+    kaya kasama ang mas lumang unread items.
+    """
     if "osas_admin" not in session:
         return jsonify({"error": "Not logged in"}), 401
 
     try:
-        res = (
-            supabase.table("osas_notifications")
-            .select("id, org_id, report_id, org_name, message, created_at, is_read")
-            .order("created_at", desc=True)
-            .limit(20)
-            .execute()
+        limit = notif_feed.parse_limit(request.args.get("limit"))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    try:
+        items, next_cursor, unread = notif_feed.fetch_feed(
+            supabase, current_admin_id(), limit=limit, after=request.args.get("cursor")
         )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Error loading notifications:", e)
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(
+        {
+            "notifications": items,
+            "has_unread": unread > 0,
+            "unread_count": unread,
+            "next_cursor": next_cursor,
+        }
+    )
 
-        items = res.data or []
-        has_unread = any(not n.get("is_read") for n in items)
 
-        return jsonify({"notifications": items, "has_unread": has_unread})
+@osas.route("/api/admin/notifications/unread-count", methods=["GET"])
+def get_admin_unread_count():
+    """Bell badge (single-row read)."""
+    if "osas_admin" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    try:
+        unread = notif_feed.unread_count(supabase, current_admin_id())
+        return jsonify({"unread_count": unread, "has_unread": unread > 0})
     except Exception as e:
+        print("Error reading unread count:", e)
         return jsonify({"error": str(e)}), 500
 
 
+@osas.route("/api/admin/notifications/mark-read", methods=["POST"])
+def mark_notifications_read():
+    """
+    Bulk mark-read: {"ids": [1, 2, 3]} at/o {"before": "<ISO timestamp>"}
+    (lahat ng notifications hanggang doon). Returns the new unread count.
+    """
+    if "osas_admin" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids") or []
+    before = data.get("before")
+    if not isinstance(ids, list) or (not ids and not before):
+        return jsonify({"error": "Provide ids or before"}), 400
+
+    admin_id = current_admin_id()
+    try:
+        unread = notif_feed.mark_read(supabase, admin_id, ids=ids, before=before)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid ids or before"}), 400
+    except Exception as e:
+        print("Error marking notifications read:", e)
+        return jsonify({"error": str(e)}), 500
+
+    broker.publish(OSAS_CHANNEL, {"type": "read", "admin_id": admin_id})
+    return jsonify({"success": True, "unread_count": unread})
+
+
+@osas.route("/api/admin/notifications/stream", methods=["GET"])
+def stream_admin_notifications():
+    """
+    Server-Sent Events: "notification" / "read" events mula sa notify_broker.
+    Ang "read" ay per admin, kaya sa sariling stream lang ng admin na iyon.
+    Comment ping every SSE_KEEPALIVE seconds; ang stream ay sinasara after
+    SSE_MAX_SECONDS (EventSource reconnects) para hindi naiipit ang workers.
+    Needs threaded workers (e.g. gunicorn -k gthread --threads 8).
+    """
+    if "osas_admin" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+
+    keepalive = max(1, int(os.getenv("SSE_KEEPALIVE", 15)))
+    max_seconds = max(keepalive, int(os.getenv("SSE_MAX_SECONDS", 300)))
+    admin_id = current_admin_id()
+
+    def events():
+        with broker.subscribe(OSAS_CHANNEL) as sub:
+            yield "retry: 3000\n\n"
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                event = sub.get(timeout=keepalive)
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                kind = event.get("type") or "message"
+                if kind == "read" and event.get("admin_id") != admin_id:
+                    continue
+                yield f"event: {kind}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    resp = Response(stream_with_context(events()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx: huwag i-buffer
+    return resp
+
+
 @osas.route("/api/admin/notifications/<int:notif_id>/read", methods=["POST"])
 def mark_notification_read(notif_id):
     if "osas_admin" not in session:
         return jsonify({"error": "Not logged in"}), 401
+    admin_id = current_admin_id()
     try:
-        supabase.table("osas_notifications").update({"is_read": True}).eq(
-            "id", notif_id
-        ).execute()
-        return jsonify({"success": True})
+        unread = notif_feed.mark_read(supabase, admin_id, ids=[notif_id])
+        broker.publish(OSAS_CHANNEL, {"type": "read", "admin_id": admin_id})
+        return jsonify({"success": True, "unread_count": unread})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -223,88 +388,73 @@ def osas_archive():
 # ========== ORGANIZATION API ===========
 @osas.route("/api/organizations", methods=["GET"])
 def get_organizations():
-    department = request.args.get("department")
-
-    # Get ALL departments first (single query)
-    all_depts = supabase.table("departments").select("id, dept_name").execute()
-    dept_map = {d["id"]: d["dept_name"] for d in (all_depts.data or [])}
+    """
+    Active orgs (projected, walang password). Query params:
+      department_id, department (legacy: name), q (search), match=prefix|contains,
+      sort=name|username|created (prefix "-" = desc), limit + cursor (keyset).
+    Walang limit -> lahat (legacy).
+    """
+    return list_organizations_response("Active")
 
-    # Build query
-    dept_id = None
-    if department and department != "All Departments":
-        for dept in all_depts.data or []:
-            if dept["dept_name"] == department:
-                dept_id = dept["id"]
-                break
 
-    org_query = supabase.table("organizations").select("*").eq("status", "Active")
-    if dept_id:
-        org_query = org_query.eq("department_id", dept_id)
+@osas.route("/api/archived_organizations", methods=["GET"])
+def get_archived_organizations():
+    """Archived orgs; same query params as /api/organizations."""
+    return list_organizations_response("Archived")
 
-    result = org_query.execute()
 
-    orgs = []
-    if result.data:
-        for org in result.data:
-            dept_name = (
-                dept_map.get(org.get("department_id"), "-")
-                if org.get("department_id")
-                else "-"
-            )
-            orgs.append(
-                {
-                    "id": org["id"],
-                    "name": org["org_name"],
-                    "department": dept_name,
-                    "username": org["username"],
-                    "password": org["password"],
-                    "date": str(org.get("accreditation_date")),
-                    "status": org.get("status"),
-                    "created_by": org.get("created_by"),
-                }
+def list_organizations_response(status):
+    if "osas_admin" not in session:
+        return jsonify({"error": "Login required"}), 401
+    try:
+        department_id = request.args.get("department_id", type=int)
+        department = request.args.get("department")
+        if not department_id and department and department != "All Departments":
+            d = (
+                supabase.table("departments")
+                .select("id")
+                .eq("dept_name", department)
+                .limit(1)
+                .execute()
             )
+            if not d.data:
+                return jsonify({"organizations": [], "next_cursor": None})
+            department_id = d.data[0]["id"]
+
+        limit = request.args.get("limit")
+        orgs, next_cursor = fetch_org_page(
+            supabase,
+            status=status,
+            department_id=department_id,
+            search=request.args.get("q"),
+            match=request.args.get("match") or "contains",
+            sort=request.args.get("sort"),
+            limit=parse_org_limit(limit) if limit else None,
+            after=request.args.get("cursor") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Error listing organizations:", e)
+        return jsonify({"error": str(e)}), 500
 
-    return jsonify({"organizations": orgs})
+    return jsonify({"organizations": orgs, "next_cursor": next_cursor})
 
 
 @osas.route("/api/organizations_with_reports", methods=["GET"])
 def get_organizations_with_reports():
     """
     Single optimized endpoint:
-    - 1 query for active orgs + dept names
+    - 1 query for active orgs + dept names (projected view)
     - 1 query for OSAS financial_reports master rows
     Returns: { organizations: [...], reports: [...] }
     """
-    # 1) Load all active orgs + dept names (same logic as /api/organizations)
-    all_depts = supabase.table("departments").select("id, dept_name").execute()
-    dept_map = {d["id"]: d["dept_name"] for d in (all_depts.data or [])}
-
-    org_result = (
-        supabase.table("organizations").select("*").eq("status", "Active").execute()
-    )
+    if "osas_admin" not in session:
+        return jsonify({"error": "Login required"}), 401
 
-    orgs = []
-    org_ids = []
-    if org_result.data:
-        for org in org_result.data:
-            dept_name = (
-                dept_map.get(org.get("department_id"), "-")
-                if org.get("department_id")
-                else "-"
-            )
-            orgs.append(
-                {
-                    "id": org["id"],
-                    "name": org["org_name"],
-                    "department": dept_name,
-                    "username": org["username"],
-                    "password": org["password"],
-                    "date": str(org.get("accreditation_date")),
-                    "status": org.get("status"),
-                    "created_by": org.get("created_by"),
-                }
-            )
-            org_ids.append(org["id"])
+    # 1) Load all active orgs + dept names (same view as /api/organizations)
+    orgs, _ = fetch_org_page(supabase, status="Active", limit=None)
+    org_ids = [o["id"] for o in orgs]
 
     # 2) Load ALL OSAS financial_reports rows for those orgs in ONE query
     reports = []
@@ -322,38 +472,26 @@ def get_organizations_with_reports():
     return jsonify({"organizations": orgs, "reports": reports})
 
 
-@osas.route("/api/archived_organizations", methods=["GET"])
-def get_archived_organizations():
-    # Get ALL departments first (single query)
-    all_depts = supabase.table("departments").select("id, dept_name").execute()
-    dept_map = {d["id"]: d["dept_name"] for d in (all_depts.data or [])}
-
-    result = (
-        supabase.table("organizations").select("*").eq("status", "Archived").execute()
-    )
-
-    orgs = []
-    if result.data:
-        for org in result.data:
-            dept_name = (
-                dept_map.get(org.get("department_id"), "-")
-                if org.get("department_id")
-                else "-"
-            )
-            orgs.append(
-                {
-                    "id": org["id"],
-                    "name": org["org_name"],
-                    "department": dept_name,
-                    "username": org["username"],
-                    "password": org["password"],
-                    "date": str(org.get("accreditation_date")),
-                    "status": org.get("status"),
-                    "created_by": org.get("created_by"),
-                }
-            )
+@osas.route("/api/compliance_matrix", methods=["GET"])
+def get_compliance_matrix():
+    """
+    Org x month grid (received / submitted / missing) + department counts.
+    Precomputed sa DB (osas_compliance), cached per process (see compliance.py).
+    Query: department_id (optional).
+    """
+    if "osas_admin" not in session:
+        return jsonify({"error": "Login required"}), 401
+    try:
+        department_id = request.args.get("department_id", type=int)
+        matrix, stamp = compliance.get(supabase, department_id=department_id)
+    except Exception as e:
+        print("Error loading compliance matrix:", e)
+        return jsonify({"error": str(e)}), 500
 
-    return jsonify({"organizations": orgs})
+    etag = make_etag("compliance_matrix", 0, stamp)
+    if is_not_modified(etag):
+        return not_modified(etag)
+    return with_etag(jsonify(matrix), etag)
 
 
 @osas.route("/api/archive/empty", methods=["DELETE"])
@@ -362,9 +500,32 @@ def empty_archive():
         return jsonify({"error": "Not logged in"}), 401
 
     try:
-        admin = get_admin_data(session["osas_admin"])
-        admin_id = admin["id"] if admin else None
-        supabase.table("organizations").delete().eq("status", "Archived").execute()
+        admin_id = current_admin_id()
+        # wallets (at folders) ay cascade-deleted kasama ng orgs
+        org_ids = [
+            o["id"]
+            for o in (
+                supabase.table("organizations")
+                .select("id")
+                .eq("status", "Archived")
+                .execute()
+                .data
+                or []
+            )
+        ]
+        wallets = []
+        if org_ids:
+            wallets = (
+                supabase.table("wallets")
+                .select("id")
+                .in_("organization_id", org_ids)
+                .execute()
+                .data
+                or []
+            )
+            supabase.table("organizations").delete().in_("id", org_ids).execute()
+        for w in wallets:
+            folders.forget_wallet(w["id"])
 
         if admin_id:
             log_activity(admin_id, "archive", "Emptied organization archive")
@@ -387,7 +548,7 @@ def add_organization():
     accreditation_date = data.get("accreditationDate")
     status = "Active"
     department_id = data.get("department_id")
-    admin = get_admin_data(session["osas_admin"])
+    admin = current_admin()
 
     # check duplicate
     existing = (
@@ -399,7 +560,7 @@ def add_organization():
     if existing.data and len(existing.data) > 0:
         return jsonify({"error": "Organization name or username already exists"}), 400
 
-    hashed_password = generate_password_hash(password)
+    hashed_password = hash_password(password)
     org_result = (
         supabase.table("organizations")
         .insert(
@@ -452,6 +613,7 @@ def add_organization():
             # optional: huwag pabagsakin ang add_organization kung mag-fail ito
             print("Failed to create default PRES profile row:", e)
 
+        compliance.invalidate()
         dept_name = "-"
 
         if department_id:
@@ -492,7 +654,7 @@ def update_organization(org_id):
         "org_name": data.get("orgName"),
         "username": data.get("username"),
         "password": (
-            generate_password_hash(data.get("password"))
+            hash_password(data.get("password"))
             if data.get("password")
             else None
         ),
@@ -504,7 +666,8 @@ def update_organization(org_id):
     result = supabase.table("organizations").select("*").eq("id", org_id).execute()
     old_org = result.data[0] if result.data and isinstance(result.data, list) else {}
     supabase.table("organizations").update(update_data).eq("id", org_id).execute()
-    admin = get_admin_data(session["osas_admin"])
+    compliance.invalidate()
+    admin = current_admin()
     if admin:
         for key in update_data:
             old = old_org.get(key)
@@ -522,7 +685,8 @@ def archive_organization(org_id):
     supabase.table("organizations").update({"status": "Archived"}).eq(
         "id", org_id
     ).execute()
-    admin = get_admin_data(session["osas_admin"])
+    compliance.invalidate()
+    admin = current_admin()
     if admin:
         log_activity(admin["id"], "organization", f"Archived organization [{org_id}]")
     return jsonify({"message": "Organization archived"})
@@ -533,9 +697,20 @@ def permanently_delete_organization(org_id):
     if "osas_admin" not in session:
         return jsonify({"error": "Login required"}), 401
     try:
+        # wallets (at folders) ay cascade-deleted kasama ng org
+        wallets = (
+            supabase.table("wallets")
+            .select("id")
+            .eq("organization_id", org_id)
+            .execute()
+            .data
+            or []
+        )
         supabase.table("organizations").delete().eq("id", org_id).execute()
+        for w in wallets:
+            folders.forget_wallet(w["id"])
 
-        admin = get_admin_data(session["osas_admin"])
+        admin = current_admin()
         if admin:
             log_activity(
                 admin["id"], "archive", f"Permanently deleted organization [{org_id}]"
@@ -554,7 +729,8 @@ def restore_organization(org_id):
     supabase.table("organizations").update({"status": "Active"}).eq(
         "id", org_id
     ).execute()
-    admin = get_admin_data(session["osas_admin"])
+    compliance.invalidate()
+    admin = current_admin()
     if admin:
         log_activity(admin["id"], "organization", f"Restored organization [{org_id}]")
     return jsonify({"message": "Organization restored"})
@@ -624,19 +800,11 @@ def osas_view_monthly_report(org_id, month_key):
         if dept_res.data:
             college_name = dept_res.data["dept_name"].upper()
 
-    # 3) month text (wallet_budgets + months)
-    wb_res = (
-        supabase.table("wallet_budgets")
-        .select("year, month_id, months (month_name)")
-        .eq("id", budget_id)
-        .single()
-        .execute()
-    )
+    # 3) month text (cached folder info)
+    folder = folders.get(supabase, budget_id)
     report_month_text = ""
-    if wb_res.data:
-        y = wb_res.data["year"]
-        mname = wb_res.data["months"]["month_name"]
-        report_month_text = f"{mname} {y}".upper()
+    if folder:
+        report_month_text = f"{folder['month_name']} {folder['year']}".upper()
 
     # 4) numeric fields gaya ng PRES
     budget_val = float(rep.get("budget") or 0)
@@ -703,6 +871,14 @@ def osas_check_month_report_exists(org_id, month_key):
     if "osas_admin" not in session:
         return jsonify({"exists": False}), 401
 
+    # cached matrix muna; negative ay baka stale lang, kaya DB check
+    try:
+        entry = compliance.org(supabase, org_id)
+        if entry and month_key.lower() in entry["submitted_months"]:
+            return jsonify({"exists": True})
+    except Exception as e:
+        print("Error reading compliance cache:", e)
+
     pres_res = (
         supabase.table("financial_reports")
         .select("id")
@@ -710,6 +886,7 @@ def osas_check_month_report_exists(org_id, month_key):
         .eq("report_month", month_key.lower())
         .not_.is_("wallet_id", None)
         .not_.is_("budget_id", None)
+        .in_("status", ["Submitted", "Approved"])
         .limit(1)
         .execute()
     )
@@ -761,6 +938,7 @@ def create_financial_report_by_org(org_id):
         "budget_id": None,
     }
     inserted = supabase.table("financial_reports").insert(report).execute()
+    compliance.invalidate()
     return jsonify({"message": "Financial report created", "report": inserted.data[0]})
 
 
@@ -851,13 +1029,14 @@ def update_financial_report(report_id):
 
         update_data["updated_at"] = datetime.utcnow().isoformat()
 
-        # Update database
+        # Update database (osas_compliance row: DB trigger)
         supabase.table("financial_reports").update(update_data).eq(
             "id", report_id
         ).execute()
+        compliance.invalidate()
 
         # Log activity
-        admin = get_admin_data(session.get("osas_admin"))
+        admin = current_admin()
         if admin:
             log_activity(
                 admin["id"],
@@ -942,18 +1121,10 @@ def osas_print_monthly_report(org_id, month_key):
                 college_name = dept_res.data["dept_name"].upper()
 
         # 3. Get month text
-        wb_res = (
-            supabase.table("wallet_budgets")
-            .select("year, month_id, months (month_name)")
-            .eq("id", budget_id)
-            .single()
-            .execute()
-        )
+        folder = folders.get(supabase, budget_id)
         report_month_text = ""
-        if wb_res.data:
-            y = wb_res.data["year"]
-            mname = wb_res.data["months"]["month_name"]
-            report_month_text = f"{mname} {y}".upper()
+        if folder:
+            report_month_text = f"{folder['month_name']} {folder['year']}".upper()
 
         # 4. Numeric fields
         budget_val = float(rep.get("budget") or 0)
@@ -996,7 +1167,7 @@ def osas_print_monthly_report(org_id, month_key):
         # 6. Get receipts with public URLs
         rc_res = (
             supabase.table("wallet_receipts")
-            .select("description, file_url, receipt_date")
+            .select("description, file_url, print_url, receipt_date")
             .eq("wallet_id", wallet_id)
             .eq("budget_id", budget_id)
             .order("receipt_date")
@@ -1005,8 +1176,9 @@ def osas_print_monthly_report(org_id, month_key):
         receipts = rc_res.data or []
         for r in receipts:
             try:
+                # print rendition kung meron (see receipt_renditions.py)
                 public_url = supabase.storage.from_("Receipts").get_public_url(
-                    r["file_url"]
+                    print_path_of(r)
                 )
                 if isinstance(public_url, dict):
                     r["file_url"] = (
@@ -1042,6 +1214,146 @@ def osas_print_monthly_report(org_id, month_key):
         return f"Error: {str(e)}", 500
 
 
+# ========== BULK EXPORT (ZIP) ===========
+def _academic_year_months(academic_year):
+    """'2024-2025' -> {(2024, 'august'), ..., (2025, 'may')} (Aug-May)."""
+    start = int(str(academic_year).split("-")[0])
+    keys = list(MONTH_LABELS)  # august ... may
+    return {(start if i < 5 else start + 1, k) for i, k in enumerate(keys)}
+
+
+def _export_archive_docx(arch):
+    """DOCX bytes ng isang submitted report (stored artifact o bagong render)."""
+    # 1) rendered na sa submit (see download_archive)
+    if arch.get("file_url"):
+        try:
+            return supabase.storage.from_(BUCKET_ARCHIVES).download(arch["file_url"])
+        except Exception as e:
+            print("Error downloading stored archive, re-rendering:", e)
+
+    # 2) I/O dito, DOCX rendering sa process pool
+    data = gather_archive_report(arch["id"])
+    if data is None:
+        return None
+    data["images"] = fetch_receipts(
+        supabase, BUCKET_RECEIPTS, [print_path_of(r) for r in data["receipts"]]
+    )
+    docx_bytes = render_in_pool(render_archive_report_docx, data)
+    try:
+        persist_archive_artifact(
+            arch["id"], arch["organization_id"], docx_bytes,
+            replace=bool(arch.get("file_url")),
+        )
+    except Exception as e:
+        print("Error storing archive artifact:", e)
+    return docx_bytes
+
+
+@osas.route("/api/reports/export", methods=["GET"])
+def export_reports_zip():
+    """
+    ZIP ng lahat ng submitted reports (financial_report_archives).
+    Query: department_id=<id> and/or academic_year=2024-2025 (at least one).
+    Streamed habang natatapos ang bawat DOCX.
+    """
+    if "osas_admin" not in session:
+        return jsonify({"error": "Login required"}), 401
+
+    department_id = request.args.get("department_id", type=int)
+    academic_year = (request.args.get("academic_year") or "").strip()
+    if department_id is None and not academic_year:
+        return jsonify({"error": "department_id or academic_year is required"}), 400
+
+    ay_months = None
+    if academic_year:
+        try:
+            ay_months = _academic_year_months(academic_year)
+        except ValueError:
+            return jsonify({"error": "academic_year must look like 2024-2025"}), 400
+
+    try:
+        # 1) orgs (+ dept names para sa folder names)
+        dept_res = supabase.table("departments").select("id, dept_name").execute()
+        dept_map = {d["id"]: d["dept_name"] for d in (dept_res.data or [])}
+
+        org_q = supabase.table("organizations").select("id, org_name, department_id")
+        if department_id is not None:
+            org_q = org_q.eq("department_id", department_id)
+        orgs = {o["id"]: o for o in (org_q.execute().data or [])}
+        if not orgs:
+            return jsonify({"error": "No organizations found"}), 404
+
+        # 2) month/year ng bawat folder (filter + file names). May academic
+        #    year: folders ng taon na iyon muna, para ang archives query ay
+        #    naka-filter sa kanila (hindi lahat ng taon)
+        months = {}
+
+        def read_months(wb_q):
+            for wb in wb_q.execute().data or []:
+                mname = ((wb.get("months") or {}).get("month_name") or "").lower()
+                months[wb["id"]] = (wb.get("year"), mname)
+
+        wb_select = supabase.table("wallet_budgets").select("id, year, months (month_name)")
+        if ay_months is not None:
+            start = min(year for year, _ in ay_months)
+            read_months(wb_select.in_("year", [start, start + 1]))
+            months = {bid: ym for bid, ym in months.items() if ym in ay_months}
+            if not months:
+                return jsonify({"error": "No submitted reports found"}), 404
+
+        # 3) submitted reports ng mga org na iyon
+        arch_q = supabase.table("financial_report_archives").select(
+            "id, organization_id, budget_id, report_no, file_url"
+        )
+        if department_id is not None:
+            arch_q = arch_q.in_("organization_id", list(orgs))
+        if ay_months is not None:
+            arch_q = arch_q.in_("budget_id", sorted(months))
+        archives = [
+            a for a in (arch_q.order("id").execute().data or [])
+            if a.get("organization_id") in orgs
+        ]
+
+        if ay_months is None:
+            budget_ids = sorted({a["budget_id"] for a in archives if a.get("budget_id")})
+            if budget_ids:
+                read_months(wb_select.in_("id", budget_ids))
+        if not archives:
+            return jsonify({"error": "No submitted reports found"}), 404
+    except Exception as e:
+        print("Error preparing report export:", e)
+        return jsonify({"error": str(e)}), 500
+
+    def entries():
+        for a in archives:
+            org = orgs[a["organization_id"]]
+            year, mname = months.get(a.get("budget_id"), (None, ""))
+            month_text = f"{year} {MONTH_LABELS.get(mname, mname.title())}".strip()
+            name = "/".join(
+                [
+                    safe_name(dept_map.get(org.get("department_id")), "No Department"),
+                    safe_name(org.get("org_name"), f"org-{org['id']}"),
+                    safe_name(
+                        f"{month_text} - {a.get('report_no') or a['id']}.docx"
+                    ),
+                ]
+            )
+            yield name, partial(_export_archive_docx, a)
+
+    parts = ["financial_reports"]
+    if department_id is not None:
+        parts.append(safe_name(dept_map.get(department_id), str(department_id)))
+    if academic_year:
+        parts.append(safe_name(academic_year))
+    download_name = "_".join(p.replace(" ", "_") for p in parts) + ".zip"
+
+    return Response(
+        stream_with_context(stream_zip(entries())),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{download_name}"'},
+    )
+
+
 # ========== ADMIN/SETTINGS ===========
 @osas.route("/api/admin/profile", methods=["GET"])
 def get_profile():
@@ -1099,13 +1411,9 @@ def update_profile():
         supabase.table("osas_admin").update(update_data).eq(
             "username", username
         ).execute()
-        new_user = update_data.get("username", username)
-    else:
-        new_user = username
 
-    admin = get_admin_data(new_user)
-    if admin:
-        log_activity(admin["id"], "settings", "Profile updated")
+    g.pop("osas_admin", None)  # baka nagbago ang username
+    log_activity(old_admin["id"], "settings", "Profile updated")
     return jsonify({"message": "Profile updated!", "updated": update_data})
 
 
@@ -1120,9 +1428,9 @@ def change_password():
     admin = get_admin_data(username)
     if not admin:
         return jsonify({"error": "Admin not found"}), 404
-    if not check_password_hash(admin["password"], current_pw):
+    if not verify_password(admin["password"], current_pw)[0]:
         return jsonify({"error": "Current password incorrect"}), 400
-    hashed = generate_password_hash(new_pw)
+    hashed = hash_password(new_pw)
     supabase.table("osas_admin").update({"password": hashed}).eq(
         "username", username
     ).execute()
@@ -1135,11 +1443,9 @@ def change_password():
 def get_activity():
     if "osas_admin" not in session:
         return jsonify({"error": "Not logged in"}), 401
-    username = session["osas_admin"]
-    admin = get_admin_data(username)
-    if not admin:
+    admin_id = current_admin_id()
+    if admin_id is None:
         return jsonify({"error": "Admin not found"}), 404
-    admin_id = admin["id"]
     action_type = request.args.get("type")
     activity_date = request.args.get("date")
     query = supabase.table("osas_activity_log").select("*").eq("admin_id", admin_id)
@@ -1157,7 +1463,7 @@ def get_activity():
 def get_admin_sessions():
     if "osas_admin" not in session:
         return jsonify({"error": "Not logged in"}), 401
-    admin = get_admin_data(session["osas_admin"])
+    admin = current_admin()
     sessions = []
     if admin:
         result = (
@@ -1206,7 +1512,7 @@ def reset_password():
     if not row.data or not new_pw:
         return jsonify({"error": "Invalid token or password"}), 400
     admin_id = row.data[0]["admin_id"]
-    hashed = generate_password_hash(new_pw)
+    hashed = hash_password(new_pw)
     supabase.table("osas_admin").update({"password": hashed}).eq(
         "id", admin_id
     ).execute()
@@ -1216,3 +1522,23 @@ def reset_password():
     log_admin_audit(admin_id, "password", None, "[RESET]")
     log_activity(admin_id, "security", "Password reset via token")
     return jsonify({"message": "Password reset successful"})
+
+
+# -----------------------
+# Audit buffer (CLI)
+#   flask --app app osas flush-audit
+# -----------------------
+
+
+@osas.cli.command("flush-audit")
+def flush_audit_command():
+    """Flush buffered + spooled activity / audit rows to Supabase.
+
+    Spool files ng buhay pang workers ay sila ang magre-replay (skipped dito).
+    """
+    before = audit.spooled_count()
+    written = audit.flush()
+    click.echo(
+        f"Written: {written}  Spooled before: {before}  Still spooled: {audit.spooled_count()}"
+        f"  Dead-letter: {audit.dead_letter_count()}"
+    )
@@ -48,9 +48,18 @@ document.addEventListener("DOMContentLoaded", () => {
   // ============================
   async function loadArchivedOrgs() {
     try {
-      const res = await fetch("/osas/api/archived_organizations");
-      const data = await res.json();
-      archivedOrgs = data.organizations || [];
+      // paged (keyset); ang archive ay maliit kaya kunin lahat ng pages
+      let cursor = null;
+      const all = [];
+      do {
+        const params = new URLSearchParams({ limit: "200", sort: "-created" });
+        if (cursor) params.set("cursor", cursor);
+        const res = await fetch(`/osas/api/archived_organizations?${params}`);
+        const data = await res.json();
+        all.push(...(data.organizations || []));
+        cursor = data.next_cursor || null;
+      } while (cursor);
+      archivedOrgs = all;
       updateStats();
       renderArchive();
     } catch (err) {
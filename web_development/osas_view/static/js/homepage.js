@@ -102,31 +102,33 @@ document.addEventListener("DOMContentLoaded", () => {
       showDeptLoading();
       showStatusLoading();
 
-      // ✅ 1: Admin profile + COMBINED orgs+reports in PARALLEL
-      const [adminRes, comboRes] = await Promise.all([
+      // ✅ 1: Admin profile + compliance matrix (precomputed sa server) in PARALLEL
+      const [adminRes, matrix] = await Promise.all([
         loadAdminProfile(),
-        fetch("/osas/api/organizations_with_reports")
-          .then((r) => (r.ok ? r.json() : { organizations: [], reports: [] }))
+        fetch("/osas/api/compliance_matrix")
+          .then((r) => (r.ok ? r.json() : { organizations: [] }))
           .catch((err) => {
-            console.error("Org+reports fetch failed:", err);
-            return { organizations: [], reports: [] };
+            console.error("Compliance matrix fetch failed:", err);
+            return { organizations: [] };
           }),
       ]);
 
-      // ✅ 2: Set organizations + reports
-      organizations = comboRes.organizations || [];
-      const rawReports = comboRes.reports || [];
-
-      // ✅ 3: Attach orgName / department to each report
-      reports = rawReports.map((rep) => {
-        const org =
-          organizations.find((o) => o.id === rep.organization_id) || {};
-        return {
-          ...rep,
-          orgName: org.name,
-          department: org.department,
-        };
-      });
+      // ✅ 2: Organizations + OSAS master report status (isang row per org)
+      const rows = matrix.organizations || [];
+      organizations = rows.map((row) => ({
+        id: row.org_id,
+        name: row.org_name,
+        department: row.department,
+      }));
+      reports = rows
+        .filter((row) => row.report_id != null)
+        .map((row) => ({
+          id: row.report_id,
+          organization_id: row.org_id,
+          status: row.status,
+          orgName: row.org_name,
+          department: row.department,
+        }));
 
       // ✅ 4: Start activity feed in parallel
       const activityPromise = updateActivityFeed();
@@ -650,8 +652,10 @@ document.addEventListener("DOMContentLoaded", () => {
   if (notifBtn && notifMenu) {
     notifBtn.addEventListener("click", (e) => {
       e.stopPropagation();
-      notifMenu.style.display =
-        notifMenu.style.display === "block" ? "none" : "block";
+      const opening = notifMenu.style.display !== "block";
+      notifMenu.style.display = opening ? "block" : "none";
+      // feed ay kinukuha lang kapag binuksan ang dropdown
+      if (opening) loadNotifications();
     });
 
     window.addEventListener("click", (e) => {
@@ -661,6 +665,10 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
 
+  function isNotifMenuOpen() {
+    return !!notifMenu && notifMenu.style.display === "block";
+  }
+
   // helper for notif time display
   function formatNotifTime(iso) {
     return new Date(iso).toLocaleString("en-PH", {
@@ -675,34 +683,29 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   // --- Load notifications from OSAS API ---
-  // Track notification IDs in localStorage to persist across page navigations
-  let previousNotifIds = new Set();
+  // Track last unread count in localStorage to persist across page navigations
+  let previousUnreadCount = null;
 
   // Load from localStorage on startup
-  function loadPreviousNotifIds() {
+  function loadPreviousUnreadCount() {
     try {
-      const stored = localStorage.getItem("osasNotificationIds");
-      if (stored) {
-        previousNotifIds = new Set(JSON.parse(stored));
-      }
+      const stored = localStorage.getItem("osasUnreadCount");
+      if (stored !== null) previousUnreadCount = Number(stored);
     } catch (err) {
-      console.log("Could not load notification IDs from storage", err);
+      console.log("Could not load unread count from storage", err);
     }
   }
 
   // Save to localStorage when updated
-  function savePreviousNotifIds() {
+  function savePreviousUnreadCount() {
     try {
-      localStorage.setItem(
-        "osasNotificationIds",
-        JSON.stringify(Array.from(previousNotifIds))
-      );
+      localStorage.setItem("osasUnreadCount", String(previousUnreadCount));
     } catch (err) {
-      console.log("Could not save notification IDs to storage", err);
+      console.log("Could not save unread count to storage", err);
     }
   }
 
-  loadPreviousNotifIds();
+  loadPreviousUnreadCount();
 
   // Play notification sound
   function playNotificationSound() {
@@ -732,6 +735,36 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // Update count badge on bell
+  function setUnreadBadge(unreadCount) {
+    // 🔔 PLAY SOUND ONLY if the unread counter went up (may bagong dumating)
+    if (previousUnreadCount !== null && unreadCount > previousUnreadCount) {
+      playNotificationSound();
+    }
+    previousUnreadCount = unreadCount;
+    savePreviousUnreadCount();
+
+    if (notifBtn) {
+      const countBadge = notifBtn.querySelector(".notif-count");
+      if (countBadge) {
+        countBadge.textContent = unreadCount;
+        countBadge.style.display = unreadCount > 0 ? "inline-flex" : "none";
+      }
+    }
+  }
+
+  // Bell badge: single-row read ng per-admin counter (walang feed)
+  async function loadUnreadCount() {
+    try {
+      const res = await fetch(`${API_BASE}/admin/notifications/unread-count`);
+      if (!res.ok) throw new Error("Failed to load unread count");
+      const data = await res.json();
+      setUnreadBadge(data.unread_count || 0);
+    } catch (err) {
+      console.error("Failed to load unread count", err);
+    }
+  }
+
   async function loadNotifications() {
     if (!notifList) return;
 
@@ -740,31 +773,9 @@ document.addEventListener("DOMContentLoaded", () => {
       if (!res.ok) throw new Error("Failed to load notifications");
       const data = await res.json();
       const items = data.notifications || [];
-      const hasUnread = data.has_unread;
-
-      /// Count unread FIRST
-      // Count unread FIRST
-      const unreadCount = items.filter((n) => !n.is_read).length;
 
-      // 🔔 PLAY SOUND ONLY if a NEW notification arrived (not just count change)
-      const currentNotifIds = new Set(items.map((n) => n.id));
-      const hasNewNotif = Array.from(currentNotifIds).some(
-        (id) => !previousNotifIds.has(id)
-      );
-      if (hasNewNotif && unreadCount > 0) {
-        playNotificationSound();
-      }
-      previousNotifIds = currentNotifIds;
-      savePreviousNotifIds();
-
-      // Update count badge on bell
-      if (notifBtn) {
-        const countBadge = notifBtn.querySelector(".notif-count");
-        if (countBadge) {
-          countBadge.textContent = unreadCount;
-          countBadge.style.display = unreadCount > 0 ? "inline-flex" : "none";
-        }
-      }
+      // server-side counter (kasama ang unread na wala sa page na ito)
+      setUnreadBadge(data.unread_count ?? items.filter((n) => !n.is_read).length);
 
       if (!items.length) {
         notifList.innerHTML = '<p class="notif-empty">Nothing here yet</p>';
@@ -798,15 +809,6 @@ document.addEventListener("DOMContentLoaded", () => {
       // Set items ONLY (header is already in HTML)
       notifList.innerHTML = itemsHtml;
 
-      // Update bell badge with unread count
-      if (notifBtn) {
-        const countBadge = notifBtn.querySelector(".notif-count");
-        if (countBadge) {
-          countBadge.textContent = unreadCount;
-          countBadge.style.display = unreadCount > 0 ? "inline-flex" : "none";
-        }
-      }
-
       // Add event listener for "Mark all as Read" button
       // Add event listener for "Mark all as Read" button (use the header button, not from notifList)
       const markAllBtn = document.getElementById("markAllReadBtn");
@@ -819,21 +821,19 @@ document.addEventListener("DOMContentLoaded", () => {
         newMarkAllBtn.addEventListener("click", async (e) => {
           e.stopPropagation();
 
-          // Mark all unread as read
-          for (const item of items.filter((n) => !n.is_read)) {
+          // Mark all as read (isang request: lahat hanggang pinakabago)
+          if (items.length) {
             try {
-              await fetch(`${API_BASE}/admin/notifications/${item.id}/read`, {
+              await fetch(`${API_BASE}/admin/notifications/mark-read`, {
                 method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ before: items[0].created_at }),
               });
             } catch (err) {
-              console.error("Failed to mark notification read", err);
+              console.error("Failed to mark notifications read", err);
             }
           }
 
-          // Update state
-          previousNotifIds.clear();
-          savePreviousNotifIds();
-          if (notifDot) notifDot.style.display = "none";
           loadNotifications();
         });
       }
@@ -849,22 +849,17 @@ document.addEventListener("DOMContentLoaded", () => {
           el.classList.remove("unread");
           el.classList.add("read");
 
-          // Mark read in backend
+          // Mark read in backend (returns the new unread count)
           try {
-            await fetch(`${API_BASE}/admin/notifications/${notifId}/read`, {
-              method: "POST",
-            });
+            const res = await fetch(
+              `${API_BASE}/admin/notifications/${notifId}/read`,
+              { method: "POST" }
+            );
+            if (res.ok) setUnreadBadge((await res.json()).unread_count || 0);
           } catch (e) {
             console.error("Failed to mark notification read", e);
           }
 
-          // Check if all read
-          const stillUnread = notifList.querySelector(".notif-item.unread");
-          if (!stillUnread && notifDot) {
-            notifDot.style.display = "none";
-            previousNotifCount = 0;
-          }
-
           // Navigate to reports
           const url = `/osas/reports?org_id=${encodeURIComponent(
             orgId
@@ -875,7 +870,6 @@ document.addEventListener("DOMContentLoaded", () => {
     } catch (err) {
       notifList.innerHTML =
         '<p class="notif-empty">There\'s nothing here yet</p>';
-      if (notifDot) notifDot.style.display = "none";
     }
   }
 
@@ -938,27 +932,55 @@ document.addEventListener("DOMContentLoaded", () => {
   // INITIAL LOAD
   loadDashboardDepartments().then(loadDashboardOrganizations);
   loadDashboardData();
-  loadNotifications();
+  loadUnreadCount();
 
-  // Smart polling: only when window focused, increased intervals
+  // Live notifications via SSE (server push); dashboard polling only
+  // while the window is focused
+  let notifStream = null;
   let notifPollInterval = null;
+  let notifReloadTimer = null;
   let dashPollInterval = null;
 
-  function startPolling() {
-    if (!notifPollInterval) {
-      notifPollInterval = setInterval(loadNotifications, 5000); // 30 seconds
-      loadNotifications();
+  // isang reload lang kahit sunod-sunod ang events; feed lang kapag
+  // bukas ang dropdown, kung hindi badge count lang
+  function refreshNotifs() {
+    if (isNotifMenuOpen()) loadNotifications();
+    else loadUnreadCount();
+  }
+
+  function scheduleNotifReload() {
+    clearTimeout(notifReloadTimer);
+    notifReloadTimer = setTimeout(refreshNotifs, 150);
+  }
+
+  function startNotifStream() {
+    if (notifStream || notifPollInterval) return;
+    if (!window.EventSource) {
+      notifPollInterval = setInterval(refreshNotifs, 60000);
+      return;
     }
+    notifStream = new EventSource(`${API_BASE}/admin/notifications/stream`);
+    // open = first connect at bawat reconnect: i-sync ang list
+    notifStream.addEventListener("open", scheduleNotifReload);
+    notifStream.addEventListener("notification", scheduleNotifReload);
+    notifStream.addEventListener("read", scheduleNotifReload);
+    notifStream.addEventListener("error", () => {
+      // CLOSED = hindi na magre-reconnect (e.g. 401); subukan ulit sa focus
+      if (notifStream && notifStream.readyState === EventSource.CLOSED) {
+        notifStream.close();
+        notifStream = null;
+      }
+    });
+  }
+
+  function startPolling() {
+    startNotifStream();
     if (!dashPollInterval) {
       dashPollInterval = setInterval(loadDashboardData, 600000); // 10 minutes
     }
   }
 
   function stopPolling() {
-    if (notifPollInterval) {
-      clearInterval(notifPollInterval);
-      notifPollInterval = null;
-    }
     if (dashPollInterval) {
       clearInterval(dashPollInterval);
       dashPollInterval = null;
@@ -1,27 +1,3 @@
-// ===== ORG TIMESTAMPS HELPER =====
-const ORG_TIMESTAMPS_KEY = 'orgLastModified';
-
-function saveOrgTimestamp(orgId) {
-  const timestamps = JSON.parse(localStorage.getItem(ORG_TIMESTAMPS_KEY) || '{}');
-  timestamps[orgId] = new Date().getTime();
-  localStorage.setItem(ORG_TIMESTAMPS_KEY, JSON.stringify(timestamps));
-}
-
-function getOrgTimestamps() {
-  return JSON.parse(localStorage.getItem(ORG_TIMESTAMPS_KEY) || '{}');
-}
-
-function sortOrgsByRecent(orgsArray) {
-  const timestamps = getOrgTimestamps();
-  const sorted = [...orgsArray].sort((a, b) => {
-    const timeA = timestamps[a.id] || 0;
-    const timeB = timestamps[b.id] || 0;
-    return timeB - timeA;
-  });
-  return sorted;
-}
-// ===== END ORG TIMESTAMPS HELPER =====
-
 document.addEventListener("DOMContentLoaded", () => {
   // --- ELEMENTS ---
   const tableBody = document.getElementById("orgTableBody");
@@ -53,6 +29,9 @@ document.addEventListener("DOMContentLoaded", () => {
   const departmentSelect = document.getElementById("orgDepartment");
   let departments = [];
   let orgs = [];
+  let nextCursor = null; // keyset paging (server-side search / filter)
+  let loadingPage = false;
+  let searchTimer = null;
   let editingOrgId = null;
   let orgIdToDelete = null;
 
@@ -71,7 +50,7 @@ document.addEventListener("DOMContentLoaded", () => {
       departments = data.departments || [];
       departmentFilter.innerHTML = `<option value="">All Departments</option>`;
       departments.forEach((dep) => {
-        departmentFilter.innerHTML += `<option value="${dep.name}">${dep.name}</option>`;
+        departmentFilter.innerHTML += `<option value="${dep.id}">${dep.name}</option>`;
       });
     } catch (err) {
       departmentFilter.innerHTML = `<option value="">All Departments</option>`;
@@ -130,24 +109,62 @@ document.addEventListener("DOMContentLoaded", () => {
     emptyState.style.display = orgs.length === 0 ? "flex" : "none";
   }
 
-  // LOAD ORGANIZATIONS
+  // LOAD ORGANIZATIONS (server-side search + department filter, paged)
+  function orgsUrl(cursor) {
+    // pinakabago muna (id desc); tugma sa unshift ng bagong org sa itaas
+    const params = new URLSearchParams({ limit: "50", sort: "-created" });
+    const q = searchInput.value.trim();
+    if (q) params.set("q", q);
+    if (departmentFilter.value) params.set("department_id", departmentFilter.value);
+    if (cursor) params.set("cursor", cursor);
+    return `/osas/api/organizations?${params}`;
+  }
+
   async function loadOrganizations() {
     showLoading();
+    loadingPage = true;
     try {
-      const res = await fetch("/osas/api/organizations");
+      const res = await fetch(orgsUrl(null));
       const data = await res.json();
       orgs = data.organizations || [];
-      orgs = sortOrgsByRecent(orgs);  // ← ADD THIS LINE
-      // kung may initial search or dept filter, gamitin agad
+      nextCursor = data.next_cursor || null;
       applyFilters();
     } catch (err) {
       console.error("Error loading organizations:", err);
       showToast("Failed to load organizations", "error");
       tableContainer.style.display = "none";
       emptyState.style.display = "flex";
+    } finally {
+      loadingPage = false;
     }
   }
 
+  // next page kapag malapit na sa dulo ng listahan
+  async function loadMoreOrganizations() {
+    if (!nextCursor || loadingPage) return;
+    loadingPage = true;
+    try {
+      const res = await fetch(orgsUrl(nextCursor));
+      const data = await res.json();
+      const seen = new Set(orgs.map((o) => o.id));
+      (data.organizations || []).forEach((o) => {
+        if (!seen.has(o.id)) orgs.push(o);
+      });
+      nextCursor = data.next_cursor || null;
+      applyFilters();
+    } catch (err) {
+      console.error("Error loading more organizations:", err);
+    } finally {
+      loadingPage = false;
+    }
+  }
+
+  window.addEventListener("scroll", () => {
+    const nearBottom =
+      window.innerHeight + window.scrollY >= document.body.offsetHeight - 300;
+    if (nearBottom) loadMoreOrganizations();
+  });
+
 // loading ui
 function showLoading() {
   tableContainer.style.display = "block";
@@ -166,21 +183,25 @@ function showLoading() {
 
 
   // FILTERS AND SEARCH
-  searchInput.addEventListener("input", applyFilters);
-  departmentFilter.addEventListener("change", applyFilters);
+  searchInput.addEventListener("input", () => {
+    applyFilters(); // instant sa naka-load na
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(loadOrganizations, 250);
+  });
+  departmentFilter.addEventListener("change", loadOrganizations);
 
   function applyFilters() {
     const searchTerm = searchInput.value.trim().toLowerCase();
     const selectedDept = departmentFilter.value;
-    let filtered = sortOrgsByRecent(orgs);  // ← ADD THIS - re-sort before filtering
+    // server order na (walang client re-sort) para hindi magulo ang paging
+    let filtered = orgs;
     if (selectedDept)
-      filtered = filtered.filter((org) => org.department === selectedDept);
+      filtered = filtered.filter((org) => String(org.department_id) === selectedDept);
     if (searchTerm) {
       filtered = filtered.filter(
         (org) =>
           org.name.toLowerCase().includes(searchTerm) ||
-          org.username.toLowerCase().includes(searchTerm) ||
-          (org.department && org.department.toLowerCase().includes(searchTerm))
+          org.username.toLowerCase().includes(searchTerm)
       );
     }
     renderFilteredTable(filtered);
@@ -263,10 +284,7 @@ function showLoading() {
     passwordField.value = "";
     document.getElementById("accreditationDate").value = org.date || "";
 
-    let deptId = "";
-    const dep = departments.find((d) => d.name === org.department);
-    if (dep) deptId = dep.id;
-    await loadDepartmentsSelect(deptId);
+    await loadDepartmentsSelect(org.department_id || "");
   }
 
     // FORM SUBMISSION
@@ -313,8 +331,8 @@ function showLoading() {
             editedOrg.date = accreditationDate;
             const dept = departments.find((d) => d.id == department_id);
             editedOrg.department = dept ? dept.name : "-";
+            editedOrg.department_id = department_id;
             orgs.unshift(editedOrg);
-            saveOrgTimestamp(editingOrgId);  // ← ADD THIS LINE
           }
         } else {
           // CREATE
@@ -353,13 +371,12 @@ function showLoading() {
             id: data.id || new Date().getTime(),
             name: orgName,
             department: dept ? dept.name : "-",
+            department_id: department_id,
             username: username,
-            password: password,
             date: accreditationDate,
             status: "Approved",
           };
           orgs.unshift(newOrg);
-          saveOrgTimestamp(newOrg.id);  // ← ADD THIS LINE
 
         }
 
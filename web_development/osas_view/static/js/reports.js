@@ -61,6 +61,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
   let reports = [];
   let organizations = [];
+  let compliance = {}; // org_id -> compliance matrix entry (months, received, ...)
   let currentReportId = null;
   let currentPage = 1;
   const pageSize = 6;
@@ -229,14 +230,39 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
-  // STATUS FROM CHECKLIST
+  // ===== COMPLIANCE MATRIX (server-side month states) =====
+  // received / submitted / missing per month; checklist lang kung wala
+  // pang row ang org sa matrix
+  function monthState(report, key) {
+    const entry = compliance[report.organization_id];
+    if (entry) return entry.months[key] || "missing";
+    return (report.checklist || {})[key] === true ? "received" : "missing";
+  }
+
+  function receivedCount(report) {
+    return MONTH_KEYS.filter((k) => monthState(report, k) === "received")
+      .length;
+  }
+
+  // pagkatapos ng receive / complete: i-sync ang local entry (ang server
+  // cache ay ini-invalidate ng update endpoint)
+  function markMonthsReceived(orgId, keys) {
+    const entry = compliance[orgId];
+    if (!entry) return;
+    keys.forEach((k) => (entry.months[k] = "received"));
+    const states = Object.values(entry.months);
+    entry.received = states.filter((v) => v === "received").length;
+    entry.submitted = states.filter((v) => v === "submitted").length;
+    entry.missing = states.filter((v) => v === "missing").length;
+  }
+
+  // STATUS FROM MATRIX
   function computeStatusFromChecklist(report) {
-    const checklistValues = Object.values(report.checklist || {});
-    const receivedCount = checklistValues.filter((v) => v === true).length;
+    const received = receivedCount(report);
     const totalCount = MONTH_KEYS.length;
 
-    if (receivedCount === 0) return "Pending Review";
-    if (receivedCount < totalCount) return "In Review";
+    if (received === 0) return "Pending Review";
+    if (received < totalCount) return "In Review";
     return "Completed";
   }
 
@@ -244,15 +270,23 @@ document.addEventListener("DOMContentLoaded", () => {
   async function loadInitialData() {
     showLoading();
     try {
-      const [deptRes, comboRes] = await Promise.all([
+      const [deptRes, comboRes, matrix] = await Promise.all([
         fetch(`${API_BASE}/departments`)
           .then((r) => (r.ok ? r.json() : { departments: [] }))
           .catch(() => ({ departments: [] })),
         fetch(`${API_BASE}/organizations_with_reports`)
           .then((r) => (r.ok ? r.json() : { organizations: [], reports: [] }))
           .catch(() => ({ organizations: [], reports: [] })),
+        fetch(`${API_BASE}/compliance_matrix`)
+          .then((r) => (r.ok ? r.json() : { organizations: [] }))
+          .catch(() => ({ organizations: [] })),
       ]);
 
+      compliance = {};
+      (matrix.organizations || []).forEach((row) => {
+        compliance[row.org_id] = row;
+      });
+
       departments = deptRes.departments || [];
       organizations = comboRes.organizations || [];
 
@@ -433,8 +467,7 @@ document.addEventListener("DOMContentLoaded", () => {
     card.className = "report-card";
     card.dataset.reportId = report.id;
 
-    const checklistValues = Object.values(report.checklist || {});
-    const completedCount = checklistValues.filter((v) => v === true).length;
+    const completedCount = receivedCount(report);
     const totalCount = MONTH_KEYS.length;
     const progressPercent = totalCount
       ? Math.round((completedCount / totalCount) * 100)
@@ -498,26 +531,40 @@ document.addEventListener("DOMContentLoaded", () => {
   function renderMonths(report) {
     if (!monthsList) return;
 
-    const checklist = report.checklist || {};
     const monthNotes = report.monthNotes || {};
 
     monthsList.innerHTML = MONTH_KEYS.map((key) => {
-      const received = checklist[key] === true;
+      const state = monthState(report, key);
+      const received = state === "received";
       const hasNoteOnly = received && monthNotes[key];
 
-      const rowClass = received ? "month-row received" : "month-row";
+      const rowClass = received
+        ? "month-row received"
+        : state === "submitted"
+        ? "month-row submitted"
+        : "month-row";
 
-      // If report not submitted, show "N/A" as text, not a button
-      const actionContent = received
-        ? `<button
+      // submitted (may PRES report) -> Receive; wala pa -> "N/A" text
+      let actionContent = '<span class="month-action-na">N/A</span>';
+      if (received) {
+        actionContent = `<button
             type="button"
             class="month-btn ${hasNoteOnly ? "secondary" : "primary"}"
             data-month="${key}"
             data-received="1"
           >
             ${hasNoteOnly ? "View note" : "View report"}
-          </button>`
-        : '<span class="month-action-na">N/A</span>';
+          </button>`;
+      } else if (state === "submitted") {
+        actionContent = `<button
+            type="button"
+            class="month-btn primary"
+            data-month="${key}"
+            data-received="0"
+          >
+            Receive
+          </button>`;
+      }
 
       return `
         <div class="${rowClass}" data-month="${key}">
@@ -548,7 +595,8 @@ async function handleMonthAction(report, button) {
 
     if (updated) {
       updated.checklist = updated.checklist || {};
-      updated.status = computeStatusFromChecklist(updated);
+      markMonthsReceived(report.organization_id, [monthKey]);
+      updated.status = computeStatusFromChecklist({ ...report, ...updated });
 
       const idx = reports.findIndex((r) => r.id === report.id);
       if (idx !== -1) {
@@ -608,7 +656,8 @@ async function handleMonthAction(report, button) {
 
     if (updated) {
       updated.checklist = updated.checklist || {};
-      updated.status = computeStatusFromChecklist(updated);
+      const current = reports.find((r) => r.id === currentReportId) || {};
+      updated.status = computeStatusFromChecklist({ ...current, ...updated });
 
       const idx = reports.findIndex((r) => r.id === currentReportId);
       if (idx !== -1) {
@@ -653,6 +702,7 @@ async function handleMonthAction(report, button) {
 
         const idx = reports.findIndex((r) => r.id === currentReportId);
         if (idx !== -1) {
+          markMonthsReceived(reports[idx].organization_id, MONTH_KEYS);
           const newChecklist = { ...(reports[idx].checklist || {}) };
           MONTH_KEYS.forEach((k) => (newChecklist[k] = true));
           reports[idx] = {
@@ -692,8 +742,10 @@ async function handleMonthAction(report, button) {
   if (notifBtn && notifMenu) {
     notifBtn.addEventListener("click", (e) => {
       e.stopPropagation();
-      notifMenu.style.display =
-        notifMenu.style.display === "block" ? "none" : "block";
+      const opening = notifMenu.style.display !== "block";
+      notifMenu.style.display = opening ? "block" : "none";
+      // feed ay kinukuha lang kapag binuksan ang dropdown
+      if (opening) loadNotifications();
     });
 
     window.addEventListener("click", () => {
@@ -701,6 +753,18 @@ async function handleMonthAction(report, button) {
     });
   }
 
+  // Red dot: single-row read ng per-admin unread counter (walang feed)
+  async function loadUnreadCount() {
+    try {
+      const res = await fetch(`${API_BASE}/admin/notifications/unread-count`);
+      if (!res.ok) throw new Error("Failed to load unread count");
+      const data = await res.json();
+      if (notifDot) notifDot.style.display = data.has_unread ? "block" : "none";
+    } catch (err) {
+      console.error("Failed to load unread count", err);
+    }
+  }
+
   async function loadNotifications() {
     if (!notifList) return;
 
@@ -719,8 +783,6 @@ async function handleMonthAction(report, button) {
         return;
       }
 
-      if (notifDot) notifDot.style.display = "block";
-
       notifList.innerHTML = notifications
         .map(
           (n) => `
@@ -748,7 +810,6 @@ async function handleMonthAction(report, button) {
     } catch (err) {
       notifList.innerHTML =
         '<p class="notif-empty">Error loading notifications</p>';
-      if (notifDot) notifDot.style.display = "none";
     }
   }
 
@@ -790,8 +851,29 @@ async function handleMonthAction(report, button) {
   // --- Initial Load ---
   // --- Initial Load ---
   loadInitialData();
-  loadNotifications();
-  setInterval(loadNotifications, 60000); // refresh notifs every minute
+  loadUnreadCount();
+
+  // feed lang kapag bukas ang dropdown, kung hindi red dot lang
+  const refreshNotifs = () => {
+    if (notifMenu && notifMenu.style.display === "block") loadNotifications();
+    else loadUnreadCount();
+  };
+
+  // Live notifications via SSE; fallback sa polling kung walang EventSource
+  if (window.EventSource) {
+    let notifReloadTimer = null;
+    const scheduleNotifReload = () => {
+      clearTimeout(notifReloadTimer);
+      notifReloadTimer = setTimeout(refreshNotifs, 150);
+    };
+    const notifStream = new EventSource(`${API_BASE}/admin/notifications/stream`);
+    // reconnect: i-sync ang list (baka may na-miss habang offline)
+    notifStream.addEventListener("open", scheduleNotifReload);
+    notifStream.addEventListener("notification", scheduleNotifReload);
+    notifStream.addEventListener("read", scheduleNotifReload);
+  } else {
+    setInterval(refreshNotifs, 60000); // refresh notifs every minute
+  }
 
   searchInput.addEventListener("input", () => {
     currentPage = 1;
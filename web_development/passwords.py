@@ -0,0 +1,179 @@
+"""
+Password hashing / verification sa bounded thread pool.
+
+Ang scrypt / pbkdf2 ay sinadyang mabagal. Inline sa request thread, ang
+burst ng treasurer logins ay kumakain ng lahat ng worker threads. Dito,
+hanggang PASSWORD_HASH_WORKERS lang ang sabay na hashing per process;
+ang sobra ay naghihintay (bounded) at HashingBusy (503) kapag puno.
+
+    hashed = hash_password("s3cret")
+    ok, new_hash = verify_password(org["password"], "s3cret")
+    if ok and new_hash:
+        ...  # i-save ang new_hash (nagbago ang PASSWORD_HASH_METHOD)
+
+Benchmark (logins/sec ng isang worker):
+    flask --app app pres bench-login --seconds 10 --concurrency 16
+
+Config (env):
+    PASSWORD_HASH_METHOD    werkzeug method, e.g. scrypt:32768:8:1 or
+                            pbkdf2:sha256:600000 (default: werkzeug default)
+    PASSWORD_HASH_WORKERS   sabay na hashing per process (default 2)
+    PASSWORD_HASH_QUEUE     max naghihintay bago mag-HashingBusy (default 32)
+    PASSWORD_HASH_WAIT      seconds na hihintayin ang slot (default 10)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class HashingBusy(RuntimeError):
+    """Puno ang hashing queue; ang caller ay dapat mag-503 + Retry-After."""
+
+
+class PasswordHasher:
+    def __init__(self, method=None, workers=None, queue_size=None, wait=None):
+        self.method = method or os.getenv("PASSWORD_HASH_METHOD") or None
+        self.workers = max(1, workers or _env_int("PASSWORD_HASH_WORKERS", 2))
+        self.queue_size = max(0, queue_size if queue_size is not None
+                              else _env_int("PASSWORD_HASH_QUEUE", 32))
+        self.wait = wait if wait is not None else _env_int("PASSWORD_HASH_WAIT", 10)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._prefix = None
+
+    def _pool(self):
+        # lazy start: huwag mag-spawn ng threads bago mag-fork ang gunicorn
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="pw-hash"
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            raise HashingBusy("Password hashing queue is full")
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def _generate(self, password):
+        if self.method:
+            return generate_password_hash(password, method=self.method)
+        return generate_password_hash(password)
+
+    @property
+    def prefix(self):
+        """Method string na nakasulat sa hash, e.g. "scrypt:32768:8:1"."""
+        if self._prefix is None:
+            self._prefix = self._generate("").split("$", 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, stored):
+        return bool(stored) and stored.split("$", 1)[0] != self.prefix
+
+    # -------- API
+
+    def hash(self, password):
+        return self._run(self._generate, password)
+
+    def verify(self, stored, password):
+        """(ok, new_hash). new_hash ay None maliban kung luma ang parameters."""
+        if not stored or password is None:
+            return False, None
+        ok = self._run(check_password_hash, stored, password)
+        if ok and self.needs_rehash(stored):
+            try:
+                return True, self.hash(password)
+            except HashingBusy:
+                return True, None  # sa susunod na login na lang
+        return ok, None
+
+
+hasher = PasswordHasher()
+
+
+def hash_password(password):
+    return hasher.hash(password)
+
+
+def verify_password(stored, password):
+    return hasher.verify(stored, password)
+
+
+def benchmark(seconds=10, concurrency=16, password="benchmark-password"):
+    """Sabay-sabay na login verifications (tulad ng orientation burst).
+
+    Returns {"logins", "seconds", "logins_per_sec", "p50_ms", "p95_ms", "busy"}.
+    """
+    stored = hasher.hash(password)
+    latencies, busy = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok, _ = hasher.verify(stored, password)
+            except HashingBusy:
+                with lock:
+                    busy[0] += 1
+                continue
+            if not ok:
+                raise AssertionError("benchmark hash did not verify")
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p):
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1)
+
+    return {
+        "method": hasher.prefix,
+        "workers": hasher.workers,
+        "logins": len(latencies),
+        "seconds": round(elapsed, 2),
+        "logins_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "busy": busy[0],
+    }
+
+
+def _reset_after_fork():
+    # executor threads ng parent ay wala sa child
+    hasher._lock = threading.Lock()
+    hasher._executor = None
+    hasher._slots = threading.BoundedSemaphore(hasher.workers + hasher.queue_size)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -7,12 +7,14 @@ Logo file: place 671433942_27312238625051044_6853393097405090621_n.png
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from supabase import create_client
 from dotenv import load_dotenv
-from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime
 import os, re
 
+from ledger_rollups import fetch_rollups, sum_rollups
+from ledger_pages import (fetch_transaction_page, page_totals,
+                          fetch_history_page, period_totals, month_range)
+
 try:
     from PIL import Image, ImageTk
     PIL_OK = True
@@ -20,7 +22,9 @@ except ImportError:
     PIL_OK = False
 
 load_dotenv()
-supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+from db import supabase   # shared pooled client (see db.py)
+from report_submit import NoPendingReport, submit_report
+from passwords import verify_password
 
 # ─────────────────────────────────────────
 # DESIGN TOKENS  (exact match to CSS)
@@ -181,7 +185,7 @@ class LoginWindow(tk.Toplevel):
             if org.get("status") == "Archived":
                 self.err_label.config(text="This account is archived. Contact OSAS.")
                 return
-            if not check_password_hash(org["password"], password):
+            if not verify_password(org["password"], password)[0]:
                 self.err_label.config(text="Incorrect password.")
                 return
             self.destroy()
@@ -331,38 +335,28 @@ class HomeTab(tk.Frame):
             wallets    = wres.data or []
             wallet_ids = [w["id"] for w in wallets]
 
-            income_all = expense_all = income_mo = expense_mo = 0.0
             now = datetime.now()
             txs_all = []
 
             if wallet_ids:
+                # ledger rollups (per folder/month) instead of every transaction
+                rollups = fetch_rollups(supabase, wallet_ids=wallet_ids)
+                income_all, expense_all = sum_rollups(rollups)
+                income_mo, expense_mo = sum_rollups(rollups, year=now.year,
+                                                    month=now.month)
+
                 tres = supabase.table("wallet_transactions")\
                                .select("kind,date_issued,quantity,price,description,wallet_id")\
-                               .in_("wallet_id", wallet_ids).execute()
-                for tx in (tres.data or []):
-                    qty   = int(tx.get("quantity") or 0)
-                    price = float(tx.get("price") or 0)
-                    amt   = qty * price
-                    if tx.get("kind") == "income":
-                        income_all += amt
-                    else:
-                        expense_all += amt
-                    d = tx.get("date_issued","")[:10]
-                    try:
-                        dt = datetime.strptime(d, "%Y-%m-%d")
-                        if dt.year == now.year and dt.month == now.month:
-                            if tx.get("kind") == "income":
-                                income_mo += amt
-                            else:
-                                expense_mo += amt
-                    except: pass
-                    txs_all.append(tx)
+                               .in_("wallet_id", wallet_ids)\
+                               .order("date_issued", desc=True).limit(5).execute()
+                txs_all = tres.data or []
 
                 bres = supabase.table("wallet_budgets").select("amount,wallet_id")\
                                .in_("wallet_id", wallet_ids).execute()
                 beginning = sum(float(b.get("amount") or 0) for b in (bres.data or []))
                 total_bal = beginning + income_all - expense_all
             else:
+                income_mo = expense_mo = 0.0
                 total_bal = 0.0
 
             rres = supabase.table("financial_reports")\
@@ -432,6 +426,8 @@ class HistoryTab(tk.Frame):
         self._filter = "all"
         self._year   = datetime.now().year
         self._month  = datetime.now().month
+        self._wids   = None   # wallet ids ng org (isang beses lang kinukuha)
+        self._after  = None   # keyset cursor ng susunod na page
         self._build()
         self.load()
 
@@ -465,7 +461,11 @@ class HistoryTab(tk.Frame):
                           command=lambda x=f: self._set_filter(x))
             b.pack(side="left", padx=4)
             self._filter_btns[f] = b
-        self._set_filter("all")
+
+        # period totals (rollups, see ledger_pages.py)
+        self._totals_lbl = tk.Label(self, text="", bg=WHITE, fg=TEXT_MUTE,
+                                    font=("Poppins",9))
+        self._totals_lbl.pack()
 
         # scrollable list
         frame = tk.Frame(self, bg=WHITE)
@@ -479,6 +479,7 @@ class HistoryTab(tk.Frame):
         canvas.configure(yscrollcommand=sb.set)
         canvas.pack(side="left", fill="both", expand=True)
         sb.pack(side="right", fill="y")
+        self._set_filter("all", reload=False)
 
     def _update_month_label(self):
         months = ["","January","February","March","April","May","June",
@@ -497,7 +498,7 @@ class HistoryTab(tk.Frame):
             self._month = 1; self._year += 1
         self._update_month_label(); self.load()
 
-    def _set_filter(self, f):
+    def _set_filter(self, f, reload=True):
         self._filter = f
         for k,b in self._filter_btns.items():
             if k == f:
@@ -505,38 +506,42 @@ class HistoryTab(tk.Frame):
             else:
                 b.config(bg=WHITE, fg=TEXT_MUTE,
                          highlightbackground=CREAM, highlightthickness=1)
-        self.load()
+        if reload: self.load()
 
-    def load(self):
-        for w in self._tx_inner.winfo_children(): w.destroy()
+    def load(self, more=False):
+        if not more:
+            for w in self._tx_inner.winfo_children(): w.destroy()
+            self._after = None
         org_id = self.org["id"]
         try:
-            wres = supabase.table("wallets").select("id")\
-                           .eq("organization_id", org_id).execute()
-            wids = [w["id"] for w in (wres.data or [])]
+            if self._wids is None:
+                wres = supabase.table("wallets").select("id")\
+                               .eq("organization_id", org_id).execute()
+                self._wids = [w["id"] for w in (wres.data or [])]
+            wids = self._wids
             if not wids:
                 tk.Label(self._tx_inner, text="No wallets found.",
                          bg=WHITE, fg=TEXT_MUTE,
                          font=("Poppins",10)).pack(pady=40)
                 return
 
-            tres = supabase.table("wallet_transactions")\
-                           .select("kind,date_issued,quantity,price,description,particulars,income_type")\
-                           .in_("wallet_id", wids)\
-                           .order("date_issued", desc=True).execute()
-            txs = []
-            for tx in (tres.data or []):
-                d = tx.get("date_issued","")[:10]
-                try:
-                    dt = datetime.strptime(d, "%Y-%m-%d")
-                    if dt.year != self._year or dt.month != self._month:
-                        continue
-                except: continue
-                if self._filter != "all" and tx.get("kind") != self._filter:
-                    continue
-                txs.append(tx)
-
-            if not txs:
+            # date range + kind sa database (indexed date_issued)
+            start, end = month_range(self._year, self._month)
+            kind = None if self._filter == "all" else self._filter
+            txs, self._after = fetch_history_page(
+                supabase, wids, start, end, kind=kind,
+                after=self._after if more else None)
+            if not more:
+                t = period_totals(supabase, wids, start, end, kind=kind)
+                self._count = t["count"]
+                self._totals_lbl.config(
+                    text=f"Income: Php {t['income']:,.2f}   ·   "
+                         f"Expenses: Php {t['expense']:,.2f}   ·   "
+                         f"Net: Php {t['income'] - t['expense']:,.2f}")
+            for w in self._tx_inner.winfo_children():
+                if getattr(w, "_is_more_btn", False): w.destroy()
+
+            if not txs and not more:
                 tk.Label(self._tx_inner,
                          text="No transactions for this period.",
                          bg=WHITE, fg=TEXT_MUTE,
@@ -570,6 +575,17 @@ class HistoryTab(tk.Frame):
                 tk.Label(card, text=f"{sign}Php {amt:,.2f}",
                          bg=WHITE, fg=color, font=("Poppins",11,"bold"),
                          padx=12).pack(side="right", pady=8)
+
+            if self._after:
+                shown = sum(1 for w in self._tx_inner.winfo_children()
+                            if isinstance(w, tk.Frame))
+                left_n = max(0, self._count - shown)
+                btn = styled_btn(self._tx_inner,
+                                 f"Load more ({left_n})" if left_n else "Load more",
+                                 lambda: self.load(more=True),
+                                 bg=CREAM, fg=TEXT_DARK, font=("Poppins",9))
+                btn._is_more_btn = True
+                btn.pack(pady=8)
         except Exception as e:
             messagebox.showerror("History Error", str(e))
 
@@ -584,6 +600,7 @@ class WalletsTab(tk.Frame):
         self._folders  = []
         self._sel_folder = None
         self._tx_filter  = "all"
+        self._tx_after   = None   # keyset cursor ng susunod na page
         self._build()
         self._show_list()
         self.load_folders()
@@ -846,21 +863,24 @@ class WalletsTab(tk.Frame):
             tk.Label(card, text=f"{f['year']}", bg=bg_col, fg=TEXT_MUTE,
                      font=("Poppins",8)).place(relx=0.5, rely=0.70, anchor="center")
 
-    def _load_transactions(self):
-        for w in self._tx_list.winfo_children(): w.destroy()
+    TX_PAGE = 50
+
+    def _load_transactions(self, more=False):
+        if not more:
+            for w in self._tx_list.winfo_children(): w.destroy()
+            self._tx_after = None
         if not self._sel_folder: return
         fid = self._sel_folder["id"]
         wid = self._sel_folder["wallet_id"]
+        kind = None if self._tx_filter == "all" else self._tx_filter
         try:
-            res = supabase.table("wallet_transactions")\
-                          .select("id,kind,date_issued,description,quantity,price,income_type,particulars")\
-                          .eq("wallet_id", wid)\
-                          .eq("budget_id", fid)\
-                          .order("date_issued").execute()
-            txs = res.data or []
-            if self._tx_filter != "all":
-                txs = [t for t in txs if t.get("kind") == self._tx_filter]
-            if not txs:
+            txs, self._tx_after = fetch_transaction_page(
+                supabase, wid, fid, kind=kind,
+                limit=self.TX_PAGE, after=self._tx_after if more else None)
+            # alisin ang lumang "Load more" bago mag-append
+            for w in self._tx_list.winfo_children():
+                if getattr(w, "_is_more_btn", False): w.destroy()
+            if not txs and not more:
                 tk.Label(self._tx_list, text="No transactions.",
                          bg=WHITE, fg=TEXT_MUTE,
                          font=("Poppins",10)).pack(pady=30)
@@ -888,28 +908,27 @@ class WalletsTab(tk.Frame):
                 tk.Label(row, text=f"{sign}Php {amt:,.2f}",
                          bg=WHITE, fg=color,
                          font=("Poppins",10,"bold"), padx=10).pack(side="right")
+            if self._tx_after:
+                shown = sum(1 for w in self._tx_list.winfo_children()
+                            if isinstance(w, tk.Frame))
+                total = page_totals(supabase, fid, kind=kind)["count"]
+                left_n = max(0, total - shown)
+                btn = styled_btn(self._tx_list,
+                                 f"Load more ({left_n})" if left_n else "Load more",
+                                 lambda: self._load_transactions(more=True),
+                                 bg=CREAM, fg=TEXT_DARK, font=("Poppins",9))
+                btn._is_more_btn = True
+                btn.pack(pady=8)
         except Exception as e:
             messagebox.showerror("Transactions Error", str(e))
 
     def _load_report_stats(self):
         if not self._sel_folder: return
         fid = self._sel_folder["id"]
-        wid = self._sel_folder["wallet_id"]
         org = self.org["id"]
         try:
-            res = supabase.table("wallet_transactions")\
-                          .select("kind,quantity,price")\
-                          .eq("wallet_id", wid)\
-                          .eq("budget_id", fid).execute()
-            total_inc = total_exp = 0.0
-            for tx in (res.data or []):
-                qty   = int(tx.get("quantity") or 0)
-                price = float(tx.get("price") or 0)
-                amt   = qty * price
-                if tx.get("kind") == "income":
-                    total_inc += amt
-                else:
-                    total_exp += amt
+            rollups = fetch_rollups(supabase, budget_ids=[fid])
+            total_inc, total_exp = sum_rollups(rollups)
             budget = self._sel_folder.get("amount", 0)
             ending = budget + total_inc - total_exp
             self._stat_vars["budget"].set(f"Php {budget:,.2f}")
@@ -982,25 +1001,12 @@ class WalletsTab(tk.Frame):
         wid = self._sel_folder["wallet_id"]
         org = self.org["id"]
         try:
-            res = supabase.table("financial_reports")\
-                          .select("*")\
-                          .eq("organization_id", org)\
-                          .eq("wallet_id", wid)\
-                          .eq("status","Pending Review")\
-                          .order("created_at", desc=True).limit(1).execute()
-            if not res.data:
-                messagebox.showinfo("No Report","No pending report found. Generate one first.")
-                return
-            rep    = res.data[0]
-            rep_id = rep["id"]
-            from datetime import datetime as dt
-            supabase.table("financial_reports").update({
-                "status": "Submitted",
-                "submission_date": dt.utcnow().date().isoformat(),
-                "updated_at": dt.utcnow().isoformat(),
-            }).eq("id", rep_id).execute()
+            # same flow as the web submit (archive + OSAS checklist, isang RPC)
+            submit_report(supabase, org, wid, org_name=self.org.get("org_name"))
             messagebox.showinfo("Submitted ✓",
                 "Report submitted to OSAS successfully!")
+        except NoPendingReport:
+            messagebox.showinfo("No Report","No pending report found. Generate one first.")
         except Exception as e:
             messagebox.showerror("Submit Error", str(e))
 
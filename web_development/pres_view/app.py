@@ -8,13 +8,12 @@ from flask import (
     session,
     jsonify,
     send_file,
+    make_response,
 )
 import os
 import re
 from uuid import uuid4
 from dotenv import load_dotenv
-from werkzeug.security import check_password_hash, generate_password_hash
-from supabase import create_client
 from slugify import slugify
 from docx import Document
 from docx.shared import Inches
@@ -24,7 +23,35 @@ import secrets
 import string
 from datetime import datetime, timedelta, timezone
 from flask import current_app
-from flask_mail import Message
+import click
+
+from report_docx import ReportTemplate
+from receipt_fetcher import fetch_receipts
+from receipt_renditions import upload_renditions, print_path_of
+from report_jobs import jobs as report_jobs, content_hash, public_status
+from report_submit import NoPendingReport, submit_report
+from compliance import compliance
+from view_versions import view_etag, is_not_modified, not_modified, with_etag
+from ledger_batch import BatchError, apply_batch, parse_ops
+from passwords import benchmark as bench_passwords, hash_password, verify_password
+from idempotency import idempotent
+from ledger_import import import_ledger
+from ledger_pages import (
+    decode_cursor,
+    fetch_history_page,
+    fetch_transaction_page,
+    month_range,
+    page_totals,
+    parse_date,
+    parse_limit,
+    period_totals,
+)
+from ledger_rollups import (
+    fetch_rollups,
+    sum_rollups,
+    rebuild_rollups,
+    verify_rollups,
+)
 
 pres = Blueprint(
     "pres",
@@ -36,11 +63,23 @@ pres = Blueprint(
 load_dotenv()
 
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Shared pooled Supabase client (see db.py)
+from db import supabase
+from folder_cache import folders
 
 BUCKET_RECEIPTS = "Receipts"
+# rendered archive DOCX files (archives/<org_id>/<archive_id>-<uuid>.docx)
+BUCKET_ARCHIVES = os.getenv("BUCKET_ARCHIVES", BUCKET_RECEIPTS)
+
+# Parsed once; bawat render ay deepcopy lang (see report_docx.py)
+REPORT_TEMPLATE = ReportTemplate(
+    os.path.join(
+        os.path.dirname(__file__),
+        "templates",
+        "pres",
+        "finance_report_template.docx",
+    )
+)
 
 
 def generate_reset_code(length=6):
@@ -54,16 +93,17 @@ import os
 from datetime import datetime
 
 from flask import current_app, render_template
-from flask_mail import Message
+
+from mail_outbox import SMTPSink, outbox
 
 
 BANNER_URL = os.getenv("BANNER_URL")
 
 
 def send_reset_email(to_email, reset_link, org_name):
-    mail = current_app.extensions.get("mail")
-    if mail is None:
-        current_app.logger.error("Mail extension not initialized")
+    """Render + enqueue (ang background sender ang magpapadala, see mail_outbox.py)."""
+    if "mail_outbox" not in current_app.extensions:
+        current_app.logger.error("Mail outbox not initialized")
         return
 
     # fallback kung walang org_name na naipasa
@@ -78,19 +118,29 @@ def send_reset_email(to_email, reset_link, org_name):
         banner_url=BANNER_URL,
     )
 
-    msg = Message(
-        subject="PockiTrack Password Reset",
-        recipients=[to_email],
-        sender=current_app.config.get("MAIL_DEFAULT_SENDER"),
+    outbox.enqueue(
+        "PockiTrack Password Reset",
+        [to_email],
+        body=(
+            "You requested a password reset for your PockiTrack account.\n\n"
+            f"Use this link to set a new password (valid for 15 minutes):\n{reset_link}\n\n"
+            "If you did not request this, you can ignore this email."
+        ),
+        html=html_body,
     )
-    msg.body = (
-        "You requested a password reset for your PockiTrack account.\n\n"
-        f"Use this link to set a new password (valid for 15 minutes):\n{reset_link}\n\n"
-        "If you did not request this, you can ignore this email."
-    )
-    msg.html = html_body
 
-    mail.send(msg)
+
+def send_reset_code_email(to_email, code):
+    """Profile reset code (plain text), via the outbox."""
+    outbox.enqueue(
+        "PockiTrack Password Reset Code",
+        [to_email],
+        body=(
+            f"Your PockiTrack password reset code is: {code}\n\n"
+            "It is valid for 15 minutes. If you did not request this, "
+            "you can ignore this email."
+        ),
+    )
 
 
 def validate_password(pw: str):
@@ -108,74 +158,24 @@ def validate_password(pw: str):
     return errors
 
 
-MONTH_LABELS = {
-    "august": "August",
-    "september": "September",
-    "october": "October",
-    "november": "November",
-    "december": "December",
-    "january": "January",
-    "february": "February",
-    "march": "March",
-    "april": "April",
-    "may": "May",
-}
-
-
-def create_osas_notification(
-    org_id, report_id, status="Pending Review", month_key=None
-):
+def get_real_wallet_id(folder_id: int):
     """
-    Insert a row into osas_notifications so OSAS bell sees a new item.
-    Message format example:
-      has a report "Pending Review for November"
+    folder_id = wallet_budgets.id â†’ return wallet_id or None.
     """
-    try:
-        # kunin org_name para sa display
-        org_res = (
-            supabase.table("organizations")
-            .select("org_name")
-            .eq("id", org_id)
-            .single()
-            .execute()
-        )
-        org_name = org_res.data["org_name"] if org_res.data else "Organization"
+    folder = folders.get(supabase, folder_id)
+    return folder["wallet_id"] if folder else None
 
-        month_label = ""
-        if month_key:
-            month_label = MONTH_LABELS.get(month_key.lower(), month_key.title())
 
-        if month_label:
-            message = f'has a report "{status} for {month_label}"'
-        else:
-            message = f'has a report "{status}"'
-
-        supabase.table("osas_notifications").insert(
-            {
-                "org_id": org_id,
-                "report_id": report_id,
-                "org_name": org_name,
-                "message": message,
-                # created_at at is_read naka-default sa table
-            }
-        ).execute()
-    except Exception:
-        # huwag pabagsakin ang submit kahit mag-fail ang notif
-        pass
-
-
-def get_real_wallet_id(folder_id: int):
+def get_owned_wallet_id(folder_id: int):
     """
-    folder_id = wallet_budgets.id â†’ return wallet_id or None.
+    Like get_real_wallet_id, pero None din kapag hindi sa org ng session
+    ang folder (para sa writes: 404, hindi 403, gaya ng archives).
     """
-    res = (
-        supabase.table("wallet_budgets")
-        .select("wallet_id")
-        .eq("id", folder_id)
-        .single()
-        .execute()
-    )
-    return res.data["wallet_id"] if res.data else None
+    org_id = session.get("org_id")
+    folder = folders.get(supabase, folder_id)
+    if not folder or org_id is None or folder.get("organization_id") != org_id:
+        return None
+    return folder["wallet_id"]
 
 
 # -----------------------
@@ -234,15 +234,24 @@ def pres_login():
             flash(error_msg, "danger")
             return redirect(url_for("pres.pres_login"))
 
-        # wrong password
-        if not check_password_hash(org["password"], password):
+        # wrong password (hashing runs sa bounded pool, see passwords.py)
+        ok, new_hash = verify_password(org["password"], password)
+        if not ok:
             error_msg = "Incorrect password."
             if request.accept_mimetypes.best == "application/json":
                 return jsonify({"success": False, "error": error_msg}), 401
             flash(error_msg, "danger")
             return redirect(url_for("pres.pres_login"))
 
-        # correct password
+        # correct password; i-upgrade ang hash kung nagbago ang work factor
+        if new_hash:
+            try:
+                supabase.table("organizations").update({"password": new_hash}).eq(
+                    "id", org["id"]
+                ).eq("password", org["password"]).execute()
+            except Exception as e:
+                print("Error rehashing password:", e)
+
         session["org_id"] = org["id"]
         session["org_name"] = org["org_name"]
 
@@ -262,6 +271,12 @@ def pres_login():
         # NORMAL LOGIN
         session["pres_user"] = True
 
+        # folder -> wallet cache para sa susunod na writes
+        try:
+            folders.warm_org(supabase, org["id"])
+        except Exception as e:
+            print("Error warming folder cache:", e)
+
         if request.accept_mimetypes.best == "application/json":
             return jsonify(
                 {
@@ -446,7 +461,7 @@ def reset_password_with_code():
             400,
         )
 
-    hashed_pw = generate_password_hash(new_pw)
+    hashed_pw = hash_password(new_pw)
 
     # update organizations password + clear reset_code
     supabase.table("organizations").update(
@@ -487,7 +502,7 @@ def change_password():
         flash("Passwords do not match.", "danger")
         return render_template("change_password.html", code=code, email=email)
 
-    hashed_pw = generate_password_hash(new_password)
+    hashed_pw = hash_password(new_password)
 
     if code and email:
         # 1) hanapin reset row
@@ -601,51 +616,14 @@ def get_dashboard_summary():
                 }
             )
 
-        # 2) get all transactions for those wallets
-        tx_res = (
-            supabase.table("wallet_transactions")
-            .select("kind, date_issued, quantity, price")
-            .in_("wallet_id", wallet_ids)
-            .execute()
-        )
+        # 2) ledger rollups (per wallet/folder/month) instead of raw rows
+        rollups = fetch_rollups(supabase, wallet_ids=wallet_ids)
 
         now = datetime.now()
-        this_year = now.year
-        this_month = now.month
-
-        income_month = 0.0
-        expenses_month = 0.0
-        total_income_all = 0.0
-        total_expenses_all = 0.0
-
-        for tx in tx_res.data or []:
-            qty = int(tx.get("quantity") or 0)
-            price = float(tx.get("price") or 0)
-            amt = qty * price
-
-            # total across all time for balance
-            if tx.get("kind") == "income":
-                total_income_all += amt
-            elif tx.get("kind") == "expense":
-                total_expenses_all += amt
-
-            # filter by current month/year for monthly cards
-            # filter by current month/year for monthly cards
-            d_str = tx.get("date_issued")
-            if not d_str:
-                continue
-
-            try:
-                # kung 'YYYY-MM-DD' lang, sapat na ito
-                d = datetime.strptime(d_str[:10], "%Y-%m-%d")
-            except Exception:
-                continue
-
-            if d.year == this_year and d.month == this_month:
-                if tx.get("kind") == "income":
-                    income_month += amt
-                elif tx.get("kind") == "expense":
-                    expenses_month += amt
+        total_income_all, total_expenses_all = sum_rollups(rollups)
+        income_month, expenses_month = sum_rollups(
+            rollups, year=now.year, month=now.month
+        )
 
         # 3) budgets (beginning cash) to compute total balance
         budgets_res = (
@@ -709,6 +687,13 @@ def get_dashboard_full():
 
     from datetime import datetime
 
+    # conditional GET: income/expenses "this month" -> kasama ang buwan sa etag
+    etag = view_etag(
+        supabase, "dashboard_full", org_id, extra=(datetime.now().strftime("%Y-%m"),)
+    )
+    if is_not_modified(etag):
+        return not_modified(etag)
+
     try:
         # 1) get all wallets for this org
         wallets_res = (
@@ -722,88 +707,62 @@ def get_dashboard_full():
 
         # If walang wallets, return empty + zero summary
         if not wallet_ids:
-            return jsonify(
-                {
-                    "summary": {
-                        "total_balance": 0,
-                        "reports_submitted": 0,
-                        "income_month": 0,
-                        "expenses_month": 0,
-                    },
-                    "wallets": [],
-                    "recent_transactions": [],
-                }
+            return with_etag(
+                jsonify(
+                    {
+                        "summary": {
+                            "total_balance": 0,
+                            "reports_submitted": 0,
+                            "income_month": 0,
+                            "expenses_month": 0,
+                        },
+                        "wallets": [],
+                        "recent_transactions": [],
+                    }
+                ),
+                etag,
             )
 
-        # 2) all transactions for those wallets (for summary + recent)
-        tx_res = (
+        # 2) ledger rollups for the summary cards + per-wallet totals
+        rollups = fetch_rollups(supabase, wallet_ids=wallet_ids)
+
+        now = datetime.now()
+        total_income_all, total_expenses_all = sum_rollups(rollups)
+        income_month, expenses_month = sum_rollups(
+            rollups, year=now.year, month=now.month
+        )
+
+        # recent transactions: top 5 lang ang kailangan ng frontend
+        recent_res = (
             supabase.table("wallet_transactions")
             .select(
                 "id, wallet_id, kind, date_issued, quantity, price, "
                 "income_type, particulars, description"
             )
             .in_("wallet_id", wallet_ids)
+            .not_.is_("date_issued", None)
+            .order("date_issued", desc=True)
+            .limit(5)
             .execute()
         )
-        txs = tx_res.data or []
-
-        now = datetime.now()
-        this_year = now.year
-        this_month = now.month
-
-        income_month = 0.0
-        expenses_month = 0.0
-        total_income_all = 0.0
-        total_expenses_all = 0.0
-
-        # also build recent transactions data for frontend
         recent_tx = []
-
-        for tx in txs:
+        for tx in recent_res.data or []:
             qty = int(tx.get("quantity") or 0)
             price = float(tx.get("price") or 0)
-            amt = qty * price
-
-            if tx.get("kind") == "income":
-                total_income_all += amt
-            elif tx.get("kind") == "expense":
-                total_expenses_all += amt
-
-            d_str = tx.get("date_issued")
-            if d_str:
-                try:
-                    d = datetime.strptime(d_str[:10], "%Y-%m-%d")
-                except Exception:
-                    d = None
-            else:
-                d = None
-
-            if d and d.year == this_year and d.month == this_month:
-                if tx.get("kind") == "income":
-                    income_month += amt
-                elif tx.get("kind") == "expense":
-                    expenses_month += amt
-
-            # prepare for recent list
-            if d:
-                recent_tx.append(
-                    {
-                        "id": tx.get("id"),
-                        "wallet_id": tx.get("wallet_id"),
-                        "type": tx.get("kind"),
-                        "date": d_str,
-                        "quantity": qty,
-                        "price": price,
-                        "income_type": tx.get("income_type"),
-                        "particulars": tx.get("particulars"),
-                        "description": tx.get("description"),
-                        "total_amount": amt,
-                    }
-                )
-
-        # sort recent_tx by date desc, then take top 5
-        recent_tx.sort(key=lambda r: r["date"], reverse=True)
-        recent_tx = recent_tx[:5]
+            recent_tx.append(
+                {
+                    "id": tx.get("id"),
+                    "wallet_id": tx.get("wallet_id"),
+                    "type": tx.get("kind"),
+                    "date": tx.get("date_issued"),
+                    "quantity": qty,
+                    "price": price,
+                    "income_type": tx.get("income_type"),
+                    "particulars": tx.get("particulars"),
+                    "description": tx.get("description"),
+                    "total_amount": qty * price,
+                }
+            )
 
         # 3) budgets for all wallets
         budgets_res = (
@@ -831,17 +790,11 @@ def get_dashboard_full():
         #    compute total_income and total_expenses per wallet
         wallet_map = {w["id"]: w for w in wallets}
         wallet_stats = {w_id: {"income": 0.0, "expense": 0.0} for w_id in wallet_ids}
-        for tx in txs:
-            w_id = tx.get("wallet_id")
-            if w_id not in wallet_stats:
+        for r in rollups:
+            w_id = r.get("wallet_id")
+            if w_id not in wallet_stats or r.get("kind") not in ("income", "expense"):
                 continue
-            qty = int(tx.get("quantity") or 0)
-            price = float(tx.get("price") or 0)
-            amt = qty * price
-            if tx.get("kind") == "income":
-                wallet_stats[w_id]["income"] += amt
-            elif tx.get("kind") == "expense":
-                wallet_stats[w_id]["expense"] += amt
+            wallet_stats[w_id][r["kind"]] += float(r.get("total") or 0)
 
         # budgets per wallet
         budget_per_wallet = {
@@ -871,12 +824,15 @@ def get_dashboard_full():
             "expenses_month": expenses_month,
         }
 
-        return jsonify(
-            {
-                "summary": summary,
-                "wallets": wallets_overview,
-                "recent_transactions": recent_tx,
-            }
+        return with_etag(
+            jsonify(
+                {
+                    "summary": summary,
+                    "wallets": wallets_overview,
+                    "recent_transactions": recent_tx,
+                }
+            ),
+            etag,
         )
     except Exception as e:
         print("Error get_dashboard_full:", e)
@@ -967,6 +923,10 @@ def get_wallets_overview():
 
     org_id = session.get("org_id")
 
+    etag = view_etag(supabase, "wallets_overview", org_id)
+    if is_not_modified(etag):
+        return not_modified(etag)
+
     try:
         # 1) all wallets for this org
         wallets_res = (
@@ -977,7 +937,7 @@ def get_wallets_overview():
         )
         wallets = {w["id"]: w["name"] for w in (wallets_res.data or [])}
         if not wallets:
-            return jsonify([])
+            return with_etag(jsonify([]), etag)
 
         # 2) all budget folders for those wallets
         budgets_res = (
@@ -988,15 +948,10 @@ def get_wallets_overview():
         )
         budget_ids = [b["id"] for b in (budgets_res.data or [])]
         if not budget_ids:
-            return jsonify([])
+            return with_etag(jsonify([]), etag)
 
-        # 3) all transactions for those folders
-        tx_res = (
-            supabase.table("wallet_transactions")
-            .select("budget_id, kind, quantity, price, date_issued")
-            .in_("budget_id", budget_ids)
-            .execute()
-        )
+        # 3) ledger rollups for those folders (per month + kind)
+        rollups = fetch_rollups(supabase, budget_ids=budget_ids)
 
         from datetime import datetime
 
@@ -1015,22 +970,20 @@ def get_wallets_overview():
             }
 
         # aggregate income/expenses by folder
-        for tx in tx_res.data or []:
-            fid = tx["budget_id"]
+        for r in rollups:
+            fid = r["budget_id"]
             if fid not in by_folder:
                 continue
-            qty = int(tx.get("quantity") or 0)
-            price = float(tx.get("price") or 0)
-            amt = qty * price
-            if tx.get("kind") == "income":
+            amt = float(r.get("total") or 0)
+            if r.get("kind") == "income":
                 by_folder[fid]["total_income"] += amt
-            elif tx.get("kind") == "expense":
+            elif r.get("kind") == "expense":
                 by_folder[fid]["total_expenses"] += amt
 
-            ts = tx.get("date_issued")
+            ts = r.get("last_activity")
             if ts:
                 try:
-                    dt_val = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+                    dt_val = datetime.fromisoformat(ts)
                 except Exception:
                     dt_val = None
                 if dt_val:
@@ -1051,7 +1004,7 @@ def get_wallets_overview():
             reverse=True,
         )
 
-        return jsonify(items)
+        return with_etag(jsonify(items), etag)
     except Exception as e:
         print("Error get_wallets_overview:", e)
         return jsonify({"error": str(e)}), 500
@@ -1105,10 +1058,35 @@ def set_budget(folder_id):
 
 @pres.route("/api/wallets/<int:folder_id>/transactions", methods=["GET"])
 def get_wallet_transactions(folder_id):
-    """Get transactions for wallet"""
+    """
+    Get transactions for wallet.
+    Walang params -> buong folder (legacy). Optional (see ledger_pages.py):
+      kind=income|expense, limit=N, after=<cursor>, order=asc|desc
+    May params -> headers X-Total-Count / X-Total-Income / X-Total-Expense,
+    at X-Next-Cursor kung may kasunod pang page.
+    """
     if not session.get("pres_user"):
         return jsonify({"error": "Unauthorized"}), 401
 
+    kind = request.args.get("kind") or None
+    after = request.args.get("after") or None
+    desc = request.args.get("order", "asc").lower() == "desc"
+    paged = any(k in request.args for k in ("kind", "limit", "after", "order"))
+    try:
+        limit = parse_limit(request.args.get("limit"), default=None)
+        if kind is not None and kind not in ("income", "expense"):
+            raise ValueError("kind must be income or expense")
+        if after:
+            decode_cursor(after)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    etag = view_etag(
+        supabase, "wallet_transactions", session.get("org_id"), budget_id=folder_id
+    )
+    if is_not_modified(etag):
+        return not_modified(etag)
+
     try:
         # Get folder to find wallet_id
         folder_res = (
@@ -1124,20 +1102,18 @@ def get_wallet_transactions(folder_id):
 
         wallet_id = folder_res.data["wallet_id"]
 
-        res = (
-            supabase.table("wallet_transactions")
-            .select(
-                "id, kind, date_issued, description, quantity, price, "
-                "income_type, particulars"
-            )
-            .eq("wallet_id", wallet_id)
-            .eq("budget_id", folder_id)
-            .order("date_issued")
-            .execute()
+        rows, next_after = fetch_transaction_page(
+            supabase,
+            wallet_id,
+            folder_id,
+            kind=kind,
+            limit=limit,
+            after=after,
+            desc=desc,
         )
 
         txs = []
-        for tx in res.data or []:
+        for tx in rows:
             try:
                 qty = int(tx.get("quantity", 0))
                 price = float(tx.get("price", 0))
@@ -1169,7 +1145,16 @@ def get_wallet_transactions(folder_id):
             except Exception as e:
                 print("Skipping bad tx row", tx, e)
                 continue
-        return jsonify(txs)
+
+        resp = make_response(jsonify(txs))
+        if paged:
+            totals = page_totals(supabase, folder_id, kind=kind)
+            resp.headers["X-Total-Count"] = str(totals["count"])
+            resp.headers["X-Total-Income"] = f"{totals['income']:.2f}"
+            resp.headers["X-Total-Expense"] = f"{totals['expense']:.2f}"
+            if next_after:
+                resp.headers["X-Next-Cursor"] = next_after
+        return with_etag(resp, etag)
     except Exception as e:
         import traceback
 
@@ -1179,6 +1164,7 @@ def get_wallet_transactions(folder_id):
 
 
 @pres.route("/api/wallets/<int:folder_id>/transactions", methods=["POST"])
+@idempotent
 def add_wallet_transaction(folder_id):
     """Create new transaction"""
     if not session.get("pres_user"):
@@ -1241,6 +1227,82 @@ def add_wallet_transaction(folder_id):
         return jsonify({"error": str(e)}), 500
 
 
+@pres.route("/api/wallets/<int:folder_id>/transactions/import", methods=["POST"])
+@idempotent
+def import_wallet_transactions(folder_id):
+    """
+    Bulk import ng CSV / XLSX ledger (multipart field "file").
+    ?dry_run=1 -> validate lang. Per-row errors + updated folder totals
+    (see ledger_import.py).
+    """
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return jsonify({"error": "File is required"}), 400
+
+    wallet_id = get_owned_wallet_id(folder_id)
+    if wallet_id is None:
+        return jsonify({"error": "Wallet folder not found"}), 404
+
+    dry_run = request.args.get("dry_run", "").lower() in ("1", "true", "yes")
+
+    try:
+        result = import_ledger(
+            supabase,
+            wallet_id,
+            folder_id,
+            upload.filename,
+            upload.stream,
+            dry_run=dry_run,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("Error importing transactions:", e)
+        return jsonify({"error": str(e)}), 500
+
+    try:
+        result["totals"] = page_totals(supabase, folder_id)
+    except Exception as e:
+        print("Error reading folder totals:", e)
+        result["totals"] = None
+
+    return jsonify(result)
+
+
+@pres.route("/api/wallets/<int:folder_id>/transactions:batch", methods=["POST"])
+@idempotent
+def batch_wallet_transactions(folder_id):
+    """
+    Mixed create / update / delete in one request: {"ops": [...]}.
+    All-or-nothing (isang DB transaction); returns the resulting rows +
+    folder totals (see ledger_batch.py).
+    """
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    wallet_id = get_owned_wallet_id(folder_id)
+    if wallet_id is None:
+        return jsonify({"error": "Wallet folder not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        ops = parse_ops(data.get("ops"))
+        result = apply_batch(supabase, wallet_id, folder_id, ops)
+    except BatchError as e:
+        body = {"error": str(e)}
+        if e.index is not None:
+            body["index"] = e.index
+        return jsonify(body), e.status
+    except Exception as e:
+        print("Error applying transaction batch:", e)
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(result)
+
+
 @pres.route("/api/wallets/<int:folder_id>/transactions/<int:tx_id>", methods=["POST"])
 def update_wallet_transaction(folder_id, tx_id):
     """Update existing transaction"""
@@ -1392,6 +1454,125 @@ def get_recent_transactions():
         return jsonify({"error": str(e)}), 500
 
 
+@pres.route("/api/transactions/history", methods=["GET"])
+def get_transaction_history():
+    """
+    Org-wide history para sa isang date range (History views).
+    Query: from=YYYY-MM-DD, to=YYYY-MM-DD (default: current month),
+           kind=income|expense, limit=N, after=<cursor>
+    Returns page (newest first) + period totals (rollups, see ledger_pages.py).
+    """
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    org_id = session.get("org_id")
+
+    try:
+        today = datetime.now().date()
+        month_start, month_end = month_range(today.year, today.month)
+        date_from = parse_date(request.args.get("from"), month_start)
+        date_to = parse_date(request.args.get("to"), month_end)
+        kind = request.args.get("kind") or None
+        if kind is not None and kind not in ("income", "expense"):
+            raise ValueError("kind must be income or expense")
+        limit = parse_limit(request.args.get("limit"))
+        after = request.args.get("after") or None
+        if after:
+            decode_cursor(after)
+        if date_from > date_to:
+            raise ValueError("from must be on or before to")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # resolved range sa ETag: ang default (current month) ay nagbabago sa
+    # month rollover kahit walang writes
+    etag = view_etag(
+        supabase,
+        "history",
+        org_id,
+        extra=(date_from.isoformat(), date_to.isoformat()),
+    )
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    try:
+        wallets_res = (
+            supabase.table("wallets")
+            .select("id")
+            .eq("organization_id", org_id)
+            .execute()
+        )
+        wallet_ids = [w["id"] for w in (wallets_res.data or [])]
+
+        rows, next_after = fetch_history_page(
+            supabase,
+            wallet_ids,
+            date_from,
+            date_to,
+            kind=kind,
+            limit=limit,
+            after=after,
+        )
+        # totals: unang page lang (pareho sa susunod na pages)
+        totals = None
+        if not after:
+            totals = period_totals(supabase, wallet_ids, date_from, date_to, kind=kind)
+            totals["net"] = totals["income"] - totals["expense"]
+
+        # folder names ng mga nasa page lang
+        budget_ids = sorted({r["budget_id"] for r in rows if r.get("budget_id")})
+        budget_name_by_id = {}
+        if budget_ids:
+            budgets_res = (
+                supabase.table("wallet_budgets")
+                .select("id, months(month_name)")
+                .in_("id", budget_ids)
+                .execute()
+            )
+            budget_name_by_id = {
+                b["id"]: b["months"]["month_name"]
+                for b in (budgets_res.data or [])
+                if b.get("months")
+            }
+
+        txs = []
+        for tx in rows:
+            qty = int(tx.get("quantity") or 0)
+            price = float(tx.get("price") or 0)
+            txs.append(
+                {
+                    "id": tx["id"],
+                    "type": "income" if tx.get("kind") == "income" else "expense",
+                    "date": tx.get("date_issued"),
+                    "description": tx.get("description") or "",
+                    "quantity": qty,
+                    "price": price,
+                    "total_amount": qty * price,
+                    "income_type": tx.get("income_type"),
+                    "particulars": tx.get("particulars"),
+                    "wallet_id": tx.get("wallet_id"),
+                    "folder_id": tx.get("budget_id"),
+                    "wallet_name": budget_name_by_id.get(tx.get("budget_id"), "Wallet"),
+                }
+            )
+
+        return with_etag(
+            jsonify(
+                {
+                    "from": date_from.isoformat(),
+                    "to": date_to.isoformat(),
+                    "transactions": txs,
+                    "next_cursor": next_after,
+                    "totals": totals,
+                }
+            ),
+            etag,
+        )
+    except Exception as e:
+        print("Error get_transaction_history:", e)
+        return jsonify({"error": str(e)}), 500
+
+
 @pres.route("/api/wallets/<int:folder_id>/receipts", methods=["POST"])
 def upload_wallet_receipt(folder_id):
     if not session.get("pres_user"):
@@ -1429,14 +1610,8 @@ def upload_wallet_receipt(folder_id):
     wallet_name = w_res.data["name"] if w_res.data else f"wallet-{wallet_id}"
 
     # month name
-    b_res = (
-        supabase.table("wallet_budgets")
-        .select("month_id, months (month_name)")
-        .eq("id", folder_id)
-        .single()
-        .execute()
-    )
-    month_name = b_res.data["months"]["month_name"] if b_res.data else "UNKNOWN"
+    folder = folders.get(supabase, folder_id)
+    month_name = (folder or {}).get("month_name") or "UNKNOWN"
 
     org_folder = slugify(org_name)
     wallet_folder = slugify(wallet_name)
@@ -1452,6 +1627,9 @@ def upload_wallet_receipt(folder_id):
 
         supabase.storage.from_(BUCKET_RECEIPTS).upload(path, file_bytes)
 
+        # thumbnail + print JPEG sa tabi ng original (see receipt_renditions.py)
+        renditions = upload_renditions(supabase, BUCKET_RECEIPTS, path, file_bytes)
+
         ins = (
             supabase.table("wallet_receipts")
             .insert(
@@ -1461,6 +1639,7 @@ def upload_wallet_receipt(folder_id):
                     "file_url": path,
                     "description": desc,
                     "receipt_date": date,
+                    **renditions,
                 }
             )
             .execute()
@@ -1468,12 +1647,27 @@ def upload_wallet_receipt(folder_id):
         row = ins.data[0]
 
         return jsonify(
-            {"id": row["id"], "name": row["description"], "date": row["receipt_date"]}
+            {
+                "id": row["id"],
+                "name": row["description"],
+                "date": row["receipt_date"],
+                "thumburl": receipt_public_url(renditions.get("thumb_url")),
+            }
         )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def receipt_public_url(path):
+    """Storage path -> public URL (walang network call), "" kung walang path."""
+    if not path:
+        return ""
+    public_url = supabase.storage.from_(BUCKET_RECEIPTS).get_public_url(path)
+    if isinstance(public_url, dict):
+        return public_url.get("publicUrl") or public_url.get("signedURL") or ""
+    return public_url
+
+
 @pres.route("/api/wallets/<int:folder_id>/receipts", methods=["GET"])
 def get_wallet_receipts(folder_id):
     if not session.get("pres_user"):
@@ -1487,7 +1681,7 @@ def get_wallet_receipts(folder_id):
     try:
         res = (
             supabase.table("wallet_receipts")
-            .select("id, description, receipt_date, file_url")
+            .select("id, description, receipt_date, file_url, thumb_url")
             .eq("wallet_id", wallet_id)
             .eq("budget_id", folder_id)
             .order("receipt_date")
@@ -1495,12 +1689,14 @@ def get_wallet_receipts(folder_id):
         )
         rows = res.data or []
         # field names tugma sa JS: id, description, receiptdate, fileurl
+        # thumburl: public URL ng thumbnail (para sa lists), "" kung wala
         out = [
             {
                 "id": r["id"],
                 "description": r.get("description") or "",
                 "receiptdate": r.get("receipt_date") or "",
                 "fileurl": r.get("file_url") or "",
+                "thumburl": receipt_public_url(r.get("thumb_url")),
             }
             for r in rows
         ]
@@ -1571,7 +1767,7 @@ def delete_receipt(receipt_id):
     try:
         res = (
             supabase.table("wallet_receipts")
-            .select("file_url")
+            .select("file_url, thumb_url, print_url")
             .eq("id", receipt_id)
             .single()
             .execute()
@@ -1579,8 +1775,12 @@ def delete_receipt(receipt_id):
         if not res.data:
             return jsonify({"error": "Not found"}), 404
 
-        file_path = res.data["file_url"]
-        supabase.storage.from_(BUCKET_RECEIPTS).remove([file_path])
+        paths = [
+            res.data[k]
+            for k in ("file_url", "thumb_url", "print_url")
+            if res.data.get(k)
+        ]
+        supabase.storage.from_(BUCKET_RECEIPTS).remove(paths)
         supabase.table("wallet_receipts").delete().eq("id", receipt_id).execute()
 
         return jsonify({"success": True})
@@ -1621,16 +1821,10 @@ def generate_report():
         )
 
         # NEW: compute report_month galing sa wallet_budgets + months
-        wb_res = (
-            supabase.table("wallet_budgets")
-            .select("year, month_id, months (month_name)")
-            .eq("id", budget_id)
-            .single()
-            .execute()
-        )
+        folder = folders.get(supabase, budget_id)
         report_month_value = None
-        if wb_res.data:
-            report_month_value = (wb_res.data["months"]["month_name"] or "").lower()
+        if folder:
+            report_month_value = (folder["month_name"] or "").lower()
 
         # Fields dapat tugma sa JS payload at sa DOCX placeholders
         payload = {
@@ -1776,13 +1970,18 @@ def get_latest_report_for_budget(wallet_id, budget_id):
 # -----------------------
 
 
-@pres.route("/reports/<int:wallet_id>/budgets/<int:budget_id>/preview", methods=["GET"])
-def preview_report_for_budget(wallet_id, budget_id):
-    if not session.get("pres_user"):
-        return "Unauthorized", 401
+DOCX_MIMETYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+# i-bump kapag binago ang render_*_docx (invalidates cached artifacts)
+REPORT_RENDER_VERSION = "1"
 
-    org_id = session.get("org_id")
 
+def gather_budget_report(org_id, wallet_id, budget_id):
+    """
+    Lahat ng data na kailangan ng DOCX preview (Supabase reads lang).
+    Returns None kung walang report para sa folder.
+    """
     rep_res = (
         supabase.table("financial_reports")
         .select("*")
@@ -1794,7 +1993,7 @@ def preview_report_for_budget(wallet_id, budget_id):
         .execute()
     )
     if not rep_res.data:
-        return "No report", 404
+        return None
 
     rep = rep_res.data[0]
 
@@ -1823,66 +2022,10 @@ def preview_report_for_budget(wallet_id, budget_id):
             college_name = dept_res.data["dept_name"].upper()
 
     # month text
-    wb_res = (
-        supabase.table("wallet_budgets")
-        .select("year, month_id, months (month_name)")
-        .eq("id", budget_id)
-        .single()
-        .execute()
-    )
+    folder = folders.get(supabase, budget_id)
     report_month_text = ""
-    if wb_res.data:
-        y = wb_res.data["year"]
-        mname = wb_res.data["months"]["month_name"]
-        report_month_text = f"{mname} {y}".upper()
-
-    # load template
-    template_path = os.path.join(
-        os.path.dirname(__file__),
-        "templates",
-        "pres",
-        "finance_report_template.docx",
-    )
-    doc = Document(template_path)
-
-    def replace_all(old: str, new: str):
-        if new is None:
-            new = ""
-        for p in doc.paragraphs:
-            if old in p.text:
-                for run in p.runs:
-                    run.text = run.text.replace(old, new)
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if old in cell.text:
-                        for p in cell.paragraphs:
-                            for run in p.runs:
-                                run.text = run.text.replace(old, new)
-
-    # numeric fields
-    budget_val = float(rep.get("budget") or 0)
-    total_expense = float(rep.get("total_expense") or 0)
-    reimb = float(rep.get("reimbursement") or 0)
-    prev_fund = float(rep.get("previous_fund") or 0)
-    remaining = budget_val - total_expense - reimb + prev_fund
-    total_income = float(rep.get("total_income") or 0)
-    budget_in_the_bank = float(rep.get("budget_in_the_bank") or 0)
-
-    # header placeholders
-    replace_all("{{TOTAL_INCOME}}", f"PHP {total_income:,.2f}")
-    replace_all("{{BUDGET_IN_THE_BANK}}", f"PHP {budget_in_the_bank:,.2f}")
-    replace_all("{{COLLEGE_NAME}}", college_name)
-    replace_all("{{ORG_NAME}}", org_name)
-    replace_all("{{EVENT_NAME}}", rep.get("event_name") or "")
-    replace_all("{{REPORT_MONTH}}", report_month_text)
-    replace_all("{{DATE_PREPARED}}", str(rep.get("date_prepared") or ""))
-    replace_all("{{REPORT_NO}}", rep.get("report_no") or "")
-    replace_all("{{BUDGET}}", f"PHP {budget_val:,.2f}")
-    replace_all("{{TOTAL_EXPENSE}}", f"PHP {total_expense:,.2f}")
-    replace_all("{{REIMBURSEMENT}}", f"PHP {reimb:,.2f}")
-    replace_all("{{PREVIOUS_FUND}}", f"PHP {prev_fund:,.2f}")
-    replace_all("{{TOTAL_REMAINING}}", f"PHP {remaining:,.2f}")
+    if folder:
+        report_month_text = f"{folder['month_name']} {folder['year']}".upper()
 
     # INCOME rows
     income_res = (
@@ -1894,16 +2037,6 @@ def preview_report_for_budget(wallet_id, budget_id):
         .order("date_issued")
         .execute()
     )
-    incomes = income_res.data or []
-
-    income_table = None
-    for table in doc.tables:
-        if len(table.rows) < 2:
-            continue
-        header_text = " ".join(c.text for c in table.rows[1].cells).upper()
-        if "TYPE OF INCOME" in header_text and "DATE ISSUED" in header_text:
-            income_table = table
-            break
 
     # EXPENSE rows
     tx_res = (
@@ -1915,17 +2048,65 @@ def preview_report_for_budget(wallet_id, budget_id):
         .order("date_issued")
         .execute()
     )
-    txs = tx_res.data or []
 
-    expenses_table = None
-    for table in doc.tables:
-        if len(table.rows) < 2:
-            continue
-        header_row = table.rows[1]
-        first_row_text = " ".join(cell.text for cell in header_row.cells).upper()
-        if "DATE ISSUED" in first_row_text and "PARTICULARS" in first_row_text:
-            expenses_table = table
-            break
+    # receipts -> pictures
+    rc_res = (
+        supabase.table("wallet_receipts")
+        .select("description, file_url, print_url, receipt_date")
+        .eq("wallet_id", wallet_id)
+        .eq("budget_id", budget_id)
+        .order("receipt_date")
+        .execute()
+    )
+
+    return {
+        "rep": rep,
+        "org_name": org_name,
+        "college_name": college_name,
+        "report_month_text": report_month_text,
+        "incomes": income_res.data or [],
+        "txs": tx_res.data or [],
+        "receipts": rc_res.data or [],
+    }
+
+
+def render_budget_report_docx(data):
+    """DOCX bytes from gather_budget_report() data (walang request context)."""
+    rep = data["rep"]
+    incomes = data["incomes"]
+    txs = data["txs"]
+    receipts = data["receipts"]
+
+    # numeric fields
+    budget_val = float(rep.get("budget") or 0)
+    total_expense = float(rep.get("total_expense") or 0)
+    reimb = float(rep.get("reimbursement") or 0)
+    prev_fund = float(rep.get("previous_fund") or 0)
+    remaining = budget_val - total_expense - reimb + prev_fund
+    total_income = float(rep.get("total_income") or 0)
+    budget_in_the_bank = float(rep.get("budget_in_the_bank") or 0)
+
+    # header placeholders (cached template, single pass)
+    doc = REPORT_TEMPLATE.render(
+        {
+            "TOTAL_INCOME": f"PHP {total_income:,.2f}",
+            "BUDGET_IN_THE_BANK": f"PHP {budget_in_the_bank:,.2f}",
+            "COLLEGE_NAME": data["college_name"],
+            "ORG_NAME": data["org_name"],
+            "EVENT_NAME": rep.get("event_name") or "",
+            "REPORT_MONTH": data["report_month_text"],
+            "DATE_PREPARED": str(rep.get("date_prepared") or ""),
+            "REPORT_NO": rep.get("report_no") or "",
+            "BUDGET": f"PHP {budget_val:,.2f}",
+            "TOTAL_EXPENSE": f"PHP {total_expense:,.2f}",
+            "REIMBURSEMENT": f"PHP {reimb:,.2f}",
+            "PREVIOUS_FUND": f"PHP {prev_fund:,.2f}",
+            "TOTAL_REMAINING": f"PHP {remaining:,.2f}",
+        }
+    )
+
+    income_table = REPORT_TEMPLATE.table(doc, "income")
+    expenses_table = REPORT_TEMPLATE.table(doc, "expenses")
 
     # fill EXPENSES table
     if expenses_table:
@@ -2007,24 +2188,16 @@ def preview_report_for_budget(wallet_id, budget_id):
             price = float(tx.get("price") or 0)
             price_cell.text = f"PHP {price:,.2f}"
 
-    # receipts -> pictures
-    rc_res = (
-        supabase.table("wallet_receipts")
-        .select("description, file_url, receipt_date")
-        .eq("wallet_id", wallet_id)
-        .eq("budget_id", budget_id)
-        .order("receipt_date")
-        .execute()
-    )
-    receipts = rc_res.data or []
-
     if receipts:
+        # sabay-sabay (bounded) + disk cache, see receipt_fetcher.py
+        images = fetch_receipts(
+            supabase, BUCKET_RECEIPTS, [print_path_of(r) for r in receipts]
+        )
+
         # walang page break, diretso lang sa current page
         for r in receipts:
-            file_path = r["file_url"]
-            try:
-                file_bytes = supabase.storage.from_(BUCKET_RECEIPTS).download(file_path)
-            except Exception:
+            file_bytes = images.get(print_path_of(r))
+            if not file_bytes:
                 continue
 
             # caption paragraph (center)
@@ -2042,16 +2215,66 @@ def preview_report_for_budget(wallet_id, budget_id):
             spacer = doc.add_paragraph()
             spacer.alignment = 1
 
+
     buf = BytesIO()
     doc.save(buf)
-    buf.seek(0)
+    return buf.getvalue()
 
-    return send_file(
-        buf,
-        as_attachment=False,
-        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+
+def report_job_id(kind, data):
+    # content hash + template version: same data -> same artifact
+    return content_hash(
+        kind, data, salt=f"{REPORT_TEMPLATE.version}:{REPORT_RENDER_VERSION}"
+    )
+
+
+report_jobs.register("budget_report", render_budget_report_docx)
+
+
+@pres.route("/reports/<int:wallet_id>/budgets/<int:budget_id>/preview", methods=["GET"])
+def preview_report_for_budget(wallet_id, budget_id):
+    if not session.get("pres_user"):
+        return "Unauthorized", 401
+
+    org_id = session.get("org_id")
+
+    etag = view_etag(
+        supabase,
+        "report_preview",
+        org_id,
+        budget_id=budget_id,
+        extra=(wallet_id, REPORT_TEMPLATE.version, REPORT_RENDER_VERSION),
+    )
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    data = gather_budget_report(org_id, wallet_id, budget_id)
+    if data is None:
+        return "No report", 404
+
+    # render sa background job; reuse ang artifact kung hindi nagbago ang
+    # data (see report_jobs.py). Hindi pa tapos -> 202, i-poll ng client.
+    job = report_jobs.enqueue(
+        "budget_report",
+        data,
+        report_job_id("budget_report", data),
+        owner=org_id,
         download_name="financial_report_preview.docx",
     )
+    path = report_jobs.artifact_path(job["id"]) if job["status"] == "done" else None
+    if path is None:
+        return report_job_response(job)
+
+    return with_etag(
+        send_file(
+            path,
+            as_attachment=False,
+            mimetype=DOCX_MIMETYPE,
+            download_name="financial_report_preview.docx",
+            etag=False,
+        ),
+        etag,
+    )
 
 
 @pres.route("/reports/<int:wallet_id>/budgets/<int:budget_id>/print", methods=["GET"])
@@ -2101,18 +2324,10 @@ def print_report_for_budget(wallet_id, budget_id):
             college_name = dept_res.data["dept_name"].upper()
 
     # month text
-    wb_res = (
-        supabase.table("wallet_budgets")
-        .select("year, month_id, months (month_name)")
-        .eq("id", budget_id)
-        .single()
-        .execute()
-    )
+    folder = folders.get(supabase, budget_id)
     report_month_text = ""
-    if wb_res.data:
-        y = wb_res.data["year"]
-        mname = wb_res.data["months"]["month_name"]
-        report_month_text = f"{mname} {y}".upper()
+    if folder:
+        report_month_text = f"{folder['month_name']} {folder['year']}".upper()
 
     # numeric fields
     budget_val = float(rep.get("budget") or 0)
@@ -2146,10 +2361,10 @@ def print_report_for_budget(wallet_id, budget_id):
         .execute()
     )
     incomes = inc_res.data or []
-    # receipts with public URL
+    # receipts with public URL (print rendition kung meron)
     rc_res = (
         supabase.table("wallet_receipts")
-        .select("description, file_url, receipt_date")
+        .select("description, file_url, print_url, receipt_date")
         .eq("wallet_id", wallet_id)
         .eq("budget_id", budget_id)
         .order("receipt_date")
@@ -2159,7 +2374,7 @@ def print_report_for_budget(wallet_id, budget_id):
     for r in receipts:
         try:
             public_url = supabase.storage.from_(BUCKET_RECEIPTS).get_public_url(
-                r["file_url"]
+                print_path_of(r)
             )
             if isinstance(public_url, dict):
                 r["file_url"] = public_url.get("publicUrl") or public_url.get(
@@ -2195,74 +2410,6 @@ def print_report_for_budget(wallet_id, budget_id):
 from datetime import datetime as dt  # siguraduhin na nasa taas na ito
 
 
-def update_osas_financial_report(org_id, budget_id):
-    """
-    Update OSAS financial_reports row for this org based on submitted month.
-    Marks the month as received in checklist and recomputes status.
-    """
-    # Kunin month name mula sa wallet_budgets + months table
-    wb_res = (
-        supabase.table("wallet_budgets")
-        .select("months (month_name)")
-        .eq("id", budget_id)
-        .single()
-        .execute()
-    )
-    if not wb_res.data:
-        return
-
-    month_name = (wb_res.data["months"]["month_name"] or "").lower()
-    month_key = month_name  # e.g. "january", "february", ...
-
-    # Hanapin OSAS financial_reports row ng org
-    fr_res = (
-        supabase.table("financial_reports")
-        .select("*")
-        .eq("organization_id", org_id)
-        .is_("wallet_id", None)  # master row lang
-        .is_("budget_id", None)
-        .limit(1)
-        .execute()
-    )
-
-    report = fr_res.data[0]
-    checklist = report.get("checklist") or {}
-
-    month_keys = [
-        "august",
-        "september",
-        "october",
-        "november",
-        "december",
-        "january",
-        "february",
-        "march",
-        "april",
-        "may",
-    ]
-
-    if month_key in month_keys:
-        checklist[month_key] = True
-
-    received_count = sum(1 for k in month_keys if checklist.get(k))
-    total_count = len(month_keys)
-
-    if received_count == 0:
-        status = "Pending Review"
-    elif received_count < total_count:
-        status = "In Review"
-    else:
-        status = "Completed"
-
-    supabase.table("financial_reports").update(
-        {
-            "checklist": checklist,
-            "status": status,
-            "updated_at": dt.utcnow().isoformat(),
-        }
-    ).eq("id", report["id"]).execute()
-
-
 @pres.route(
     "/api/wallets/<int:wallet_id>/budgets/<int:budget_id>/submit",
     methods=["GET"],
@@ -2292,10 +2439,12 @@ def check_report_submitted(wallet_id, budget_id):
 
 
 @pres.route("/reports/<int:wallet_id>/submit", methods=["POST"])
+@idempotent
 def submitreportwalletid(wallet_id):
     """
     Mark latest Pending report as Submitted, create archive snapshot
-    (summary + transactions + receipts), then clear month data and reset budget.
+    (summary + transactions + receipts) and update the OSAS checklist,
+    all in one DB transaction (public.submit_financial_report).
     JS calls: POST /pres/reports/<walletId>/submit
     """
     if not session.get("pres_user"):
@@ -2303,126 +2452,34 @@ def submitreportwalletid(wallet_id):
 
     org_id = session.get("org_id")
 
+    # isang RPC: status, notif, archive snapshot, OSAS checklist (see report_submit.py)
     try:
-        repres = (
-            supabase.table("financial_reports")
-            .select("*")
-            .eq("organization_id", org_id)
-            .eq("wallet_id", wallet_id)
-            .eq("status", "Pending Review")
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute()
+        result = submit_report(
+            supabase, org_id, wallet_id, org_name=session.get("org_name")
         )
-        if not repres.data:
-            return jsonify({"error": "No pending report"}), 404
+    except NoPendingReport as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        print("Error submitting report:", e)
+        return jsonify({"error": str(e)}), 500
 
-        rep = repres.data[0]
-        rep_id = rep["id"]
-        budget_id = rep["budget_id"]
+    archive_id = result["archive_id"]
 
-        # Mark report as submitted
-        supabase.table("financial_reports").update(
-            {
-                "status": "Submitted",
-                "submission_date": dt.utcnow().date().isoformat(),
-                "updated_at": dt.utcnow().isoformat(),
-            }
-        ).eq("id", rep_id).execute()
-        report_month = rep.get("report_month")  # e.g. "november"
-        create_osas_notification(
-            org_id=org_id,
-            report_id=rep_id,
-            status="Pending Review",
-            month_key=report_month,
-        )
-
-        # Compute remaining balance
-        budget_val = float(rep.get("budget") or 0)
-        total_expense = float(rep.get("total_expense") or 0)
-        reimb = float(rep.get("reimbursement") or 0)
-        prev_fund = float(rep.get("previous_fund") or 0)
-        remaining = budget_val - total_expense - reimb + prev_fund
-
-        # Insert archive summary
-        arch_ins = (
-            supabase.table("financial_report_archives")
-            .insert(
-                {
-                    "organization_id": org_id,
-                    "wallet_id": wallet_id,
-                    "budget_id": budget_id,
-                    "report_id": rep_id,
-                    "report_no": rep.get("report_no"),
-                    "event_name": rep.get("event_name"),
-                    "date_prepared": rep.get("date_prepared"),
-                    "budget": budget_val,
-                    "total_expense": total_expense,
-                    "reimbursement": reimb,
-                    "previous_fund": prev_fund,
-                    "remaining": remaining,
-                    "file_url": None,
-                }
-            )
-            .execute()
-        )
-        archive_id = arch_ins.data[0]["id"]
+    # checklist ng OSAS master row ay nagbago (matrix: DB trigger na ang bahala)
+    compliance.invalidate()
 
-        # Archive transactions
-        txres = (
-            supabase.table("wallet_transactions")
-            .select("date_issued, quantity, particulars, description, price, kind")
-            .eq("wallet_id", wallet_id)
-            .eq("budget_id", budget_id)
-            .execute()
-        )
-        txs = txres.data or []
-        if txs:
-            tx_rows = [
-                {
-                    "archive_id": archive_id,
-                    "date_issued": tx["date_issued"],
-                    "quantity": tx["quantity"],
-                    "particulars": tx.get("particulars"),
-                    "description": tx["description"],
-                    "price": float(tx["price"]),
-                    "kind": tx["kind"],
-                }
-                for tx in txs
-            ]
-            supabase.table("financial_report_archive_transactions").insert(
-                tx_rows
-            ).execute()
-
-        # Archive receipts
-        rcres = (
-            supabase.table("wallet_receipts")
-            .select("description, receipt_date, file_url")
-            .eq("wallet_id", wallet_id)
-            .eq("budget_id", budget_id)
-            .execute()
+    # Render the archive DOCX once and store it (background job);
+    # download_archive streams the stored file from then on
+    try:
+        enqueue_archive_persist(
+            org_id,
+            archive_id,
+            result.get("report_no") or "financial_report_template.docx",
         )
-        receipts = rcres.data or []
-        if receipts:
-            rc_rows = [
-                {
-                    "archive_id": archive_id,
-                    "description": r["description"],
-                    "receipt_date": r["receipt_date"],
-                    "file_url": r["file_url"],
-                }
-                for r in receipts
-            ]
-            supabase.table("financial_report_archive_receipts").insert(
-                rc_rows
-            ).execute()
-
-        # Update OSAS-side financial_reports checklist/status
-        update_osas_financial_report(org_id, budget_id)
-
-        return jsonify({"success": True, "archive_id": archive_id}), 200
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        print("Error queueing archive render:", e)
+
+    return jsonify({"success": True, "archive_id": archive_id}), 200
 
 
 # -----------------------
@@ -2486,310 +2543,492 @@ from docx.shared import Inches
 from datetime import datetime as _dt
 
 
-@pres.route("/api/archives/<int:archive_id>/download", methods=["GET"])
-def download_archive(archive_id):
+def gather_archive_report(archive_id):
     """
-    Generate a DOCX file for a submitted (archived) report on the fly and return it.
-    Ginagamit ang financial_report_archives + archive_transactions + archive_receipts.
-    Final URL: /pres/api/archives/<archive_id>/download
+    Data ng archived report (financial_report_archives + archive_transactions
+    + archive_receipts). Returns None kung walang archive.
+    Ang org header ay mula sa archive mismo (organization_id), hindi sa caller.
     """
-    if not session.get("pres_user"):
-        return jsonify({"error": "Unauthorized"}), 401
+    # 1) Kunin archive summary row
+    arch_res = (
+        supabase.table("financial_report_archives")
+        .select("*")
+        .eq("id", archive_id)
+        .single()
+        .execute()
+    )
+    if not arch_res.data:
+        return None
 
-    org_id = session.get("org_id")
+    arch = arch_res.data
+    budget_id = arch["budget_id"]
 
-    try:
-        # 1) Kunin archive summary row
-        arch_res = (
-            supabase.table("financial_report_archives")
-            .select("*")
-            .eq("id", archive_id)
+    # 2) org + college name
+    org_res = (
+        supabase.table("organizations")
+        .select("org_name, department_id")
+        .eq("id", arch["organization_id"])
+        .single()
+        .execute()
+    )
+    org_data = org_res.data or {}
+    org_name = org_data.get("org_name") or ""
+
+    college_name = "COLLEGE"
+    dept_id = org_data.get("department_id")
+    if dept_id is not None:
+        dept_res = (
+            supabase.table("departments")
+            .select("dept_name")
+            .eq("id", dept_id)
             .single()
             .execute()
         )
-        if not arch_res.data:
-            return jsonify({"error": "Archive not found"}), 404
+        if dept_res.data:
+            college_name = dept_res.data["dept_name"].upper()
 
-        arch = arch_res.data
-        wallet_id = arch["wallet_id"]
-        budget_id = arch["budget_id"]
+    # 3) month info ng wallet/budget (REPORT_MONTH)
+    folder = folders.get(supabase, budget_id)
+    report_month_text = ""
+    if folder:
+        report_month_text = f"{folder['month_name']} {folder['year']}".upper()
 
-        # 2) org + college name
-        org_res = (
-            supabase.table("organizations")
-            .select("org_name, department_id")
-            .eq("id", org_id)
-            .single()
-            .execute()
-        )
-        org_data = org_res.data or {}
-        org_name = org_data.get("org_name") or ""
+    # 4) incomes
+    inc_res = (
+        supabase.table("financial_report_archive_transactions")
+        .select("date_issued, quantity, description, price, kind")
+        .eq("archive_id", archive_id)
+        .eq("kind", "income")
+        .order("date_issued")
+        .execute()
+    )
 
-        college_name = "COLLEGE"
-        dept_id = org_data.get("department_id")
-        if dept_id is not None:
-            dept_res = (
-                supabase.table("departments")
-                .select("dept_name")
-                .eq("id", dept_id)
-                .single()
-                .execute()
-            )
-            if dept_res.data:
-                college_name = dept_res.data["dept_name"].upper()
+    # 5) expenses
+    tx_res = (
+        supabase.table("financial_report_archive_transactions")
+        .select("date_issued, quantity, particulars, description, price, kind")
+        .eq("archive_id", archive_id)
+        .eq("kind", "expense")
+        .order("date_issued")
+        .execute()
+    )
 
-        # 3) month info ng wallet/budget (REPORT_MONTH)
-        wb_res = (
-            supabase.table("wallet_budgets")
-            .select("year, month_id, months (month_name)")
-            .eq("id", budget_id)
-            .single()
-            .execute()
-        )
-        report_month_text = ""
-        if wb_res.data:
-            y = wb_res.data["year"]
-            mname = wb_res.data["months"]["month_name"]
-            report_month_text = f"{mname} {y}".upper()
-
-        # 4) load template
-        template_path = os.path.join(
-            os.path.dirname(__file__),
-            "templates",
-            "pres",
-            "finance_report_template.docx",
-        )
-        doc = Document(template_path)
-
-        def replace_all(old: str, new: str):
-            if new is None:
-                new = ""
-            for p in doc.paragraphs:
-                if old in p.text:
-                    for run in p.runs:
-                        run.text = run.text.replace(old, new)
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if old in cell.text:
-                            for p in cell.paragraphs:
-                                for run in p.runs:
-                                    run.text = run.text.replace(old, new)
-
-        # 5) numeric values from archive row
-        budget_val = float(arch.get("budget") or 0)
-        total_expense = float(arch.get("total_expense") or 0)
-        reimb = float(arch.get("reimbursement") or 0)
-        prev_fund = float(arch.get("previous_fund") or 0)
-        remaining = float(arch.get("remaining") or 0)
-
-        # 6) header / summary placeholders
-        replace_all("{{COLLEGE_NAME}}", college_name)
-        replace_all("{{ORG_NAME}}", org_name)
-        replace_all("{{EVENT_NAME}}", arch.get("event_name") or "")
-        replace_all("{{REPORT_MONTH}}", report_month_text)
-        replace_all("{{DATE_PREPARED}}", str(arch.get("date_prepared") or ""))
-        replace_all("{{REPORT_NO}}", arch.get("report_no") or "")
-        replace_all("{{BUDGET}}", f"PHP {budget_val:,.2f}")
-        replace_all("{{TOTAL_EXPENSE}}", f"PHP {total_expense:,.2f}")
-        replace_all("{{REIMBURSEMENT}}", f"PHP {reimb:,.2f}")
-        replace_all("{{PREVIOUS_FUND}}", f"PHP {prev_fund:,.2f}")
-        replace_all("{{TOTAL_REMAINING}}", f"PHP {remaining:,.2f}")
-
-        # 7) expenses table rows
-        tx_res = (
-            supabase.table("financial_report_archive_transactions")
-            .select("date_issued, quantity, particulars, description, price, kind")
-            .eq("archive_id", archive_id)
-            .eq("kind", "expense")
-            .order("date_issued")
-            .execute()
-        )
-        txs = tx_res.data or []
+    # 6) receipts (appendix)
+    rc_res = (
+        supabase.table("financial_report_archive_receipts")
+        .select("description, receipt_date, file_url, print_url")
+        .eq("archive_id", archive_id)
+        .order("receipt_date")
+        .execute()
+    )
 
-        expenses_table = None
-        for table in doc.tables:
-            if len(table.rows) < 2:
-                continue
-            header_row = table.rows[1]
-            first_row_text = " ".join(cell.text for cell in header_row.cells).upper()
-            if "DATE ISSUED" in first_row_text and "PARTICULARS" in first_row_text:
-                expenses_table = table
-                break
+    return {
+        "arch": arch,
+        "org_name": org_name,
+        "college_name": college_name,
+        "report_month_text": report_month_text,
+        "incomes": inc_res.data or [],
+        "txs": tx_res.data or [],
+        "receipts": rc_res.data or [],
+    }
 
-        if expenses_table:
-            # clear detail rows (keep header + total row)
-            while len(expenses_table.rows) > 3:
-                expenses_table._tbl.remove(expenses_table.rows[2]._tr)
 
-            from datetime import datetime as _dt
+def render_archive_report_docx(data):
+    """DOCX bytes from gather_archive_report() data (walang request context)."""
+    arch = data["arch"]
+    incomes = data["incomes"]
+    txs = data["txs"]
+    receipts = data["receipts"]
 
-            def fmt_date(d):
-                try:
-                    return _dt.fromisoformat(d).strftime("%Y-%m-%d")
-                except Exception:
-                    return d or ""
+    # numeric values from archive row
+    budget_val = float(arch.get("budget") or 0)
+    total_expense = float(arch.get("total_expense") or 0)
+    reimb = float(arch.get("reimbursement") or 0)
+    prev_fund = float(arch.get("previous_fund") or 0)
+    remaining = float(arch.get("remaining") or 0)
 
-            last_date = None
-            summary_row = expenses_table.rows[-1]
+    total_income = 0.0
+    for inc in incomes:
+        qty = int(inc.get("quantity") or 0)
+        price = float(inc.get("price") or 0)
+        total_income += qty * price
 
-            for tx in txs:
-                new_row = expenses_table.add_row()
-                expenses_table._tbl.remove(new_row._tr)
-                summary_row._tr.addprevious(new_row._tr)
+    budget_in_the_bank = prev_fund + budget_val + total_income - total_expense - reimb
 
-                date_cell, qty_cell, part_cell, desc_cell, total_cell = new_row.cells
+    # header / summary placeholders (cached template, single pass)
+    doc = REPORT_TEMPLATE.render(
+        {
+            "COLLEGE_NAME": data["college_name"],
+            "ORG_NAME": data["org_name"],
+            "EVENT_NAME": arch.get("event_name") or "",
+            "REPORT_MONTH": data["report_month_text"],
+            "DATE_PREPARED": str(arch.get("date_prepared") or ""),
+            "REPORT_NO": arch.get("report_no") or "",
+            "BUDGET": f"PHP {budget_val:,.2f}",
+            "TOTAL_EXPENSE": f"PHP {total_expense:,.2f}",
+            "REIMBURSEMENT": f"PHP {reimb:,.2f}",
+            "PREVIOUS_FUND": f"PHP {prev_fund:,.2f}",
+            "TOTAL_REMAINING": f"PHP {remaining:,.2f}",
+            "TOTAL_INCOME": f"PHP {total_income:,.2f}",
+            "BUDGET_IN_THE_BANK": f"PHP {budget_in_the_bank:,.2f}",
+        }
+    )
 
-                date_str = tx.get("date_issued")
-                show_date = fmt_date(date_str)
-                if date_str == last_date:
-                    date_cell.text = ""
-                else:
-                    date_cell.text = show_date
-                    last_date = date_str
-
-                qty_cell.text = str(tx.get("quantity") or "")
-                part_cell.text = tx.get("particulars") or ""
-                desc_cell.text = tx.get("description") or ""
-
-                qty = float(tx.get("quantity") or 0)
-                price = float(tx.get("price") or 0)
-                line_total = qty * price
-                total_cell.text = f"PHP {line_total:,.2f}"
-
-            summary_row.cells[-1].text = f"PHP {total_expense:,.2f}"
-
-            # 8) incomes table rows + total income
-        inc_res = (
-            supabase.table("financial_report_archive_transactions")
-            .select("date_issued, quantity, description, price, kind")
-            .eq("archive_id", archive_id)
-            .eq("kind", "income")
-            .order("date_issued")
-            .execute()
-        )
-        incomes = inc_res.data or []
+    # expenses table rows
+    expenses_table = REPORT_TEMPLATE.table(doc, "expenses")
+
+    if expenses_table:
+        # clear detail rows (keep header + total row)
+        while len(expenses_table.rows) > 3:
+            expenses_table._tbl.remove(expenses_table.rows[2]._tr)
+
+        from datetime import datetime as _dt
+
+        def fmt_date(d):
+            try:
+                return _dt.fromisoformat(d).strftime("%Y-%m-%d")
+            except Exception:
+                return d or ""
+
+        last_date = None
+        summary_row = expenses_table.rows[-1]
+
+        for tx in txs:
+            new_row = expenses_table.add_row()
+            expenses_table._tbl.remove(new_row._tr)
+            summary_row._tr.addprevious(new_row._tr)
+
+            date_cell, qty_cell, part_cell, desc_cell, total_cell = new_row.cells
+
+            date_str = tx.get("date_issued")
+            show_date = fmt_date(date_str)
+            if date_str == last_date:
+                date_cell.text = ""
+            else:
+                date_cell.text = show_date
+                last_date = date_str
+
+            qty_cell.text = str(tx.get("quantity") or "")
+            part_cell.text = tx.get("particulars") or ""
+            desc_cell.text = tx.get("description") or ""
+
+            qty = float(tx.get("quantity") or 0)
+            price = float(tx.get("price") or 0)
+            line_total = qty * price
+            total_cell.text = f"PHP {line_total:,.2f}"
+
+        summary_row.cells[-1].text = f"PHP {total_expense:,.2f}"
+
+    # incomes table rows
+    income_table = REPORT_TEMPLATE.table(doc, "income")
+
+    if income_table and len(income_table.rows) >= 3 and incomes:
+        # last row is total row
+        sum_row = income_table.rows[-1]
+
+        # clear detail rows (keep header + total row)
+        while len(income_table.rows) > 3:
+            income_table._tbl.remove(income_table.rows[2]._tr)
+
+        from datetime import datetime as _dt
+
+        def fmt_date2(d):
+            try:
+                return _dt.fromisoformat(d).strftime("%Y-%m-%d")
+            except Exception:
+                return d or ""
 
-        total_income = 0.0
         for inc in incomes:
-            qty = int(inc.get("quantity") or 0)
-            price = float(inc.get("price") or 0)
-            total_income += qty * price
-
-        # Optional: fill income detail table if may template ka
-        income_table = None
-        for table in doc.tables:
-            if len(table.rows) < 2:
+            row = income_table.add_row()
+            income_table._tbl.remove(row._tr)
+            sum_row._tr.addprevious(row._tr)
+
+            dcell, qtycell, typecell, desccell, pricecell = row.cells
+            dcell.text = fmt_date2(inc.get("date_issued") or "")
+            qtycell.text = str(inc.get("quantity") or "")
+            # walang income_type column sa archive table, so blank or reuse description
+            typecell.text = ""  # or inc.get("description") or ""
+            desccell.text = inc.get("description") or ""
+            amt = (inc.get("quantity") or 0) * (inc.get("price") or 0)
+            pricecell.text = f"PHP {amt:,.2f}"
+
+        sum_row.cells[-1].text = f"PHP {total_income:,.2f}"
+
+    # receipts appendix table (no raw URL)
+    appendix_table = REPORT_TEMPLATE.table(doc, "appendix")
+
+    if appendix_table and receipts:
+        for rc in receipts:
+            row = appendix_table.add_row()
+            row.cells[0].text = str(rc.get("receipt_date") or "")
+            row.cells[1].text = rc.get("description") or ""
+            # URL intentionally not printed
+
+    # image appendix: wala nang extra page break
+    if receipts:
+        title_p = doc.add_paragraph()
+        title_run = title_p.add_run("APPENDIX: RECEIPTS")
+        title_run.bold = True
+
+        # pre-fetched (bulk export, render sa ibang process) o fetch dito
+        images = data.get("images")
+        if images is None:
+            images = fetch_receipts(
+                supabase, BUCKET_RECEIPTS, [print_path_of(r) for r in receipts]
+            )
+
+        for r in receipts:
+            file_bytes = images.get(print_path_of(r))
+            if not file_bytes:
                 continue
-            header_text = " ".join(c.text for c in table.rows[1].cells).upper()
-            if "TYPE OF INCOME" in header_text or "INCOME" in header_text:
-                income_table = table
-                break
 
-        if income_table and len(income_table.rows) >= 3 and incomes:
-            # last row is total row
-            sum_row = income_table.rows[-1]
+            cap_p = doc.add_paragraph()
+            cap_p.add_run(f"{r['receipt_date']} - {r['description']}")
 
-            # clear detail rows (keep header + total row)
-            while len(income_table.rows) > 3:
-                income_table._tbl.remove(income_table.rows[2]._tr)
+            img_stream = BytesIO(file_bytes)
+            doc.add_picture(img_stream, width=Inches(4))
+            doc.add_paragraph()
 
-            from datetime import datetime as _dt
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
 
-            def fmt_date2(d):
-                try:
-                    return _dt.fromisoformat(d).strftime("%Y-%m-%d")
-                except Exception:
-                    return d or ""
 
-            for inc in incomes:
-                row = income_table.add_row()
-                income_table._tbl.remove(row._tr)
-                sum_row._tr.addprevious(row._tr)
 
-                dcell, qtycell, typecell, desccell, pricecell = row.cells
-                dcell.text = fmt_date2(inc.get("date_issued") or "")
-                qtycell.text = str(inc.get("quantity") or "")
-                # walang income_type column sa archive table, so blank or reuse description
-                typecell.text = ""  # or inc.get("description") or ""
-                desccell.text = inc.get("description") or ""
-                amt = (inc.get("quantity") or 0) * (inc.get("price") or 0)
-                pricecell.text = f"PHP {amt:,.2f}"
+def persist_archive_artifact(archive_id, org_id, docx_bytes, replace=False):
+    """
+    Upload a rendered archive DOCX and set financial_report_archives.file_url.
+    Skips kung may naka-store na (unless replace=True). Returns the path.
+    """
+    if not replace:
+        cur = (
+            supabase.table("financial_report_archives")
+            .select("file_url")
+            .eq("id", archive_id)
+            .execute()
+        )
+        if cur.data and cur.data[0].get("file_url"):
+            return cur.data[0]["file_url"]
 
-            sum_row.cells[-1].text = f"PHP {total_income:,.2f}"
+    path = f"archives/{org_id}/{archive_id}-{uuid4().hex}.docx"
+    supabase.storage.from_(BUCKET_ARCHIVES).upload(
+        path, docx_bytes, {"content-type": DOCX_MIMETYPE}
+    )
+    supabase.table("financial_report_archives").update({"file_url": path}).eq(
+        "id", archive_id
+    ).execute()
+    return path
 
-        # 9) budget in the bank
-        budget_in_the_bank = (
-            prev_fund + budget_val + total_income - total_expense - reimb
-        )
 
-        replace_all("{{TOTAL_INCOME}}", f"PHP {total_income:,.2f}")
-        replace_all("{{BUDGET_IN_THE_BANK}}", f"PHP {budget_in_the_bank:,.2f}")
+def render_and_persist_archive(payload):
+    """
+    Job handler (submit / download): render archived report once, store in
+    storage. payload: {"archive_id", "replace"}.
+    """
+    data = gather_archive_report(payload["archive_id"])
+    if data is None:
+        raise ValueError("Archive not found")
+    docx_bytes = render_archive_report_docx(data)
+    persist_archive_artifact(
+        payload["archive_id"],
+        data["arch"]["organization_id"],
+        docx_bytes,
+        replace=bool(payload.get("replace")),
+    )
+    return docx_bytes
+
 
-        # 10) receipts appendix table (no raw URL)
-        rc_res = (
-            supabase.table("financial_report_archive_receipts")
-            .select("description, receipt_date, file_url")
-            .eq("archive_id", archive_id)
-            .order("receipt_date")
+report_jobs.register("archive_persist", render_and_persist_archive)
+
+
+def enqueue_archive_persist(org_id, archive_id, download_name, replace=False):
+    # isang job per archive: ang submit at download ay iisang artifact
+    return report_jobs.enqueue(
+        "archive_persist",
+        {"archive_id": archive_id, "replace": replace},
+        content_hash("archive_persist", {"archive_id": archive_id}),
+        owner=org_id,
+        download_name=download_name,
+    )
+
+
+@pres.route("/api/archives/<int:archive_id>/download", methods=["GET"])
+def download_archive(archive_id):
+    """
+    Return the DOCX file for a submitted (archived) report.
+    Naka-store na sa storage mula sa submit (file_url); kung wala o sira
+    ang stored file, background job ang magre-render (202 + job status
+    hanggang tapos, same as POST .../render-jobs).
+    Final URL: /pres/api/archives/<archive_id>/download
+    """
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    org_id = session.get("org_id")
+
+    try:
+        arch_res = (
+            supabase.table("financial_report_archives")
+            .select("id, organization_id, report_no, file_url")
+            .eq("id", archive_id)
             .execute()
         )
-        receipts = rc_res.data or []
-
-        appendix_table = None
-        for table in doc.tables:
-            if "APPENDIX" in table.cell(0, 0).text.upper():
-                appendix_table = table
-                break
-
-        if appendix_table and receipts:
-            for rc in receipts:
-                row = appendix_table.add_row()
-                row.cells[0].text = str(rc.get("receipt_date") or "")
-                row.cells[1].text = rc.get("description") or ""
-                # URL intentionally not printed
-
-        # 11) image appendix: wala nang extra page break
-        if receipts:
-            title_p = doc.add_paragraph()
-            title_run = title_p.add_run("APPENDIX: RECEIPTS")
-            title_run.bold = True
-
-            for r in receipts:
-                file_path = r["file_url"]
-                try:
-                    file_bytes = supabase.storage.from_(BUCKET_RECEIPTS).download(
-                        file_path
-                    )
-                except Exception:
-                    continue
+        # archive ng ibang org: 404 (huwag ipakita / i-render ulit)
+        if not arch_res.data or arch_res.data[0]["organization_id"] != org_id:
+            return jsonify({"error": "Archive not found"}), 404
 
-                cap_p = doc.add_paragraph()
-                cap_p.add_run(f"{r['receipt_date']} - {r['description']}")
+        arch = arch_res.data[0]
+        download_name = arch.get("report_no") or "financial_report_template.docx"
 
-                img_stream = BytesIO(file_bytes)
-                doc.add_picture(img_stream, width=Inches(4))
-                doc.add_paragraph()
+        # 1) stored artifact (rendered once at submit)
+        if arch.get("file_url"):
+            try:
+                file_bytes = supabase.storage.from_(BUCKET_ARCHIVES).download(
+                    arch["file_url"]
+                )
+                return send_file(
+                    BytesIO(file_bytes),
+                    as_attachment=True,
+                    mimetype=DOCX_MIMETYPE,
+                    download_name=download_name,
+                )
+            except Exception as e:
+                print("Error downloading stored archive, re-rendering:", e)
 
-        # 12) return file
-        buf = BytesIO()
-        doc.save(buf)
-        buf.seek(0)
+        # 2) wala pa / missing -> render + store sa background job
+        job = enqueue_archive_persist(
+            org_id, archive_id, download_name, replace=bool(arch.get("file_url"))
+        )
+        path = report_jobs.artifact_path(job["id"]) if job["status"] == "done" else None
+        if path is None:
+            return report_job_response(job)
 
-        download_name = arch.get("report_no") or "financial_report_template.docx"
         return send_file(
-            buf,
+            path,
             as_attachment=True,
-            mimetype=(
-                "application/vnd.openxmlformats-officedocument."
-                "wordprocessingml.document"
-            ),
+            mimetype=DOCX_MIMETYPE,
             download_name=download_name,
         )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# -----------------------
+# Report render jobs (background)
+#   POST /pres/api/reports/<wallet_id>/budgets/<budget_id>/render-jobs
+#   POST /pres/api/archives/<archive_id>/render-jobs
+#   GET  /pres/api/report-jobs/<job_id>          -> status
+#   GET  /pres/api/report-jobs/<job_id>/result   -> DOCX
+# -----------------------
+
+
+def report_job_body(job):
+    body = public_status(job)
+    body["status_url"] = url_for("pres.get_report_job", job_id=job["id"])
+    body["result_url"] = url_for("pres.get_report_job_result", job_id=job["id"])
+    return body
+
+
+def report_job_response(job):
+    """200 kung tapos, 202 (+ Retry-After) kung queued/running, 500 kung error."""
+    status = {"done": 200, "error": 500}.get(job["status"], 202)
+    resp = jsonify(report_job_body(job))
+    resp.status_code = status
+    if status == 202:
+        resp.headers["Retry-After"] = "1"
+    return resp
+
+
+@pres.route(
+    "/api/reports/<int:wallet_id>/budgets/<int:budget_id>/render-jobs",
+    methods=["POST"],
+)
+def enqueue_budget_report_job(wallet_id, budget_id):
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    org_id = session.get("org_id")
+    try:
+        data = gather_budget_report(org_id, wallet_id, budget_id)
+        if data is None:
+            return jsonify({"error": "No report"}), 404
+        job = report_jobs.enqueue(
+            "budget_report",
+            data,
+            report_job_id("budget_report", data),
+            owner=org_id,
+            download_name="financial_report_preview.docx",
+        )
+        return report_job_response(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@pres.route("/api/archives/<int:archive_id>/render-jobs", methods=["POST"])
+def enqueue_archive_report_job(archive_id):
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    org_id = session.get("org_id")
+    try:
+        arch_res = (
+            supabase.table("financial_report_archives")
+            .select("id, organization_id, report_no")
+            .eq("id", archive_id)
+            .execute()
+        )
+        if not arch_res.data or arch_res.data[0]["organization_id"] != org_id:
+            return jsonify({"error": "Archive not found"}), 404
+        download_name = (
+            arch_res.data[0].get("report_no") or "financial_report_template.docx"
+        )
+        # render + store (same job as submit / download_archive)
+        job = enqueue_archive_persist(org_id, archive_id, download_name)
+        return report_job_response(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _own_report_job(job_id):
+    job = report_jobs.status(job_id)
+    if job is None or job.get("owner") != session.get("org_id"):
+        return None
+    return job
+
+
+@pres.route("/api/report-jobs/<string:job_id>", methods=["GET"])
+def get_report_job(job_id):
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = _own_report_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(public_status(job))
+
+
+@pres.route("/api/report-jobs/<string:job_id>/result", methods=["GET"])
+def get_report_job_result(job_id):
+    if not session.get("pres_user"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = _own_report_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] == "error":
+        return jsonify(public_status(job)), 500
+    path = report_jobs.artifact_path(job_id)
+    if job["status"] != "done" or not path:
+        return jsonify(public_status(job)), 409
+
+    return send_file(
+        path,
+        as_attachment=request.args.get("download") == "1",
+        mimetype=DOCX_MIMETYPE,
+        download_name=job.get("download_name") or "financial_report.docx",
+    )
+
+
 # -----------------------
 # Profile APIs
 # -----------------------
@@ -3085,11 +3324,10 @@ def send_profile_reset_code():
         }
     ).eq("id", user["id"]).execute()
 
-    # TODO: palitan ito ng totoong email sender (SMTP / Supabase, etc.)
-    # send_reset_code_email(email, code)
-
-    # temporary: log lang muna sa server
-    current_app.logger.info("Password reset code for %s: %s", email, code)
+    try:
+        send_reset_code_email(email, code)
+    except Exception as e:
+        current_app.logger.error("Could not queue reset code email: %s", e)
 
     return jsonify(
         {
@@ -3178,3 +3416,136 @@ def delete_officer(officer_id):
         "organization_id", org_id
     ).execute()
     return jsonify({"success": True})
+
+
+# -----------------------
+# Ledger rollups (CLI)
+#   flask --app app pres rebuild-rollups [--budget-id N ...]
+#   flask --app app pres verify-rollups [--budget-id N ...] [--fix]
+# -----------------------
+
+
+@pres.cli.command("rebuild-rollups")
+@click.option(
+    "--budget-id", "budget_ids", type=int, multiple=True, help="Folder id(s)."
+)
+def rebuild_rollups_command(budget_ids):
+    """Recompute wallet_ledger_rollups from raw wallet_transactions rows."""
+    rows = rebuild_rollups(supabase, budget_ids=budget_ids or None)
+    click.echo(f"Rebuilt ledger rollups ({rows or 0} rows).")
+
+
+@pres.cli.command("verify-rollups")
+@click.option(
+    "--budget-id", "budget_ids", type=int, multiple=True, help="Folder id(s)."
+)
+@click.option("--fix", is_flag=True, help="Rebuild folders that do not match.")
+def verify_rollups_command(budget_ids, fix):
+    """Compare wallet_ledger_rollups against raw wallet_transactions rows."""
+    mismatches = verify_rollups(supabase, budget_ids=budget_ids or None)
+    if not mismatches:
+        click.echo("Ledger rollups OK.")
+        return
+
+    for m in mismatches:
+        click.echo(
+            f"folder {m['budget_id']} {m['year']}-{m['month']:02d} {m['kind']}: "
+            f"stored {m['stored_total']} ({m['stored_count']} tx), "
+            f"expected {m['expected_total']} ({m['expected_count']} tx)"
+        )
+
+    if fix:
+        bad_folders = sorted({m["budget_id"] for m in mismatches})
+        rebuild_rollups(supabase, budget_ids=bad_folders)
+        click.echo(f"Rebuilt {len(bad_folders)} folder(s).")
+    else:
+        raise SystemExit(1)
+
+
+# -----------------------
+# Receipt renditions (CLI)
+#   flask --app app pres backfill-renditions [--budget-id N ...]
+# -----------------------
+
+
+@pres.cli.command("backfill-renditions")
+@click.option(
+    "--budget-id", "budget_ids", type=int, multiple=True, help="Folder id(s)."
+)
+def backfill_renditions_command(budget_ids):
+    """Create thumb/print renditions for receipts uploaded before they existed."""
+    query = (
+        supabase.table("wallet_receipts")
+        .select("id, file_url")
+        .is_("print_url", "null")
+    )
+    if budget_ids:
+        query = query.in_("budget_id", list(budget_ids))
+    rows = query.execute().data or []
+
+    done = 0
+    for r in rows:
+        try:
+            file_bytes = supabase.storage.from_(BUCKET_RECEIPTS).download(r["file_url"])
+        except Exception as e:
+            click.echo(f"receipt {r['id']}: download failed ({e})")
+            continue
+        renditions = upload_renditions(
+            supabase, BUCKET_RECEIPTS, r["file_url"], file_bytes
+        )
+        if not renditions:
+            continue
+        supabase.table("wallet_receipts").update(renditions).eq("id", r["id"]).execute()
+        done += 1
+
+    click.echo(f"Created renditions for {done} of {len(rows)} receipt(s).")
+
+
+# -----------------------
+# Mail outbox (CLI)
+#   flask --app app pres mail-outbox
+#   flask --app app pres mail-sink [--port 1025]
+# -----------------------
+
+
+@pres.cli.command("mail-outbox")
+def mail_outbox_command():
+    """Show pending / failed outbound mail."""
+    click.echo(f"Pending: {outbox.pending_count()}  Failed: {outbox.failed_count()}")
+    click.echo(f"Outbox dir: {outbox.root}")
+
+
+@pres.cli.command("mail-sink")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=1025, show_default=True, type=int)
+def mail_sink_command(host, port):
+    """Local SMTP sink: prints every message (MAIL_SERVER=localhost MAIL_USE_TLS=0)."""
+
+    def show(mail_from, rcpts, data):
+        click.echo(f"--- from {mail_from} to {', '.join(rcpts)} ({len(data)} bytes)")
+        click.echo(data.decode("utf-8", "replace"))
+
+    with SMTPSink(host, port, on_message=show) as server:
+        click.echo(f"SMTP sink listening on {host}:{port}")
+        server.serve_forever()
+
+
+# -----------------------
+# Login throughput (password hashing, see passwords.py)
+#   flask --app app pres bench-login --seconds 10 --concurrency 16
+# -----------------------
+
+
+@pres.cli.command("bench-login")
+@click.option("--seconds", default=10, show_default=True, type=int)
+@click.option("--concurrency", default=16, show_default=True, type=int)
+def bench_login_command(seconds, concurrency):
+    """Concurrent password verifications -> logins/sec for this worker."""
+    r = bench_passwords(seconds=seconds, concurrency=concurrency)
+    click.echo(
+        f"{r['method']}  workers={r['workers']}  clients={concurrency}"
+    )
+    click.echo(
+        f"{r['logins']} logins in {r['seconds']}s = {r['logins_per_sec']} logins/sec "
+        f"(p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms, busy {r['busy']})"
+    )
@@ -4,6 +4,9 @@ document.addEventListener("DOMContentLoaded", () => {
   let allTransactions = [];
   let loaded = false;
   let allWalletsMeta = [];
+  let nextCursor = null; // keyset cursor ng susunod na page
+  let periodTotals = null;
+  let loadSeq = 0; // huwag i-render ang lumang response (mabilis na month clicks)
 
   // Initialize
   updateMonthDisplay();
@@ -13,13 +16,13 @@ document.addEventListener("DOMContentLoaded", () => {
   document.getElementById("prev-month").addEventListener("click", () => {
     currentMonth.setMonth(currentMonth.getMonth() - 1);
     updateMonthDisplay();
-    renderTransactions();
+    loadTransactions();
   });
 
   document.getElementById("next-month").addEventListener("click", () => {
     currentMonth.setMonth(currentMonth.getMonth() + 1);
     updateMonthDisplay();
-    renderTransactions();
+    loadTransactions();
   });
 
   // Make month/year clickable via input[type="month"]
@@ -44,7 +47,7 @@ document.addEventListener("DOMContentLoaded", () => {
         const [yy, mm] = picker.value.split("-");
         currentMonth = new Date(parseInt(yy, 10), parseInt(mm, 10) - 1, 1);
         updateMonthDisplay();
-        renderTransactions();
+        loadTransactions();
       }
       document.body.removeChild(picker);
     });
@@ -60,79 +63,94 @@ document.addEventListener("DOMContentLoaded", () => {
         .forEach((b) => b.classList.remove("active"));
       e.target.classList.add("active");
       currentFilter = e.target.dataset.filter;
-      renderTransactions();
+      loadTransactions();
     });
   });
 
   // ---- Data loading from backend ----
-async function loadTransactions() {
-  loaded = false;
-  const container = document.getElementById("transactions-list");
-  container.innerHTML = `
-    <div class="empty-state">
-      <img src="/pres/static/images/nav_history.png" alt="Loading" />
-      <h4>Loading transactions...</h4>
-      <p>Please wait a moment.</p>
-    </div>
-  `;
-
-  try {
-    const res = await fetch("/pres/api/transactions/recent");
-    if (!res.ok) throw new Error("Failed to load transactions");
-    const data = await res.json();
-
-    // Map to the shape renderTransactions/createTransactionCard expect
-    allTransactions = (data || []).map(tx => {
-      const qty = Number(tx.quantity || 0);
-      const price = Number(tx.price || 0);
-      const amount = Number(
-        tx.total_amount != null ? tx.total_amount : qty * price
-      );
-
-      let d = null;
-      if (tx.date) {
-        const tmp = new Date(tx.date);
-        d = isNaN(tmp) ? null : tmp;
-      }
-
-      return {
-        id: tx.id,
-        folderId: null,
-        walletId: null,
-        walletName: tx.wallet_name || "Wallet",
-        quantity: qty,
-        price: price,
-        incometype: tx.income_type || "",
-        particulars: tx.particulars || "",
-        rawdescription: tx.description || "",
-        type: tx.type, // "income"/"expense"
-        amount: tx.type === "expense" ? -amount : amount,
-        date: tx.date,
-        _dateObj: d,
-      };
-    });
-
-    // newest first
-    allTransactions.sort((a, b) => {
-      if (!a._dateObj || !b._dateObj) return 0;
-      return b._dateObj - a._dateObj;
-    });
-
-    loaded = true;
-    renderTransactions();
-  } catch (err) {
-    console.error(err);
-    container.innerHTML = `
-      <div class="empty-state">
-        <img src="/pres/static/images/nav_history.png" alt="No transactions" />
-        <h4>Error loading transactions</h4>
-        <p>Please try again later.</p>
-      </div>
-    `;
+  // isang page ng napiling buwan (server-side date + kind filter)
+  function monthRange(d) {
+    const y = d.getFullYear();
+    const m = d.getMonth() + 1;
+    const last = new Date(y, m, 0).getDate();
+    const mm = String(m).padStart(2, "0");
+    return { from: `${y}-${mm}-01`, to: `${y}-${mm}-${last}` };
   }
-}
 
+  async function loadTransactions(append = false) {
+    const seq = ++loadSeq;
+    const container = document.getElementById("transactions-list");
+    if (!append) {
+      loaded = false;
+      nextCursor = null;
+      container.innerHTML = `
+        <div class="empty-state">
+          <img src="/pres/static/images/nav_history.png" alt="Loading" />
+          <h4>Loading transactions...</h4>
+          <p>Please wait a moment.</p>
+        </div>
+      `;
+    }
 
+    try {
+      const params = new URLSearchParams(monthRange(currentMonth));
+      if (currentFilter !== "all") params.set("kind", currentFilter);
+      if (append && nextCursor) params.set("after", nextCursor);
+
+      const res = await fetch(`/pres/api/transactions/history?${params}`);
+      if (!res.ok) throw new Error("Failed to load transactions");
+      const data = await res.json();
+      if (seq !== loadSeq) return;
+
+      // Map to the shape renderTransactions/createTransactionCard expect
+      const page = (data.transactions || []).map((tx) => {
+        const qty = Number(tx.quantity || 0);
+        const price = Number(tx.price || 0);
+        const amount = Number(
+          tx.total_amount != null ? tx.total_amount : qty * price
+        );
+
+        let d = null;
+        if (tx.date) {
+          const tmp = new Date(tx.date);
+          d = isNaN(tmp) ? null : tmp;
+        }
+
+        return {
+          id: tx.id,
+          folderId: tx.folder_id,
+          walletId: tx.wallet_id,
+          walletName: tx.wallet_name || "Wallet",
+          quantity: qty,
+          price: price,
+          incometype: tx.income_type || "",
+          particulars: tx.particulars || "",
+          rawdescription: tx.description || "",
+          type: tx.type, // "income"/"expense"
+          amount: tx.type === "expense" ? -amount : amount,
+          date: tx.date,
+          _dateObj: d,
+        };
+      });
+
+      allTransactions = append ? allTransactions.concat(page) : page;
+      nextCursor = data.next_cursor || null;
+      if (data.totals) periodTotals = data.totals;
+
+      loaded = true;
+      renderTransactions();
+    } catch (err) {
+      console.error(err);
+      if (seq !== loadSeq) return;
+      container.innerHTML = `
+        <div class="empty-state">
+          <img src="/pres/static/images/nav_history.png" alt="No transactions" />
+          <h4>Error loading transactions</h4>
+          <p>Please try again later.</p>
+        </div>
+      `;
+    }
+  }
 
   function updateMonthDisplay() {
     const months = [
@@ -153,6 +171,25 @@ async function loadTransactions() {
     document.getElementById("current-month").textContent = monthDisplay;
   }
 
+  function renderPeriodTotals() {
+    const el = document.getElementById("period-totals");
+    if (!el) return;
+    if (!periodTotals) {
+      el.innerHTML = "";
+      return;
+    }
+    const fmt = (n) =>
+      Number(n || 0).toLocaleString("en-PH", {
+        minimumFractionDigits: 2,
+        maximumFractionDigits: 2,
+      });
+    el.innerHTML = `
+      <span class="income">Income: PHP ${fmt(periodTotals.income)}</span>
+      <span class="expense">Expenses: PHP ${fmt(periodTotals.expense)}</span>
+      <span>Net: PHP ${fmt(periodTotals.net)}</span>
+    `;
+  }
+
   function renderTransactions() {
     const container = document.getElementById("transactions-list");
 
@@ -167,29 +204,9 @@ async function loadTransactions() {
       return;
     }
 
-   // Filter by wallet month/year (folder) ONLY, ignore tx date
-const targetMonthIndex = currentMonth.getMonth(); // 0-11
-const targetYear = currentMonth.getFullYear();
-
-let filtered = allTransactions.filter((tx) => {
-  if (!tx._dateObj || isNaN(tx._dateObj)) return false;
-  return (
-    tx._dateObj.getFullYear() === targetYear &&
-    tx._dateObj.getMonth() === targetMonthIndex
-  );
-});
-
-
-    // Filter by type
-    if (currentFilter !== "all") {
-      filtered = filtered.filter((tx) => tx.type === currentFilter);
-    }
-
-    // Sort newest first (by date)
-    filtered.sort((a, b) => {
-      if (!a._dateObj || !b._dateObj) return 0;
-      return b._dateObj - a._dateObj;
-    });
+    // month + type filter ay nasa server na; newest first din
+    const filtered = allTransactions;
+    renderPeriodTotals();
 
     // Show empty-state if nothing
     if (filtered.length === 0) {
@@ -209,8 +226,29 @@ let filtered = allTransactions.filter((tx) => {
       html += createTransactionCard(tx);
     });
 
+    if (nextCursor) {
+      const remaining = periodTotals
+        ? Math.max(0, periodTotals.count - filtered.length)
+        : 0;
+      html += `
+        <div class="load-more">
+          <button type="button" class="load-more-btn" id="load-more-btn">
+            Load more${remaining ? ` (${remaining})` : ""}
+          </button>
+        </div>
+      `;
+    }
+
     container.innerHTML = html;
 
+    const loadMoreBtn = document.getElementById("load-more-btn");
+    if (loadMoreBtn) {
+      loadMoreBtn.addEventListener("click", () => {
+        loadMoreBtn.disabled = true;
+        loadTransactions(true);
+      });
+    }
+
 // make each date clickable to jump to that month/year
 const dateEls = container.querySelectorAll(".transaction-date");
 dateEls.forEach((el) => {
@@ -229,7 +267,7 @@ dateEls.forEach((el) => {
 
     currentMonth = new Date(d.getFullYear(), d.getMonth(), 1);
     updateMonthDisplay();
-    renderTransactions();
+    loadTransactions();
   });
 });
 
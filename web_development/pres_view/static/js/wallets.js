@@ -26,13 +26,16 @@ document.addEventListener("DOMContentLoaded", () => {
   let currentFilter = "all";
   let wallets = [];
   let walletsFiltered = [];
-  let walletTransactions = {}; // key: folder_id
+  let walletTransactions = {}; // key: folder_id (loaded pages lang)
+  let walletTxPaging = {}; // key: folder_id -> { next, kind, total, income, expense }
   let walletReceipts = {}; // key: folder_id
   let walletArchives = {}; // key: folder_id
   let currentTxType = "income";
 
   let currentOrgId = null; // para sa per-org report draft keys
 
+  const TX_PAGE_SIZE = 50;
+
   // per-folder flag ng generated report
   let reportGeneratedForFolderId = null;
   let nextReportNumber = 1;
@@ -49,6 +52,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const walletActionsBtn = document.getElementById("wallet-actions-btn");
   const walletBudgetBtn = document.getElementById("wallet-budget-btn");
   const walletActionsMenu = document.getElementById("wallet-actions-menu");
+  const txImportFile = document.getElementById("tx-import-file");
 
   const txModalOverlay = document.getElementById("tx-modal-overlay");
   const closeTxModal = document.getElementById("close-tx-modal");
@@ -302,6 +306,44 @@ document.addEventListener("DOMContentLoaded", () => {
     return res.json();
   }
 
+  // Random key para sa Idempotency-Key header (gumagana kahit http LAN,
+  // hindi tulad ng crypto.randomUUID)
+  function newIdempotencyKey() {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("");
+  }
+
+  // Background render job (see report_jobs.py): 202 -> poll hanggang done
+  async function waitForReportJob(job) {
+    const started = Date.now();
+    while (job.status === "queued" || job.status === "running") {
+      if (Date.now() - started > 120000) {
+        throw new Error("Report is still rendering");
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      job = { ...job, ...(await apiGet(job.status_url)) };
+    }
+    if (job.status !== "done") throw new Error(job.error || "Render failed");
+    return job;
+  }
+
+  async function openReportJob(startUrl, { download = false } = {}) {
+    // buksan agad ang tab (click pa lang) para hindi ma-block ng popup blocker
+    const win = window.open("", "_blank");
+    try {
+      const job = await waitForReportJob(await apiPost(startUrl, {}));
+      const url = job.result_url + (download ? "?download=1" : "");
+      if (win) {
+        win.location.href = url;
+      } else {
+        window.location.href = url;
+      }
+    } catch (err) {
+      if (win) win.close();
+      throw err;
+    }
+  }
+
   // localStorage view state
   function getViewState() {
     try {
@@ -606,8 +648,13 @@ document.addEventListener("DOMContentLoaded", () => {
       filterButtons.forEach((b) => b.classList.remove("active"));
       e.target.classList.add("active");
       currentFilter = e.target.dataset.filter;
-      renderWalletTransactions();
       setViewState({ filter: currentFilter });
+      // server-side kind filter: first page ulit
+      if (currentWallet) {
+        loadWalletTransactions(currentWallet.id).then(renderWalletTransactions);
+      } else {
+        renderWalletTransactions();
+      }
     });
   });
 
@@ -624,6 +671,71 @@ document.addEventListener("DOMContentLoaded", () => {
       openTxModal(action);
     } else if (action === "receipt") {
       openReceiptModal();
+    } else if (action === "import") {
+      txImportFile.value = "";
+      txImportFile.click();
+    }
+  });
+
+  // ===== Bulk import (CSV / XLSX) =====
+  // columns: date, kind, quantity, price, description, income_type, particulars
+  txImportFile.addEventListener("change", async () => {
+    const file = txImportFile.files[0];
+    if (!file || !currentWallet) return;
+    const folderId = currentWallet.id;
+
+    const formData = new FormData();
+    formData.append("file", file);
+    showToast("Importing transactions...");
+
+    // iisang key sa bawat retry: hindi madodoble ang rows (see idempotency.py)
+    const idempotencyKey = newIdempotencyKey();
+
+    try {
+      let res;
+      for (let attempt = 0; ; attempt++) {
+        try {
+          res = await fetch(
+            `/pres/api/wallets/${folderId}/transactions/import`,
+            {
+              method: "POST",
+              body: formData,
+              credentials: "include",
+              headers: { "Idempotency-Key": idempotencyKey },
+            }
+          );
+        } catch (networkErr) {
+          if (attempt >= 2) throw networkErr;
+          await new Promise((resolve) => setTimeout(resolve, 1000 * (attempt + 1)));
+          continue;
+        }
+        // 409: nasa gitna pa ang unang request na may parehong key
+        if (res.status !== 409 || attempt >= 2) break;
+        await new Promise((resolve) => setTimeout(resolve, 1000 * (attempt + 1)));
+      }
+      const result = await res.json();
+      if (!res.ok) throw new Error(result.error || "Import failed");
+
+      if (result.errors && result.errors.length) {
+        console.warn("Import errors:", result.errors);
+      }
+      const first = (result.errors || [])[0];
+      showToast(
+        result.failed
+          ? `Imported ${result.inserted} rows. ${result.failed} rows failed` +
+              (first ? ` (row ${first.row}: ${first.error})` : "")
+          : `Imported ${result.inserted} transactions.`,
+        result.failed > 0
+      );
+
+      await loadWalletTransactions(folderId);
+      if (currentWallet && currentWallet.id === folderId) {
+        updateStatsUI();
+        renderWalletTransactions();
+      }
+    } catch (err) {
+      console.error(err);
+      showToast(err.message || "Import failed.", true);
     }
   });
 
@@ -854,6 +966,12 @@ document.addEventListener("DOMContentLoaded", () => {
         walletTransactions[currentWallet.id] = [];
       }
 
+      adjustFolderTotals(
+        currentWallet.id,
+        editingId ? findTxById(editingId) : null,
+        tx
+      );
+
       if (editingId) {
         walletTransactions[currentWallet.id] = walletTransactions[
           currentWallet.id
@@ -881,14 +999,29 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   });
 
-  function recomputeTotalsForFolder(folderId) {
-    const txs = walletTransactions[folderId] || [];
-    let income = 0;
-    let expenses = 0;
-    txs.forEach((tx) => {
-      if (tx.type === "income") income += tx.amount;
-      else if (tx.type === "expense") expenses += Math.abs(tx.amount);
+  // local add / edit / delete: i-adjust ang server totals (walang refetch)
+  function adjustFolderTotals(folderId, oldTx, newTx) {
+    const paging = walletTxPaging[folderId];
+    if (!paging) return;
+    [
+      [oldTx, -1],
+      [newTx, 1],
+    ].forEach(([tx, sign]) => {
+      if (!tx) return;
+      if (tx.type === "income") paging.income += sign * tx.amount;
+      else if (tx.type === "expense")
+        paging.expense += sign * Math.abs(tx.amount);
+      if (paging.kind === "all" || paging.kind === tx.type) {
+        paging.total += sign;
+      }
     });
+  }
+
+  function recomputeTotalsForFolder(folderId) {
+    // totals ng buong folder galing sa server headers (hindi lang loaded page)
+    const paging = walletTxPaging[folderId] || {};
+    const income = paging.income || 0;
+    const expenses = paging.expense || 0;
 
     const w = wallets.find((w) => w.id === folderId);
     if (w) {
@@ -1011,6 +1144,7 @@ document.addEventListener("DOMContentLoaded", () => {
         id: data.id,
         name: data.name,
         date: data.date,
+        thumburl: data.thumburl || "",
       });
 
       renderReceipts();
@@ -1055,8 +1189,12 @@ document.addEventListener("DOMContentLoaded", () => {
       .map(
         (receipt) => `
         <div class="receipt-card" data-receipt-id="${receipt.id}">
-          <div class="receipt-icon">
-            <img src="${receiptsIconUrl}" alt="Receipt" />
+          <div class="receipt-icon${receipt.thumburl ? " has-thumb" : ""}">
+            ${
+              receipt.thumburl
+                ? `<img src="${receipt.thumburl}" alt="Receipt" loading="lazy" />`
+                : `<img src="${receiptsIconUrl}" alt="Receipt" />`
+            }
           </div>
           <h5>${receipt.name}</h5>
           <p>${receipt.date}</p>
@@ -1365,10 +1503,12 @@ document.addEventListener("DOMContentLoaded", () => {
       showToast("Generate the report first for this month.", true);
       return;
     }
-    window.open(
-      `/pres/reports/${currentWallet.walletId}/budgets/${currentWallet.id}/preview`,
-      "_blank"
-    );
+    openReportJob(
+      `/pres/api/reports/${currentWallet.walletId}/budgets/${currentWallet.id}/render-jobs`
+    ).catch((err) => {
+      console.error(err);
+      showToast("Failed to prepare report preview.", true);
+    });
   });
 
   printReportBtn.addEventListener("click", () => {
@@ -1560,10 +1700,25 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // ===== Load transactions / receipts / archives from backend =====
 
-  async function loadWalletTransactions(folderId) {
+  // keyset pages (newest first); append = next page ng same filter
+  async function loadWalletTransactions(folderId, append = false) {
     try {
-      const data = await apiGet(`/pres/api/wallets/${folderId}/transactions`);
-      walletTransactions[folderId] = data.map((tx) => ({
+      const params = new URLSearchParams({
+        limit: TX_PAGE_SIZE,
+        order: "desc",
+      });
+      if (currentFilter !== "all") params.set("kind", currentFilter);
+      const prev = walletTxPaging[folderId];
+      if (append && prev && prev.next) params.set("after", prev.next);
+
+      const res = await fetch(
+        `/pres/api/wallets/${folderId}/transactions?${params}`,
+        { credentials: "include" }
+      );
+      if (!res.ok) throw new Error("Request failed");
+      const data = await res.json();
+
+      const rows = data.map((tx) => ({
         id: tx.id,
         event: currentWallet?.name || "",
         quantity: Number(tx.quantity),
@@ -1578,11 +1733,24 @@ document.addEventListener("DOMContentLoaded", () => {
         date: tx.date_issued,
         type: tx.kind,
       }));
+      walletTransactions[folderId] = append
+        ? [...(walletTransactions[folderId] || []), ...rows]
+        : rows;
+      walletTxPaging[folderId] = {
+        next: res.headers.get("X-Next-Cursor"),
+        kind: currentFilter,
+        total: Number(res.headers.get("X-Total-Count") || rows.length),
+        income: Number(res.headers.get("X-Total-Income") || 0),
+        expense: Number(res.headers.get("X-Total-Expense") || 0),
+      };
 
       recomputeTotalsForFolder(folderId);
     } catch (err) {
       console.error(err);
-      walletTransactions[folderId] = [];
+      if (!append) {
+        walletTransactions[folderId] = [];
+        walletTxPaging[folderId] = null;
+      }
       recomputeTotalsForFolder(folderId);
     }
   }
@@ -1595,6 +1763,7 @@ document.addEventListener("DOMContentLoaded", () => {
         name: r.description,
         date: r.receiptdate,
         fileurl: r.fileurl,
+        thumburl: r.thumburl || "",
       }));
     } catch (err) {
       console.error(err);
@@ -1665,8 +1834,32 @@ document.addEventListener("DOMContentLoaded", () => {
 
     let html = "";
     filteredTransactions.forEach((tx) => (html += createTransactionItem(tx)));
+
+    const paging = walletTxPaging[currentWallet.id];
+    if (paging && paging.next) {
+      const remaining = Math.max(0, paging.total - transactions.length);
+      html += `
+        <div class="tx-load-more">
+          <button type="button" class="secondary-btn" id="tx-load-more-btn">
+            Load more${remaining ? ` (${remaining})` : ""}
+          </button>
+        </div>
+      `;
+    }
     container.innerHTML = html;
 
+    const loadMoreBtn = document.getElementById("tx-load-more-btn");
+    if (loadMoreBtn) {
+      loadMoreBtn.addEventListener("click", async () => {
+        loadMoreBtn.disabled = true;
+        const folderId = currentWallet.id;
+        await loadWalletTransactions(folderId, true);
+        if (currentWallet && currentWallet.id === folderId) {
+          renderWalletTransactions();
+        }
+      });
+    }
+
     container.querySelectorAll(".transaction-item").forEach((item) => {
       const txId = item.dataset.txId;
       const toggle = item.querySelector(".tx-menu-toggle");
@@ -1802,6 +1995,7 @@ document.addEventListener("DOMContentLoaded", () => {
               credentials: "include",
             }
           );
+          adjustFolderTotals(currentWallet.id, findTxById(txId), null);
           walletTransactions[currentWallet.id] = (
             walletTransactions[currentWallet.id] || []
           ).filter((t) => String(t.id) !== String(txId));
@@ -1863,8 +2057,20 @@ document.addEventListener("DOMContentLoaded", () => {
       const id = card.dataset.archiveId;
       const downloadBtn = card.querySelector(".download");
 
+      const archive = archives.find((a) => String(a.id) === String(id));
+
       downloadBtn.addEventListener("click", () => {
-        window.open(`/pres/api/archives/${id}/download`, "_blank");
+        if (archive && archive.file_url) {
+          // naka-store na (rendered sa submit)
+          window.open(`/pres/api/archives/${id}/download`, "_blank");
+          return;
+        }
+        openReportJob(`/pres/api/archives/${id}/render-jobs`, {
+          download: true,
+        }).catch((err) => {
+          console.error(err);
+          showToast("Failed to download report.", true);
+        });
       });
     });
   }
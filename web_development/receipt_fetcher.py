@@ -0,0 +1,213 @@
+"""
+Concurrent, cached receipt image fetching (para sa DOCX report rendering).
+
+    images = fetch_receipts(supabase, BUCKET_RECEIPTS, [r["file_url"] for r in receipts])
+    images[file_url]  -> bytes, or None kung hindi ma-download
+
+Downloads run on a bounded thread pool. Results go to a size-capped,
+content-addressed disk cache:
+
+    <dir>/keys/<sha256(bucket/file_url)>   -> content hash (text)
+    <dir>/blobs/<sha256(content)>          -> image bytes
+
+Immutable ang receipt paths (uuid filenames), kaya safe i-key sa file_url.
+LRU eviction by mtime (tinu-touch ang blob tuwing hit).
+
+Config (env):
+    RECEIPT_CACHE_DIR      default <tmp>/pockitrack-receipts
+    RECEIPT_CACHE_MAX_MB   default 256 (0 = walang disk cache)
+    RECEIPT_FETCH_WORKERS  default 8
+"""
+
+import contextvars
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ReceiptCache:
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.keys_dir = os.path.join(root, "keys")
+        self.blobs_dir = os.path.join(root, "blobs")
+        os.makedirs(self.keys_dir, exist_ok=True)
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(size for _, _, size in self._blobs())
+
+    def _blobs(self):
+        out = []
+        for name in os.listdir(self.blobs_dir):
+            try:
+                st = os.stat(os.path.join(self.blobs_dir, name))
+            except OSError:
+                continue
+            out.append((st.st_mtime, name, st.st_size))
+        return out
+
+    def _key_path(self, key):
+        return os.path.join(self.keys_dir, _sha256(key.encode("utf-8")))
+
+    @staticmethod
+    def _write_atomic(path, data):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def get(self, key):
+        try:
+            with open(self._key_path(key), "r") as f:
+                digest = f.read().strip()
+            blob_path = os.path.join(self.blobs_dir, digest)
+            with open(blob_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if _sha256(data) != digest:
+            return None  # corrupt / partially evicted
+        try:
+            os.utime(blob_path)  # LRU touch
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        digest = _sha256(data)
+        blob_path = os.path.join(self.blobs_dir, digest)
+        try:
+            if not os.path.exists(blob_path):
+                self._write_atomic(blob_path, data)
+                with self._lock:
+                    self._size += len(data)
+            else:
+                os.utime(blob_path)
+            self._write_atomic(self._key_path(key), digest.encode("ascii"))
+        except OSError as e:
+            print("Error writing receipt cache:", e)
+            return
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least-recently-used blobs until under max_bytes."""
+        with self._lock:
+            blobs = sorted(self._blobs())
+            total = sum(size for _, _, size in blobs)
+            for _, name, size in blobs:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.blobs_dir, name))
+                    total -= size
+                except OSError:
+                    pass
+            self._size = total
+            # keys na wala nang blob ay mag-miss lang sa get(); linisin paminsan
+            if len(os.listdir(self.keys_dir)) > 4 * max(len(blobs), 1):
+                self._prune_keys()
+
+    def _prune_keys(self):
+        blobs = set(os.listdir(self.blobs_dir))
+        for name in os.listdir(self.keys_dir):
+            path = os.path.join(self.keys_dir, name)
+            try:
+                with open(path, "r") as f:
+                    if f.read().strip() not in blobs:
+                        os.remove(path)
+            except OSError:
+                pass
+
+
+_lock = threading.Lock()
+_cache = None
+_cache_ready = False
+_pool = None
+
+
+def get_cache():
+    """Process-wide disk cache (None kung naka-disable)."""
+    global _cache, _cache_ready
+    if not _cache_ready:
+        with _lock:
+            if not _cache_ready:
+                max_mb = _env_int("RECEIPT_CACHE_MAX_MB", 256)
+                if max_mb > 0:
+                    root = os.getenv("RECEIPT_CACHE_DIR") or os.path.join(
+                        tempfile.gettempdir(), "pockitrack-receipts"
+                    )
+                    try:
+                        _cache = ReceiptCache(root, max_mb * 1024 * 1024)
+                    except OSError as e:
+                        print("Receipt cache disabled:", e)
+                _cache_ready = True
+    return _cache
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=max(1, _env_int("RECEIPT_FETCH_WORKERS", 8)),
+                    thread_name_prefix="receipt-fetch",
+                )
+    return _pool
+
+
+def _download(client, bucket, file_url):
+    cache = get_cache()
+    key = f"{bucket}/{file_url}"
+    if cache is not None:
+        data = cache.get(key)
+        if data is not None:
+            return data
+    try:
+        data = client.storage.from_(bucket).download(file_url)
+    except Exception as e:
+        print("Error downloading receipt:", file_url, e)
+        return None
+    if cache is not None and data:
+        cache.put(key, data)
+    return data
+
+
+def fetch_receipts(client, bucket, file_urls):
+    """
+    Download many receipts concurrently (cache first).
+    Returns {file_url: bytes or None}; duplicates fetched once.
+    """
+    unique = [u for u in dict.fromkeys(file_urls) if u]
+    if not unique:
+        return {}
+    pool = _get_pool()
+    # copy_context: para ma-count pa rin sa Server-Timing ng request
+    futures = {
+        u: pool.submit(contextvars.copy_context().run, _download, client, bucket, u)
+        for u in unique
+    }
+    return {u: f.result() for u, f in futures.items()}
@@ -0,0 +1,94 @@
+"""
+Receipt image renditions (ginagawa sa upload).
+
+Bukod sa original na phone photo, nag-i-store din ng:
+    <name>.thumb.jpg   maliit na thumbnail para sa lists
+    <name>.print.jpg   JPEG na sakto para sa 4" print (300 DPI max)
+sa tabi ng original sa storage, at naka-record sa wallet_receipts
+(thumb_url, print_url). Ang DOCX / print paths ay gumagamit ng print
+rendition; fallback sa original kung wala (lumang rows, PDF, etc.).
+
+Schema: supabase/migrations/0002_receipt_renditions.sql
+"""
+
+import os
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+THUMB_SIZE = (320, 320)
+PRINT_WIDTH_IN = 4
+PRINT_DPI = 300
+PRINT_SIZE = (PRINT_WIDTH_IN * PRINT_DPI, PRINT_WIDTH_IN * PRINT_DPI * 2)
+THUMB_QUALITY = 75
+PRINT_QUALITY = 85
+
+
+def rendition_paths(path):
+    """Storage paths ng thumb / print, katabi ng original."""
+    base = os.path.splitext(path)[0]
+    return f"{base}.thumb.jpg", f"{base}.print.jpg"
+
+
+def _to_jpeg(img, size, quality, dpi=None):
+    out = img.copy()
+    out.thumbnail(size, Image.LANCZOS)  # never upscales
+    buf = BytesIO()
+    opts = {"quality": quality, "optimize": True, "progressive": True}
+    if dpi:
+        opts["dpi"] = (dpi, dpi)
+    out.save(buf, "JPEG", **opts)
+    return buf.getvalue()
+
+
+def make_renditions(file_bytes):
+    """
+    {"thumb": bytes, "print": bytes}, or None kung hindi image ang file.
+    """
+    try:
+        img = Image.open(BytesIO(file_bytes))
+        img = ImageOps.exif_transpose(img)  # phone photos: apply rotation
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.split()[-1])
+        img = bg
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    return {
+        "thumb": _to_jpeg(img, THUMB_SIZE, THUMB_QUALITY),
+        "print": _to_jpeg(img, PRINT_SIZE, PRINT_QUALITY, dpi=PRINT_DPI),
+    }
+
+
+def upload_renditions(client, bucket, path, file_bytes):
+    """
+    Generate + upload renditions for an uploaded receipt.
+    Returns {"thumb_url": ..., "print_url": ...}, or {} kung hindi kinaya
+    (hindi dapat mag-fail ang upload dahil dito).
+    """
+    try:
+        renditions = make_renditions(file_bytes)
+        if not renditions:
+            return {}
+        thumb_path, print_path = rendition_paths(path)
+        for dest, data in (
+            (thumb_path, renditions["thumb"]),
+            (print_path, renditions["print"]),
+        ):
+            # bagong dict bawat upload: pino-pop ng storage3 ang file_options
+            opts = {"content-type": "image/jpeg", "upsert": "true"}
+            client.storage.from_(bucket).upload(dest, data, opts)
+        return {"thumb_url": thumb_path, "print_url": print_path}
+    except Exception as e:
+        print("Error creating receipt renditions:", e)
+        return {}
+
+
+def print_path_of(receipt):
+    """Path na gagamitin sa DOCX / print (print rendition kung meron)."""
+    return receipt.get("print_url") or receipt.get("file_url")
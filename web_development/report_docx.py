@@ -0,0 +1,96 @@
+"""
+Pre-compiled DOCX report template.
+
+Ang finance_report_template.docx ay pina-parse isang beses lang (sa
+import ng blueprint). Naka-index kung saang run (w:t) nakalagay ang bawat
+{{PLACEHOLDER}} at kung aling table ang EXPENSES / INCOME / APPENDIX.
+Bawat render ay deepcopy ng cached tree + isang pass na substitution,
+imbes na i-open ang file at i-walk ang buong document per placeholder.
+
+    template = ReportTemplate(path)
+    doc = template.render({"ORG_NAME": "...", "BUDGET": "PHP 1,000.00"})
+    expenses_table = template.table(doc, "expenses")
+"""
+
+import copy
+import hashlib
+import re
+import threading
+from io import BytesIO
+
+from docx import Document
+from docx.oxml.ns import qn
+
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+
+def _row_text(table, idx):
+    if len(table.rows) <= idx:
+        return ""
+    return " ".join(c.text for c in table.rows[idx].cells).upper()
+
+
+def _find_tables(doc):
+    """Table positions, same header rules as the old per-request lookups."""
+    found = {}
+    for i, table in enumerate(doc.tables):
+        header = _row_text(table, 1)
+        if "expenses" not in found and "DATE ISSUED" in header and "PARTICULARS" in header:
+            found["expenses"] = i
+        elif "income" not in found and "DATE ISSUED" in header and "TYPE OF INCOME" in header:
+            found["income"] = i
+        if "appendix" not in found and "APPENDIX" in _row_text(table, 0):
+            found["appendix"] = i
+    return found
+
+
+class ReportTemplate:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            raw = f.read()
+        # nagbabago kapag pinalitan ang .docx (para sa artifact cache keys)
+        self.version = hashlib.md5(raw).hexdigest()
+        self._doc = Document(BytesIO(raw))
+        self._lock = threading.Lock()
+
+        # ordinal ng w:t sa body -> original text (may {{...}})
+        self.slots = {}
+        for i, t in enumerate(self._doc.element.body.iter(qn("w:t"))):
+            if t.text and PLACEHOLDER_RE.search(t.text):
+                self.slots[i] = t.text
+        self.last_slot = max(self.slots) if self.slots else -1
+        self.placeholders = sorted(
+            {m for text in self.slots.values() for m in PLACEHOLDER_RE.findall(text)}
+        )
+        self.tables = _find_tables(self._doc)
+
+    def render(self, values):
+        """
+        Fresh Document with placeholders substituted.
+        values: {"ORG_NAME": "...", ...}; None -> "", unknown keys stay as-is.
+        """
+        with self._lock:
+            # fresh Document wrapper: ang cached body ng deepcopy ay
+            # naka-point sa hiwalay na kopya (tables edits would be lost)
+            doc = copy.deepcopy(self._doc).part.document
+
+        def sub(m):
+            if m.group(1) not in values:
+                return m.group(0)
+            val = values[m.group(1)]
+            return "" if val is None else str(val)
+
+        for i, t in enumerate(doc.element.body.iter(qn("w:t"))):
+            if i in self.slots:
+                t.text = PLACEHOLDER_RE.sub(sub, self.slots[i])
+            if i >= self.last_slot:
+                break
+        return doc
+
+    def table(self, doc, name):
+        """'expenses' / 'income' / 'appendix' table of a rendered doc (or None)."""
+        idx = self.tables.get(name)
+        if idx is None:
+            return None
+        return doc.tables[idx]
@@ -0,0 +1,150 @@
+"""
+Streaming ZIP export (OSAS bulk download ng submitted reports).
+
+Hindi binubuo ang buong ZIP sa memory: bawat entry ay isinusulat at
+ibinibigay sa response habang natatapos ang mga ito (completion order).
+Ang I/O (Supabase reads, stored artifacts) ay sa thread pool; ang DOCX
+rendering (CPU) ay sa process pool via render_in_pool().
+
+    def entries():
+        for arch in archives:
+            yield f"{org}/{month}.docx", partial(build_docx, arch)
+
+    return Response(stream_zip(entries()), mimetype="application/zip")
+
+Config (env):
+    REPORT_EXPORT_WORKERS    sabay-sabay na entries (threads, default 4)
+    REPORT_EXPORT_PROCS      render processes (default cpu count, max 4)
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+_pool_lock = threading.Lock()
+_render_pool = None
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_render_pool():
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is None:
+            procs = _env_int("REPORT_EXPORT_PROCS", min(4, os.cpu_count() or 1))
+            # spawn, hindi fork: tinatawag ito sa loob ng gunicorn worker na
+            # may ibang threads na (HTTP pool, job queue, flushers); ang
+            # forked child ay pwedeng magmana ng naka-hold na lock
+            _render_pool = ProcessPoolExecutor(
+                max_workers=max(1, procs),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _render_pool
+
+
+def render_in_pool(fn, *args):
+    """Run fn(*args) sa render process pool (fn must be picklable)."""
+    return _get_render_pool().submit(fn, *args).result()
+
+
+def safe_name(text, fallback="untitled"):
+    """Path-safe ZIP entry component."""
+    text = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', "_", str(text or "")).strip(" .")
+    return text or fallback
+
+
+class _Sink:
+    """Write-only buffer para sa ZipFile (unseekable -> data descriptors)."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries, workers=None):
+    """
+    Generator of ZIP bytes.
+    entries: iterable of (arcname, build) where build() -> bytes.
+    Bounded: hanggang 2x workers lang ang naka-queue / nasa memory.
+    Failed entries -> nakalista sa ERRORS.txt sa dulo ng ZIP.
+    """
+    workers = workers or max(1, _env_int("REPORT_EXPORT_WORKERS", 4))
+    sink = _Sink()
+    zf = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    errors = []
+    used = set()
+
+    def unique(name):
+        base, ext = os.path.splitext(name)
+        n = 2
+        while name in used:
+            name = f"{base} ({n}){ext}"
+            n += 1
+        used.add(name)
+        return name
+
+    it = iter(entries)
+    pending = {}
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip-export")
+
+    def fill():
+        while len(pending) < workers * 2:
+            try:
+                name, build = next(it)
+            except StopIteration:
+                return
+            pending[pool.submit(build)] = name
+
+    try:
+        fill()
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = pending.pop(fut)
+                try:
+                    data = fut.result()
+                except Exception as e:
+                    print("Error exporting report:", name, e)
+                    errors.append(f"{name}: {e}")
+                    continue
+                if data is None:
+                    errors.append(f"{name}: not found")
+                    continue
+                zf.writestr(unique(name), data)
+                del data
+                yield sink.drain()
+            fill()
+    finally:
+        # client disconnect: huwag nang simulan ang natitira
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=False)
+
+    if errors:
+        zf.writestr(unique("ERRORS.txt"), "\n".join(errors) + "\n")
+    zf.close()
+    yield sink.drain()
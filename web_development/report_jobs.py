@@ -0,0 +1,368 @@
+"""
+Background report-render jobs.
+
+Ang DOCX rendering ay tumatakbo sa local worker pool imbes na sa request
+thread. Job id = content hash ng report data (+ template), kaya:
+  * same content -> same job, isang render lang
+  * tapos na artifact ay reusable hangga't hindi nagbabago ang data
+
+    jobs.register("budget_report", render_fn)        # render_fn(payload) -> bytes
+    job = jobs.enqueue("budget_report", payload, content_hash,
+                       owner=org_id, download_name="report.docx")
+    jobs.status(job_id) / jobs.artifact_path(job_id)
+
+Queue is pluggable: anything with put(message) / get(timeout) works
+(default LocalQueue = in-process queue.Queue). Ang message ay buong job
+(id, kind, payload, owner, download_name) at JSON-serializable, kaya ang
+worker ng ibang process ay hindi na kailangan ng local state.
+
+Status (queued / running / error) at artifacts ay files sa
+REPORT_ARTIFACT_DIR, kaya ang status poll ay gumagana kahit sa ibang
+gunicorn worker. Para sa workers sa ibang host, dapat shared ang dir na
+ito (hal. NFS mount).
+
+Config (env):
+    REPORT_JOB_WORKERS       worker threads (default 2)
+    REPORT_ARTIFACT_DIR      default <tmp>/pockitrack-reports
+    REPORT_ARTIFACT_MAX      max artifacts na itatabi (default 200)
+    REPORT_JOB_STALE_SECONDS queued/running na lampas dito ay itinuturing
+                             na nawala (patay na worker), re-queue (default 300)
+"""
+
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def content_hash(kind, data, salt=""):
+    """Stable hash ng report data (dicts/lists from Supabase)."""
+    blob = json.dumps(
+        {"kind": kind, "data": data, "salt": salt},
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LocalQueue:
+    """In-process FIFO queue (default backend)."""
+
+    def __init__(self):
+        self._q = queue.Queue()
+
+    def put(self, message):
+        self._q.put(message)
+
+    def get(self, timeout=None):
+        try:
+            return self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ArtifactStore:
+    """
+    Rendered files: <dir>/<job_id>.bin + <job_id>.json (meta), at
+    <job_id>.status habang hindi pa tapos (o kung pumalya).
+    """
+
+    def __init__(self, root, max_items=200):
+        self.root = root
+        self.max_items = max_items
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.bin")
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def _status_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.status")
+
+    def _write(self, path, blob):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+
+    def set_status(self, job_id, info):
+        self._write(self._status_path(job_id), json.dumps(info).encode("utf-8"))
+
+    def get_status(self, job_id):
+        try:
+            with open(self._status_path(job_id), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def clear_status(self, job_id):
+        try:
+            os.remove(self._status_path(job_id))
+        except OSError:
+            pass
+
+    def exists(self, job_id):
+        return os.path.exists(self.path(job_id)) and os.path.exists(
+            self._meta_path(job_id)
+        )
+
+    def meta(self, job_id):
+        try:
+            with open(self._meta_path(job_id), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, job_id, data, meta):
+        self._write(self.path(job_id), data)
+        self._write(self._meta_path(job_id), json.dumps(meta).encode("utf-8"))
+        self.clear_status(job_id)
+        self.prune()
+
+    def touch(self, job_id):
+        try:
+            os.utime(self.path(job_id))
+        except OSError:
+            pass
+
+    def prune(self, status_max_age=86400):
+        entries = []
+        cutoff = time.time() - status_max_age
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if name.endswith(".status") and mtime < cutoff:
+                # lumang error / naiwang status ng patay na worker
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif name.endswith(".bin"):
+                entries.append((mtime, name))
+        entries.sort()
+        for _, name in entries[: max(0, len(entries) - self.max_items)]:
+            job_id = name[: -len(".bin")]
+            for path in (self.path(job_id), self._meta_path(job_id)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class JobRunner:
+    def __init__(self, job_queue=None, store=None, workers=None):
+        self.queue = job_queue or LocalQueue()
+        self.store = store or ArtifactStore(
+            os.getenv("REPORT_ARTIFACT_DIR")
+            or os.path.join(tempfile.gettempdir(), "pockitrack-reports"),
+            max_items=_env_int("REPORT_ARTIFACT_MAX", 200),
+        )
+        self.workers = workers or max(1, _env_int("REPORT_JOB_WORKERS", 2))
+        self.stale_seconds = max(30, _env_int("REPORT_JOB_STALE_SECONDS", 300))
+        self.handlers = {}
+        self.jobs = {}  # job_id -> job dict (local status, cache lang)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # -------- setup
+
+    def register(self, kind, fn):
+        self.handlers[kind] = fn
+
+    def set_queue(self, job_queue):
+        self.queue = job_queue
+
+    def _ensure_workers(self):
+        # lazy start: huwag mag-spawn ng threads bago mag-fork ang gunicorn
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                t = threading.Thread(
+                    target=self._work, name="report-job", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+
+    # -------- API
+
+    def enqueue(self, kind, payload, job_id, owner=None, download_name=None):
+        """
+        Queue a render (or reuse a finished artifact with the same hash).
+        Returns the job dict.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._lock:
+            self._forget_finished()
+            if self.store.exists(job_id):
+                self.store.touch(job_id)
+                job = self._done_job(job_id)
+                self.jobs[job_id] = job
+                return job
+            # naka-queue / tumatakbo na (dito o sa ibang process)
+            job = self._pending_job(job_id)
+            if job is not None:
+                return job
+
+            job = {
+                "id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "owner": owner,
+                "download_name": download_name,
+                "error": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self.jobs[job_id] = job
+            self._publish(job)
+
+        self.queue.put(
+            {
+                "id": job_id,
+                "kind": kind,
+                "payload": payload,
+                "owner": owner,
+                "download_name": download_name,
+            }
+        )
+        self._ensure_workers()
+        return job
+
+    def status(self, job_id):
+        """Local status, o ang shared status / artifact (ibang process)."""
+        job = self.jobs.get(job_id)
+        if job is not None and job["status"] != "done":
+            shared = self.store.get_status(job_id)
+            if shared and shared.get("updated_at", 0) > job.get("updated_at", 0):
+                job = shared  # tumatakbo / natapos sa ibang worker
+        if job is None:
+            job = self.store.get_status(job_id)
+        if self.store.exists(job_id):
+            # natapos sa ibang process / bago mag-restart
+            job = self._done_job(job_id)
+        return job
+
+    def artifact_path(self, job_id):
+        if not self.store.exists(job_id):
+            return None
+        self.store.touch(job_id)
+        return self.store.path(job_id)
+
+    # -------- internals
+
+    def _forget_finished(self, max_age=3600):
+        # status ng tapos na jobs ay nasa artifact store na; limit memory
+        cutoff = time.time() - max_age
+        for job_id in [
+            j["id"]
+            for j in self.jobs.values()
+            if j["finished_at"] and j["finished_at"] < cutoff
+        ]:
+            self.jobs.pop(job_id, None)
+
+    def _publish(self, job):
+        """Local + shared status (para sa poll mula sa ibang worker)."""
+        job["updated_at"] = time.time()
+        try:
+            self.store.set_status(job["id"], job)
+        except OSError as e:
+            print("Error writing report job status:", job["id"], e)
+
+    def _pending_job(self, job_id):
+        """Queued / running job na hindi pa stale, o None."""
+        job = self.status(job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return None
+        if time.time() - job.get("updated_at", 0) > self.stale_seconds:
+            return None  # nawala (patay na worker / nawalang message): re-queue
+        return job
+
+    def _done_job(self, job_id):
+        meta = self.store.meta(job_id) or {}
+        return {
+            "id": job_id,
+            "kind": meta.get("kind"),
+            "status": "done",
+            "owner": meta.get("owner"),
+            "download_name": meta.get("download_name"),
+            "error": None,
+            "created_at": None,
+            "finished_at": meta.get("finished_at"),
+        }
+
+    def _work(self):
+        while True:
+            message = self.queue.get(timeout=30)
+            if message is None:
+                continue
+            job_id = message["id"]
+            if self.store.exists(job_id):
+                continue  # na-render na (duplicate message)
+
+            # ang message ang source of truth; local dict ay para sa status lang
+            job = self.jobs.get(job_id)
+            if job is None:
+                job = {
+                    "id": job_id,
+                    "kind": message["kind"],
+                    "owner": message.get("owner"),
+                    "download_name": message.get("download_name"),
+                    "error": None,
+                    "created_at": time.time(),
+                }
+                self.jobs[job_id] = job
+            job["status"] = "running"
+            job["finished_at"] = None
+            self._publish(job)
+            try:
+                data = self.handlers[message["kind"]](message["payload"])
+                self.store.save(
+                    job_id,
+                    data,
+                    {
+                        "kind": message["kind"],
+                        "owner": message.get("owner"),
+                        "download_name": message.get("download_name"),
+                        "finished_at": time.time(),
+                    },
+                )
+                job["status"] = "done"
+                job["finished_at"] = time.time()
+            except Exception as e:
+                print("Error rendering report job:", job_id, e)
+                job["status"] = "error"
+                job["error"] = str(e)
+                job["finished_at"] = time.time()
+                self._publish(job)
+
+
+def public_status(job):
+    """JSON-safe view ng job (walang payload / owner)."""
+    return {
+        "job_id": job["id"],
+        "kind": job.get("kind"),
+        "status": job["status"],
+        "error": job.get("error"),
+        "download_name": job.get("download_name"),
+    }
+
+
+jobs = JobRunner()
@@ -0,0 +1,52 @@
+"""
+Report submission (PRES -> OSAS) via isang RPC.
+
+Lahat ng steps ay nasa public.submit_financial_report (see
+supabase/migrations/0006_submit_financial_report.sql): mark Submitted,
+OSAS notification, archive summary + transactions + receipts, rollup
+reconcile at OSAS checklist -- isang DB transaction, all-or-nothing.
+
+    result = submit_report(supabase, org_id, wallet_id, org_name="...")
+    # {"archive_id": 41, "report_id": 88, "budget_id": 12, "report_no": "...",
+    #  "transactions": 23, "receipts": 4}
+
+Pagkatapos ng commit, pina-publish ang "notification" event sa OSAS SSE
+stream (see notify_broker.py). Ang desktop app ay ibang process, kaya
+aabot lang ito sa OSAS tabs kapag NOTIFY_BACKEND=redis (same Redis ng web).
+
+Test harness: supabase/tests/submit_financial_report.sql
+Gamit ng web API (pres_view) at ng desktop app.
+"""
+
+from notify_broker import OSAS_CHANNEL, broker
+
+SUBMIT_RPC = "submit_financial_report"
+
+
+class NoPendingReport(LookupError):
+    pass
+
+
+def submit_report(client, org_id, wallet_id, org_name=None):
+    """NoPendingReport kung walang Pending Review na report ang wallet."""
+    try:
+        res = client.rpc(
+            SUBMIT_RPC, {"p_org_id": org_id, "p_wallet_id": wallet_id}
+        ).execute()
+    except Exception as e:
+        if getattr(e, "code", None) == "P0002":
+            raise NoPendingReport("No pending report")
+        raise
+    result = res.data or {}
+
+    # push sa naka-open na OSAS tabs (ang notif row ay gawa na ng RPC)
+    broker.publish(
+        OSAS_CHANNEL,
+        {
+            "type": "notification",
+            "org_id": org_id,
+            "org_name": org_name,
+            "report_id": result.get("report_id"),
+        },
+    )
+    return result
@@ -0,0 +1,210 @@
+"""
+Per-request Supabase round-trip accounting.
+
+Bawat PostgREST / RPC / storage call na dumadaan sa shared httpx client
+(db.py) ay binibilang at tina-time, naka-group per table / function /
+bucket. Sa dulo ng request:
+
+  * `Server-Timing` response header, e.g.
+        sb;dur=182.4;desc="9 calls", db.financial_reports;dur=40.1;desc="2 calls"
+  * isang structured log line (JSON) per request
+  * warning kapag lumampas sa round-trip budget ng route
+
+Config (app.config / env):
+    SUPABASE_ROUNDTRIP_BUDGET   default max calls per request (default 10)
+    SUPABASE_ROUNDTRIP_BUDGETS  {"pres.preview_report_for_budget": 12, ...}
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+
+import httpx
+from flask import current_app, g, request
+
+_current = contextvars.ContextVar("supabase_roundtrips", default=None)
+
+# storage URL segments that are operations, not bucket names
+_STORAGE_OPS = {
+    "public",
+    "authenticated",
+    "sign",
+    "list",
+    "info",
+    "move",
+    "copy",
+    "upload",
+    "render",
+    "image",
+}
+
+
+class RoundTrips:
+    """Call counts + elapsed ms per key, for one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}  # key -> [count, total_ms]
+
+    def add(self, key, elapsed_ms):
+        with self._lock:
+            entry = self.calls.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    @property
+    def count(self):
+        return sum(c for c, _ in self.calls.values())
+
+    @property
+    def total_ms(self):
+        return sum(ms for _, ms in self.calls.values())
+
+    def as_dict(self):
+        return {
+            key: {"calls": c, "ms": round(ms, 1)}
+            for key, (c, ms) in sorted(self.calls.items())
+        }
+
+
+def current():
+    """RoundTrips of the running request (or None outside a request)."""
+    return _current.get()
+
+
+def classify(url):
+    """
+    /rest/v1/<table>               -> db.<table>
+    /rest/v1/rpc/<fn>              -> rpc.<fn>
+    /storage/v1/object/.../<bucket>/... -> storage.<bucket>
+    """
+    parts = [p for p in httpx.URL(str(url)).path.split("/") if p]
+    if len(parts) >= 3 and parts[0] == "rest":
+        if parts[2] == "rpc" and len(parts) >= 4:
+            return f"rpc.{parts[3]}"
+        return f"db.{parts[2]}"
+    if len(parts) >= 3 and parts[0] == "storage":
+        for seg in parts[3:]:
+            if seg not in _STORAGE_OPS:
+                return f"storage.{seg}"
+        return "storage"
+    if parts and parts[0] == "auth":
+        return "auth"
+    return "other"
+
+
+class _TimedStream(httpx.SyncByteStream):
+    """Stops the timer when the response body has been fully read/closed."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+def track(request, response, started):
+    """Called by the transport once per logical call (retries included)."""
+    rt = _current.get()
+    if rt is None:
+        return response
+    key = classify(request.url)
+
+    def done():
+        rt.add(key, (time.perf_counter() - started) * 1000.0)
+
+    response.stream = _TimedStream(response.stream, done)
+    return response
+
+
+def track_error(request, started):
+    rt = _current.get()
+    if rt is not None:
+        rt.add(classify(request.url), (time.perf_counter() - started) * 1000.0)
+
+
+# -----------------------
+# Flask integration
+# -----------------------
+
+
+def _server_timing(rt):
+    items = [f'sb;dur={rt.total_ms:.1f};desc="{rt.count} calls"']
+    for key, (count, ms) in sorted(rt.calls.items()):
+        items.append(f'{key};dur={ms:.1f};desc="{count} calls"')
+    return ", ".join(items)
+
+
+def _budget_for(endpoint):
+    budgets = current_app.config.get("SUPABASE_ROUNDTRIP_BUDGETS") or {}
+    if endpoint in budgets:
+        return budgets[endpoint]
+    return current_app.config.get("SUPABASE_ROUNDTRIP_BUDGET")
+
+
+def init_app(app):
+    app.config.setdefault(
+        "SUPABASE_ROUNDTRIP_BUDGET", int(os.getenv("SUPABASE_ROUNDTRIP_BUDGET", 10))
+    )
+    app.config.setdefault("SUPABASE_ROUNDTRIP_BUDGETS", {})
+
+    @app.before_request
+    def _start_roundtrips():
+        rt = RoundTrips()
+        g._sb_roundtrips = rt
+        g._sb_roundtrips_token = _current.set(rt)
+
+    @app.after_request
+    def _report_roundtrips(response):
+        rt = g.get("_sb_roundtrips")
+        if rt is None or not rt.count:
+            return response
+
+        response.headers.add("Server-Timing", _server_timing(rt))
+
+        endpoint = request.endpoint or request.path
+        current_app.logger.info(
+            "supabase_roundtrips %s",
+            json.dumps(
+                {
+                    "endpoint": endpoint,
+                    "method": request.method,
+                    "status": response.status_code,
+                    "calls": rt.count,
+                    "ms": round(rt.total_ms, 1),
+                    "by_target": rt.as_dict(),
+                }
+            ),
+        )
+
+        budget = _budget_for(endpoint)
+        if budget is not None and rt.count > budget:
+            current_app.logger.warning(
+                "Route %s made %d Supabase round trips (budget %d): %s",
+                endpoint,
+                rt.count,
+                budget,
+                ", ".join(f"{k} x{c}" for k, (c, _) in sorted(rt.calls.items())),
+            )
+        return response
+
+    @app.teardown_request
+    def _stop_roundtrips(exc=None):
+        token = g.pop("_sb_roundtrips_token", None)
+        if token is not None:
+            try:
+                _current.reset(token)
+            except ValueError:
+                # teardown ran in a different context (streamed response)
+                _current.set(None)
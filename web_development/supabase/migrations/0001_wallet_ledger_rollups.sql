@@ -0,0 +1,224 @@
+-- Ledger rollups for the PRES dashboard / wallets overview.
+-- Isang row per (wallet, folder, year, month, kind) para hindi na
+-- i-scan ang buong wallet_transactions sa bawat page load.
+-- Maintained ng statement-level triggers sa wallet_transactions (same
+-- transaction ng insert / update / delete), kaya walang hiwalay na RPC
+-- ang app at hindi nagkakamali ang totals kapag pumalya ang isang call.
+
+create table if not exists public.wallet_ledger_rollups (
+    wallet_id     bigint      not null,
+    budget_id     bigint      not null,
+    year          smallint    not null,
+    month         smallint    not null,
+    kind          text        not null check (kind in ('income', 'expense')),
+    total         numeric(14, 2) not null default 0,
+    tx_count      integer     not null default 0,
+    last_activity date,
+    updated_at    timestamptz not null default now(),
+    primary key (wallet_id, budget_id, year, month, kind)
+);
+
+create index if not exists wallet_ledger_rollups_budget_idx
+    on public.wallet_ledger_rollups (budget_id);
+
+
+-- Apply signed deltas: [{wallet_id, budget_id, year, month, kind,
+-- total, tx_count, last_activity}, ...]. Rows na umabot sa 0 na
+-- transactions ay binubura.
+create or replace function public.bump_wallet_ledger_rollups(p_deltas jsonb)
+returns void
+language plpgsql
+as $$
+begin
+    insert into public.wallet_ledger_rollups as r
+        (wallet_id, budget_id, year, month, kind, total, tx_count, last_activity)
+    select d.wallet_id, d.budget_id, d.year, d.month, d.kind,
+           sum(d.total), sum(d.tx_count), max(d.last_activity)
+    from jsonb_to_recordset(p_deltas) as d(
+        wallet_id bigint, budget_id bigint, year smallint, month smallint,
+        kind text, total numeric, tx_count integer, last_activity date
+    )
+    group by d.wallet_id, d.budget_id, d.year, d.month, d.kind
+    on conflict (wallet_id, budget_id, year, month, kind) do update
+        set total         = r.total + excluded.total,
+            tx_count      = r.tx_count + excluded.tx_count,
+            last_activity = greatest(r.last_activity, excluded.last_activity),
+            updated_at    = now();
+
+    delete from public.wallet_ledger_rollups r
+    using jsonb_to_recordset(p_deltas) as d(
+        wallet_id bigint, budget_id bigint, year smallint, month smallint, kind text
+    )
+    where r.wallet_id = d.wallet_id
+      and r.budget_id = d.budget_id
+      and r.year = d.year
+      and r.month = d.month
+      and r.kind = d.kind
+      and r.tx_count <= 0;
+end;
+$$;
+
+
+-- Recompute rollups from raw wallet_transactions rows.
+-- p_budget_ids = null -> lahat ng folders.
+create or replace function public.rebuild_wallet_ledger_rollups(
+    p_budget_ids bigint[] default null
+)
+returns integer
+language plpgsql
+as $$
+declare
+    v_rows integer;
+begin
+    delete from public.wallet_ledger_rollups
+    where p_budget_ids is null or budget_id = any (p_budget_ids);
+
+    insert into public.wallet_ledger_rollups
+        (wallet_id, budget_id, year, month, kind, total, tx_count, last_activity)
+    select t.wallet_id,
+           t.budget_id,
+           extract(year from t.date_issued)::smallint,
+           extract(month from t.date_issued)::smallint,
+           t.kind,
+           sum(coalesce(t.quantity, 0) * coalesce(t.price, 0)),
+           count(*),
+           max(t.date_issued::date)
+    from public.wallet_transactions t
+    where t.date_issued is not null
+      and t.budget_id is not null
+      and t.kind in ('income', 'expense')
+      and (p_budget_ids is null or t.budget_id = any (p_budget_ids))
+    group by 1, 2, 3, 4, 5;
+
+    get diagnostics v_rows = row_count;
+    return v_rows;
+end;
+$$;
+
+
+-- Compare stored rollups against raw rows; returns only mismatches.
+create or replace function public.verify_wallet_ledger_rollups(
+    p_budget_ids bigint[] default null
+)
+returns table (
+    wallet_id bigint,
+    budget_id bigint,
+    year smallint,
+    month smallint,
+    kind text,
+    expected_total numeric,
+    stored_total numeric,
+    expected_count bigint,
+    stored_count integer
+)
+language sql
+stable
+as $$
+    with expected as (
+        select t.wallet_id,
+               t.budget_id,
+               extract(year from t.date_issued)::smallint as year,
+               extract(month from t.date_issued)::smallint as month,
+               t.kind,
+               sum(coalesce(t.quantity, 0) * coalesce(t.price, 0)) as total,
+               count(*) as tx_count
+        from public.wallet_transactions t
+        where t.date_issued is not null
+          and t.budget_id is not null
+          and t.kind in ('income', 'expense')
+          and (p_budget_ids is null or t.budget_id = any (p_budget_ids))
+        group by 1, 2, 3, 4, 5
+    ),
+    stored as (
+        select r.*
+        from public.wallet_ledger_rollups r
+        where p_budget_ids is null or r.budget_id = any (p_budget_ids)
+    )
+    select coalesce(e.wallet_id, s.wallet_id),
+           coalesce(e.budget_id, s.budget_id),
+           coalesce(e.year, s.year),
+           coalesce(e.month, s.month),
+           coalesce(e.kind, s.kind),
+           coalesce(e.total, 0),
+           coalesce(s.total, 0),
+           coalesce(e.tx_count, 0),
+           coalesce(s.tx_count, 0)
+    from expected e
+    full outer join stored s
+      on s.wallet_id = e.wallet_id
+     and s.budget_id = e.budget_id
+     and s.year = e.year
+     and s.month = e.month
+     and s.kind = e.kind
+    where coalesce(e.total, 0) <> coalesce(s.total, 0)
+       or coalesce(e.tx_count, 0) <> coalesce(s.tx_count, 0);
+$$;
+
+
+-- wallet_transactions writes -> rollup deltas (isang bump per statement)
+create or replace function public.wallet_ledger_rollups_trg()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_rows jsonb := '[]'::jsonb;
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        v_rows := v_rows || (
+            select coalesce(jsonb_agg(to_jsonb(n) || '{"sign": 1}'), '[]'::jsonb)
+            from new_rows n
+        );
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        v_rows := v_rows || (
+            select coalesce(jsonb_agg(to_jsonb(o) || '{"sign": -1}'), '[]'::jsonb)
+            from old_rows o
+        );
+    end if;
+
+    perform public.bump_wallet_ledger_rollups(coalesce((
+        select jsonb_agg(d)
+        from (
+            select t.wallet_id,
+                   t.budget_id,
+                   extract(year from t.date_issued)::smallint as year,
+                   extract(month from t.date_issued)::smallint as month,
+                   t.kind,
+                   sum(t.sign * coalesce(t.quantity, 0) * coalesce(t.price, 0)) as total,
+                   sum(t.sign)::integer as tx_count,
+                   max(t.date_issued::date) filter (where t.sign > 0) as last_activity
+            from jsonb_to_recordset(v_rows) as t(
+                wallet_id bigint, budget_id bigint, date_issued timestamptz,
+                kind text, quantity numeric, price numeric, sign integer
+            )
+            where t.date_issued is not null
+              and t.budget_id is not null
+              and t.kind in ('income', 'expense')
+            group by 1, 2, 3, 4, 5
+        ) d
+    ), '[]'::jsonb));
+    return null;
+end;
+$$;
+
+drop trigger if exists wallet_transactions_rollups_ins on public.wallet_transactions;
+create trigger wallet_transactions_rollups_ins
+    after insert on public.wallet_transactions
+    referencing new table as new_rows
+    for each statement execute function public.wallet_ledger_rollups_trg();
+
+drop trigger if exists wallet_transactions_rollups_upd on public.wallet_transactions;
+create trigger wallet_transactions_rollups_upd
+    after update on public.wallet_transactions
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.wallet_ledger_rollups_trg();
+
+drop trigger if exists wallet_transactions_rollups_del on public.wallet_transactions;
+create trigger wallet_transactions_rollups_del
+    after delete on public.wallet_transactions
+    referencing old table as old_rows
+    for each statement execute function public.wallet_ledger_rollups_trg();
+
+
+-- Backfill
+select public.rebuild_wallet_ledger_rollups();
@@ -0,0 +1,12 @@
+-- Receipt renditions (see receipt_renditions.py).
+-- thumb_url: maliit na thumbnail para sa lists
+-- print_url: print-resolution JPEG para sa DOCX / print_report.html
+-- Null sa lumang rows -> fallback sa file_url.
+
+alter table public.wallet_receipts
+    add column if not exists thumb_url text,
+    add column if not exists print_url text;
+
+alter table public.financial_report_archive_receipts
+    add column if not exists thumb_url text,
+    add column if not exists print_url text;
@@ -0,0 +1,212 @@
+-- Version stamps para sa ETag / conditional GET (see view_versions.py).
+-- Isang counter per org at per folder (wallet_budgets.id), binu-bump ng
+-- triggers tuwing may sumusulat sa ledger tables -- kasama ang direct
+-- writes ng desktop app -- kaya isang maliit na read lang para malaman
+-- kung nagbago ang isang view.
+
+create table if not exists public.view_versions (
+    scope      text        not null check (scope in ('org', 'folder')),
+    scope_id   bigint      not null,
+    version    bigint      not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (scope, scope_id)
+);
+
+
+create or replace function public.bump_view_versions(
+    p_folder_ids bigint[],
+    p_org_ids bigint[]
+)
+returns void
+language sql
+as $$
+    insert into public.view_versions as v (scope, scope_id, version)
+    select s.scope, s.scope_id, 1
+    from (
+        select 'folder' as scope, unnest(coalesce(p_folder_ids, '{}')) as scope_id
+        union
+        select 'org', unnest(coalesce(p_org_ids, '{}'))
+    ) s
+    where s.scope_id is not null
+    on conflict (scope, scope_id) do update
+        set version    = v.version + 1,
+            updated_at = now();
+$$;
+
+
+-- wallet_transactions / wallet_receipts / financial_reports:
+-- rows have (wallet_id, budget_id)
+create or replace function public.view_versions_folder_rows_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.bump_view_versions(
+            array(select distinct n.budget_id from new_rows n),
+            array(
+                select distinct w.organization_id
+                from new_rows n
+                join public.wallets w on w.id = n.wallet_id
+            )
+        );
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.bump_view_versions(
+            array(select distinct o.budget_id from old_rows o),
+            array(
+                select distinct w.organization_id
+                from old_rows o
+                join public.wallets w on w.id = o.wallet_id
+            )
+        );
+    end if;
+    return null;
+end;
+$$;
+
+
+-- wallet_budgets: the row itself is the folder
+create or replace function public.view_versions_budget_rows_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.bump_view_versions(
+            array(select distinct n.id from new_rows n),
+            array(
+                select distinct w.organization_id
+                from new_rows n
+                join public.wallets w on w.id = n.wallet_id
+            )
+        );
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.bump_view_versions(
+            array(select distinct o.id from old_rows o),
+            array(
+                select distinct w.organization_id
+                from old_rows o
+                join public.wallets w on w.id = o.wallet_id
+            )
+        );
+    end if;
+    return null;
+end;
+$$;
+
+
+-- wallets: org-level lang (names sa overview / dashboard)
+create or replace function public.view_versions_wallet_rows_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.bump_view_versions(
+            null, array(select distinct n.organization_id from new_rows n)
+        );
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.bump_view_versions(
+            null, array(select distinct o.organization_id from old_rows o)
+        );
+    end if;
+    return null;
+end;
+$$;
+
+
+-- Transition tables: isang trigger per event (statement level, para
+-- isang bump lang kahit bulk insert).
+do $$
+declare
+    t record;
+begin
+    for t in
+        select * from (values
+            ('wallet_transactions', 'view_versions_folder_rows_trg'),
+            ('wallet_receipts',     'view_versions_folder_rows_trg'),
+            ('financial_reports',   'view_versions_folder_rows_trg'),
+            ('wallet_budgets',      'view_versions_budget_rows_trg'),
+            ('wallets',             'view_versions_wallet_rows_trg')
+        ) as x(tbl, fn)
+    loop
+        execute format('drop trigger if exists %I on public.%I',
+                       t.tbl || '_vv_ins', t.tbl);
+        execute format('drop trigger if exists %I on public.%I',
+                       t.tbl || '_vv_upd', t.tbl);
+        execute format('drop trigger if exists %I on public.%I',
+                       t.tbl || '_vv_del', t.tbl);
+
+        execute format(
+            'create trigger %I after insert on public.%I '
+            'referencing new table as new_rows '
+            'for each statement execute function public.%I()',
+            t.tbl || '_vv_ins', t.tbl, t.fn);
+        execute format(
+            'create trigger %I after update on public.%I '
+            'referencing old table as old_rows new table as new_rows '
+            'for each statement execute function public.%I()',
+            t.tbl || '_vv_upd', t.tbl, t.fn);
+        execute format(
+            'create trigger %I after delete on public.%I '
+            'referencing old table as old_rows '
+            'for each statement execute function public.%I()',
+            t.tbl || '_vv_del', t.tbl, t.fn);
+    end loop;
+end;
+$$;
+
+
+-- Org name / college sa report header: bump lang kapag nagbago ang mga ito
+-- (hindi sa bawat login / reset code update). Pati lahat ng folders ng org,
+-- para sapat na ang folder stamp sa report preview.
+create or replace function public.bump_org_view_versions(p_org_ids bigint[])
+returns void
+language sql
+as $$
+    select public.bump_view_versions(
+        array(
+            select b.id
+            from public.wallet_budgets b
+            join public.wallets w on w.id = b.wallet_id
+            where w.organization_id = any (p_org_ids)
+        ),
+        p_org_ids
+    );
+$$;
+
+create or replace function public.view_versions_org_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.bump_org_view_versions(array[new.id]);
+    return null;
+end;
+$$;
+
+drop trigger if exists organizations_vv_upd on public.organizations;
+create trigger organizations_vv_upd
+    after update of org_name, department_id on public.organizations
+    for each row execute function public.view_versions_org_trg();
+
+create or replace function public.view_versions_dept_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.bump_org_view_versions(
+        array(select o.id from public.organizations o
+              where o.department_id = new.id)
+    );
+    return null;
+end;
+$$;
+
+drop trigger if exists departments_vv_upd on public.departments;
+create trigger departments_vv_upd
+    after update of dept_name on public.departments
+    for each row execute function public.view_versions_dept_trg();
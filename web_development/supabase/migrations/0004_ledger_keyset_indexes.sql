@@ -0,0 +1,11 @@
+-- Keyset pagination ng ledger (see ledger_pages.py).
+-- Order ay (date_issued, id), kaya ang date range / "after" cursor ay
+-- index range scan lang imbes na buong wallet_transactions.
+
+-- per folder: GET /pres/api/wallets/<folder_id>/transactions
+create index if not exists wallet_transactions_budget_date_idx
+    on public.wallet_transactions (budget_id, date_issued, id);
+
+-- per org (wallet_id in ...): History views
+create index if not exists wallet_transactions_wallet_date_idx
+    on public.wallet_transactions (wallet_id, date_issued, id);
@@ -0,0 +1,102 @@
+-- Batch create / update / delete ng wallet_transactions (see ledger_batch.py).
+-- Isang RPC, isang transaction: kapag may isang op na pumalya, walang
+-- maiiwang kalahating batch. Ang rollups ay inaayos ng triggers sa
+-- wallet_transactions (0001); ang bagong folder totals ay kasama sa resulta.
+
+-- p_ops: [{"op": "create", "data": {...}},
+--         {"op": "update", "id": 12, "data": {...}},
+--         {"op": "delete", "id": 13}, ...]
+-- Returns {"results": [{"op", "id", "row"}, ...],
+--          "totals": {"income", "expense", "count"}}
+create or replace function public.apply_wallet_transaction_batch(
+    p_wallet_id bigint,
+    p_budget_id bigint,
+    p_ops jsonb
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_op      jsonb;
+    v_data    jsonb;
+    v_id      bigint;
+    v_row     public.wallet_transactions;
+    v_old     public.wallet_transactions;
+    v_results jsonb := '[]'::jsonb;
+    v_totals  jsonb;
+begin
+    for v_op in select value from jsonb_array_elements(coalesce(p_ops, '[]'::jsonb))
+    loop
+        v_data := coalesce(v_op -> 'data', '{}'::jsonb)
+                  || jsonb_build_object('wallet_id', p_wallet_id,
+                                        'budget_id', p_budget_id);
+
+        if v_op ->> 'op' = 'create' then
+            insert into public.wallet_transactions
+                (wallet_id, budget_id, kind, date_issued, quantity, price,
+                 income_type, particulars, description)
+            select r.wallet_id, r.budget_id, r.kind, r.date_issued, r.quantity,
+                   r.price, r.income_type, r.particulars, r.description
+            from jsonb_populate_record(null::public.wallet_transactions, v_data) r
+            returning * into v_row;
+
+            v_results := v_results || jsonb_build_array(jsonb_build_object(
+                'op', 'create', 'id', v_row.id, 'row', to_jsonb(v_row)));
+
+        elsif v_op ->> 'op' in ('update', 'delete') then
+            v_id := (v_op ->> 'id')::bigint;
+            select * into v_old
+            from public.wallet_transactions
+            where id = v_id
+              and wallet_id = p_wallet_id
+              and budget_id = p_budget_id
+            for update;
+            if not found then
+                raise exception 'Transaction % not found in this folder', v_id
+                    using errcode = 'P0002';
+            end if;
+
+            if v_op ->> 'op' = 'update' then
+                update public.wallet_transactions t
+                set kind        = r.kind,
+                    date_issued = r.date_issued,
+                    quantity    = r.quantity,
+                    price       = r.price,
+                    income_type = r.income_type,
+                    particulars = r.particulars,
+                    description = r.description
+                from jsonb_populate_record(null::public.wallet_transactions, v_data) r
+                where t.id = v_id
+                returning t.* into v_row;
+
+                v_results := v_results || jsonb_build_array(jsonb_build_object(
+                    'op', 'update', 'id', v_id, 'row', to_jsonb(v_row)));
+            else
+                delete from public.wallet_transactions where id = v_id;
+
+                v_results := v_results || jsonb_build_array(jsonb_build_object(
+                    'op', 'delete', 'id', v_id, 'row', null));
+            end if;
+
+        else
+            raise exception 'Unknown op: %', coalesce(v_op ->> 'op', '(none)')
+                using errcode = '22023';
+        end if;
+    end loop;
+
+    select jsonb_build_object(
+        'income',  coalesce(sum(total) filter (where kind = 'income'), 0),
+        'expense', coalesce(sum(total) filter (where kind = 'expense'), 0),
+        'count',   coalesce(sum(tx_count), 0)
+    )
+    into v_totals
+    from public.wallet_ledger_rollups
+    where budget_id = p_budget_id;
+
+    return jsonb_build_object('results', v_results, 'totals', v_totals);
+end;
+$$;
+
+
+-- ginagawa na ng wallet_transactions triggers (0001)
+drop function if exists public.ledger_rollup_delta(public.wallet_transactions, integer);
@@ -0,0 +1,153 @@
+-- Report submission as one server-side function (see submitreportwalletid).
+-- Dati ~10 network round trips (status update, notif, archive summary,
+-- archive transactions / receipts, OSAS checklist); ngayon isang RPC at
+-- isang transaction, kaya walang kalahating archive kapag may pumalya.
+--
+-- Test harness: supabase/tests/submit_financial_report.sql
+
+create or replace function public.submit_financial_report(
+    p_org_id bigint,
+    p_wallet_id bigint
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_rep         public.financial_reports;
+    v_archive_id  bigint;
+    v_remaining   numeric;
+    v_month_key   text;
+    v_label       text;
+    v_tx_count    integer := 0;
+    v_rc_count    integer := 0;
+    v_master      public.financial_reports;
+    v_checklist   jsonb;
+    v_received    integer;
+    v_months      text[] := array[
+        'august', 'september', 'october', 'november', 'december',
+        'january', 'february', 'march', 'april', 'may'
+    ];
+begin
+    -- 1) latest pending report (locked: sabay na submit -> isa lang ang papasa)
+    select * into v_rep
+    from public.financial_reports
+    where organization_id = p_org_id
+      and wallet_id = p_wallet_id
+      and status = 'Pending Review'
+    order by created_at desc
+    limit 1
+    for update;
+    if not found then
+        raise exception 'No pending report' using errcode = 'P0002';
+    end if;
+
+    -- 2) mark as submitted
+    update public.financial_reports
+    set status = 'Submitted',
+        submission_date = (now() at time zone 'utc')::date,
+        updated_at = now()
+    where id = v_rep.id;
+
+    -- 3) OSAS notification (huwag pabagsakin ang submit kung mag-fail)
+    begin
+        v_label := case
+            when coalesce(v_rep.report_month, '') = '' then null
+            else initcap(v_rep.report_month)
+        end;
+        insert into public.osas_notifications (org_id, report_id, org_name, message)
+        select p_org_id,
+               v_rep.id,
+               coalesce((select org_name from public.organizations where id = p_org_id),
+                        'Organization'),
+               case when v_label is null then 'has a report "Pending Review"'
+                    else format('has a report "Pending Review for %s"', v_label)
+               end;
+    exception when others then
+        raise warning 'submit_financial_report: notification failed: %', sqlerrm;
+    end;
+
+    -- 4) archive summary + snapshot ng transactions / receipts
+    v_remaining := coalesce(v_rep.budget, 0) - coalesce(v_rep.total_expense, 0)
+                 - coalesce(v_rep.reimbursement, 0) + coalesce(v_rep.previous_fund, 0);
+
+    insert into public.financial_report_archives
+        (organization_id, wallet_id, budget_id, report_id, report_no, event_name,
+         date_prepared, budget, total_expense, reimbursement, previous_fund,
+         remaining, file_url)
+    values
+        (p_org_id, p_wallet_id, v_rep.budget_id, v_rep.id, v_rep.report_no,
+         v_rep.event_name, v_rep.date_prepared, coalesce(v_rep.budget, 0),
+         coalesce(v_rep.total_expense, 0), coalesce(v_rep.reimbursement, 0),
+         coalesce(v_rep.previous_fund, 0), v_remaining, null)
+    returning id into v_archive_id;
+
+    insert into public.financial_report_archive_transactions
+        (archive_id, date_issued, quantity, particulars, description, price, kind)
+    select v_archive_id, t.date_issued, t.quantity, t.particulars, t.description,
+           t.price, t.kind
+    from public.wallet_transactions t
+    where t.wallet_id = p_wallet_id
+      and t.budget_id = v_rep.budget_id;
+    get diagnostics v_tx_count = row_count;
+
+    insert into public.financial_report_archive_receipts
+        (archive_id, description, receipt_date, file_url, thumb_url, print_url)
+    select v_archive_id, r.description, r.receipt_date, r.file_url, r.thumb_url,
+           r.print_url
+    from public.wallet_receipts r
+    where r.wallet_id = p_wallet_id
+      and r.budget_id = v_rep.budget_id;
+    get diagnostics v_rc_count = row_count;
+
+    -- 5) month is closed: reconcile this folder's rollups with the raw rows
+    begin
+        perform public.rebuild_wallet_ledger_rollups(array[v_rep.budget_id]);
+    exception when others then
+        raise warning 'submit_financial_report: rollup rebuild failed: %', sqlerrm;
+    end;
+
+    -- 6) OSAS master row (wallet/budget null): checklist + status
+    select lower(m.month_name) into v_month_key
+    from public.wallet_budgets b
+    join public.months m on m.id = b.month_id
+    where b.id = v_rep.budget_id;
+
+    select * into v_master
+    from public.financial_reports
+    where organization_id = p_org_id
+      and wallet_id is null
+      and budget_id is null
+    limit 1
+    for update;
+
+    if found and v_month_key is not null then
+        v_checklist := coalesce(v_master.checklist, '{}'::jsonb);
+        if v_month_key = any (v_months) then
+            v_checklist := v_checklist || jsonb_build_object(v_month_key, true);
+        end if;
+        select count(*) into v_received
+        from unnest(v_months) k
+        where coalesce(v_checklist -> k, 'false'::jsonb)
+              not in ('false'::jsonb, 'null'::jsonb, '0'::jsonb, '""'::jsonb);
+
+        update public.financial_reports
+        set checklist = v_checklist,
+            status = case
+                when v_received = 0 then 'Pending Review'
+                when v_received < array_length(v_months, 1) then 'In Review'
+                else 'Completed'
+            end,
+            updated_at = now()
+        where id = v_master.id;
+    end if;
+
+    return jsonb_build_object(
+        'archive_id', v_archive_id,
+        'report_id', v_rep.id,
+        'budget_id', v_rep.budget_id,
+        'report_no', v_rep.report_no,
+        'transactions', v_tx_count,
+        'receipts', v_rc_count
+    );
+end;
+$$;
@@ -0,0 +1,198 @@
+-- Per-admin unread counters + read state para sa OSAS notifications
+-- (see osas_notifications.py).
+--
+-- osas_notification_state: isang row per admin (unread_count = bell badge,
+--   read_before = "lahat ng mas luma dito ay read").
+-- osas_notification_reads: individually read items na mas bago sa
+--   read_before.
+-- Ang insert trigger ang nagma-maintain ng unread_count, kaya ang bell
+-- ay isang single-row read lang.
+
+create table if not exists public.osas_notification_state (
+    admin_id     bigint primary key references public.osas_admin (id) on delete cascade,
+    unread_count integer not null default 0,
+    read_before  timestamptz,
+    updated_at   timestamptz not null default now()
+);
+
+create table if not exists public.osas_notification_reads (
+    admin_id        bigint not null references public.osas_admin (id) on delete cascade,
+    notification_id bigint not null references public.osas_notifications (id) on delete cascade,
+    read_at         timestamptz not null default now(),
+    primary key (admin_id, notification_id)
+);
+
+-- feed keyset: (created_at, id) newest first
+create index if not exists osas_notifications_feed_idx
+    on public.osas_notifications (created_at desc, id desc);
+
+
+-- Recompute one admin's counter from the read state (creates the row).
+create or replace function public.refresh_osas_unread(p_admin_id bigint)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+begin
+    insert into public.osas_notification_state (admin_id)
+    values (p_admin_id)
+    on conflict (admin_id) do nothing;
+
+    update public.osas_notification_state s
+    set unread_count = (
+            select count(*)
+            from public.osas_notifications n
+            where (s.read_before is null or n.created_at > s.read_before)
+              and not exists (
+                  select 1 from public.osas_notification_reads r
+                  where r.admin_id = s.admin_id and r.notification_id = n.id
+              )
+        ),
+        updated_at = now()
+    where s.admin_id = p_admin_id
+    returning unread_count into v_count;
+
+    return v_count;
+end;
+$$;
+
+
+-- Bulk mark-read: p_ids (list) at/o p_before (lahat ng created_at <= p_before).
+-- Returns the admin's new unread count.
+create or replace function public.mark_osas_notifications_read(
+    p_admin_id bigint,
+    p_ids bigint[] default null,
+    p_before timestamptz default null
+)
+returns integer
+language plpgsql
+as $$
+begin
+    insert into public.osas_notification_state (admin_id)
+    values (p_admin_id)
+    on conflict (admin_id) do nothing;
+
+    if p_before is not null then
+        update public.osas_notification_state
+        set read_before = greatest(coalesce(read_before, p_before), p_before)
+        where admin_id = p_admin_id;
+
+        -- sakop na ng watermark
+        delete from public.osas_notification_reads r
+        using public.osas_notifications n
+        where r.admin_id = p_admin_id
+          and n.id = r.notification_id
+          and n.created_at <= p_before;
+    end if;
+
+    if p_ids is not null and cardinality(p_ids) > 0 then
+        insert into public.osas_notification_reads (admin_id, notification_id)
+        select p_admin_id, n.id
+        from public.osas_notifications n
+        join public.osas_notification_state s on s.admin_id = p_admin_id
+        where n.id = any (p_ids)
+          and (s.read_before is null or n.created_at > s.read_before)
+        on conflict do nothing;
+    end if;
+
+    return public.refresh_osas_unread(p_admin_id);
+end;
+$$;
+
+
+-- One page ng feed + unread count (isang round trip).
+-- unread_count = null kapag wala pang state row ang admin.
+create or replace function public.osas_notification_feed(
+    p_admin_id bigint,
+    p_limit integer default 20,
+    p_before_at timestamptz default null,
+    p_before_id bigint default null
+)
+returns jsonb
+language sql
+stable
+as $$
+    with st as (
+        select read_before, unread_count
+        from public.osas_notification_state
+        where admin_id = p_admin_id
+    ),
+    page as (
+        select n.id, n.org_id, n.report_id, n.org_name, n.message, n.created_at,
+               (
+                   coalesce(n.created_at <= (select read_before from st), false)
+                   or exists (
+                       select 1 from public.osas_notification_reads r
+                       where r.admin_id = p_admin_id and r.notification_id = n.id
+                   )
+               ) as is_read
+        from public.osas_notifications n
+        where p_before_at is null
+           or (n.created_at, n.id) < (p_before_at, coalesce(p_before_id, 0))
+        order by n.created_at desc, n.id desc
+        limit greatest(p_limit, 1) + 1
+    )
+    select jsonb_build_object(
+        'items', coalesce(
+            (select jsonb_agg(to_jsonb(p) order by p.created_at desc, p.id desc) from page p),
+            '[]'::jsonb
+        ),
+        'unread_count', (select unread_count from st)
+    );
+$$;
+
+
+-- Counter maintenance
+create or replace function public.osas_notifications_unread_ins_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    update public.osas_notification_state s
+    set unread_count = s.unread_count + (
+            select count(*) from inserted i
+            where s.read_before is null or i.created_at > s.read_before
+        ),
+        updated_at = now();
+    return null;
+end;
+$$;
+
+create or replace function public.osas_notifications_unread_del_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    -- bihira: recompute lahat
+    perform public.refresh_osas_unread(admin_id)
+    from public.osas_notification_state;
+    return null;
+end;
+$$;
+
+drop trigger if exists osas_notifications_unread_ins on public.osas_notifications;
+create trigger osas_notifications_unread_ins
+    after insert on public.osas_notifications
+    referencing new table as inserted
+    for each statement execute function public.osas_notifications_unread_ins_trg();
+
+drop trigger if exists osas_notifications_unread_del on public.osas_notifications;
+create trigger osas_notifications_unread_del
+    after delete on public.osas_notifications
+    for each statement execute function public.osas_notifications_unread_del_trg();
+
+
+-- Backfill: kasalukuyang global is_read -> read state ng bawat admin
+insert into public.osas_notification_state (admin_id)
+select id from public.osas_admin
+on conflict (admin_id) do nothing;
+
+insert into public.osas_notification_reads (admin_id, notification_id)
+select a.id, n.id
+from public.osas_admin a
+cross join public.osas_notifications n
+where n.is_read
+on conflict do nothing;
+
+select public.refresh_osas_unread(admin_id) from public.osas_notification_state;
@@ -0,0 +1,39 @@
+-- OSAS organization listing (see org_listing.py).
+--
+-- osas_organization_list: projected columns lang (walang password hash),
+--   kasama na ang dept_name, kaya hindi na kailangang i-fetch ang buong
+--   departments table per request.
+-- Keyset order ay (sort column, id) within a status; search ay ilike
+--   (prefix o substring) sa org_name / username, backed by trigram indexes.
+
+create extension if not exists pg_trgm;
+
+create or replace view public.osas_organization_list
+with (security_invoker = true)
+as
+select o.id,
+       o.org_name,
+       o.username,
+       o.department_id,
+       d.dept_name,
+       o.accreditation_date,
+       o.status,
+       o.created_by
+from public.organizations o
+left join public.departments d on d.id = o.department_id;
+
+-- keyset per status (+ department filter)
+create index if not exists organizations_status_name_idx
+    on public.organizations (status, org_name, id);
+create index if not exists organizations_status_username_idx
+    on public.organizations (status, username, id);
+create index if not exists organizations_status_id_idx
+    on public.organizations (status, id);
+create index if not exists organizations_dept_status_name_idx
+    on public.organizations (department_id, status, org_name, id);
+
+-- search: org_name / username ilike '%term%'
+create index if not exists organizations_org_name_trgm_idx
+    on public.organizations using gin (org_name gin_trgm_ops);
+create index if not exists organizations_username_trgm_idx
+    on public.organizations using gin (username gin_trgm_ops);
@@ -0,0 +1,177 @@
+-- Precomputed OSAS compliance matrix: org x academic month (see compliance.py).
+--
+-- osas_compliance: isang row per org, months = {"august": "received", ...}
+--   received  = naka-check sa OSAS master checklist
+--   submitted = may naka-Submit na PRES financial_reports row para sa buwan
+--               (status Submitted / Approved, gaya ng PRES; hindi ang Pending Review),
+--               hindi pa received
+--   missing   = wala pa
+-- Maintained ng triggers sa financial_reports (OSAS master row updates,
+-- PRES rows, submit_financial_report) at organizations insert, kaya ang
+-- buong grid ay isang read lang ng osas_compliance_matrix view.
+
+create table if not exists public.osas_compliance (
+    organization_id  bigint primary key references public.organizations (id) on delete cascade,
+    report_id        bigint,                      -- OSAS master row
+    status           text,                        -- status ng master row
+    months           jsonb  not null default '{}'::jsonb,
+    submitted_months text[] not null default '{}',
+    received         integer not null default 0,
+    submitted        integer not null default 0,
+    missing          integer not null default 0,
+    updated_at       timestamptz not null default now()
+);
+
+
+create or replace function public.osas_compliance_months()
+returns text[]
+language sql
+immutable
+as $$
+    select array['august', 'september', 'october', 'november', 'december',
+                 'january', 'february', 'march', 'april', 'may'];
+$$;
+
+
+-- Recompute the given orgs' rows (upsert).
+create or replace function public.refresh_osas_compliance(p_org_ids bigint[])
+returns void
+language sql
+as $$
+    insert into public.osas_compliance as c (
+        organization_id, report_id, status, months, submitted_months,
+        received, submitted, missing, updated_at
+    )
+    select o.id, m.id, m.status, g.months, p.months,
+           g.received, g.submitted, g.missing, now()
+    from public.organizations o
+    left join lateral (
+        select fr.id, fr.status, coalesce(fr.checklist, '{}'::jsonb) as checklist
+        from public.financial_reports fr
+        where fr.organization_id = o.id
+          and fr.wallet_id is null
+          and fr.budget_id is null
+        order by fr.id
+        limit 1
+    ) m on true
+    cross join lateral (
+        select coalesce(array_agg(distinct lower(fr.report_month)), '{}') as months
+        from public.financial_reports fr
+        where fr.organization_id = o.id
+          and fr.wallet_id is not null
+          and fr.budget_id is not null
+          and fr.report_month is not null
+          and fr.status in ('Submitted', 'Approved')
+    ) p
+    cross join lateral (
+        select jsonb_object_agg(s.key, s.state) as months,
+               count(*) filter (where s.state = 'received')::int as received,
+               count(*) filter (where s.state = 'submitted')::int as submitted,
+               count(*) filter (where s.state = 'missing')::int as missing
+        from (
+            select k.key,
+                   case
+                       when coalesce(m.checklist -> k.key, 'false'::jsonb)
+                            not in ('false'::jsonb, 'null'::jsonb, '0'::jsonb, '""'::jsonb)
+                           then 'received'
+                       when k.key = any (p.months) then 'submitted'
+                       else 'missing'
+                   end as state
+            from unnest(public.osas_compliance_months()) as k(key)
+        ) s
+    ) g
+    where o.id = any (p_org_ids)
+    on conflict (organization_id) do update
+        set report_id        = excluded.report_id,
+            status           = excluded.status,
+            months           = excluded.months,
+            submitted_months = excluded.submitted_months,
+            received         = excluded.received,
+            submitted        = excluded.submitted,
+            missing          = excluded.missing,
+            updated_at       = excluded.updated_at;
+$$;
+
+
+-- financial_reports: OSAS master row (checklist) at PRES rows (report_month)
+create or replace function public.osas_compliance_report_rows_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.refresh_osas_compliance(
+            array(select distinct n.organization_id from new_rows n
+                  where n.organization_id is not null)
+        );
+    end if;
+    if tg_op = 'DELETE' then
+        perform public.refresh_osas_compliance(
+            array(select distinct o.organization_id from old_rows o
+                  where o.organization_id is not null)
+        );
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists financial_reports_compliance_ins on public.financial_reports;
+create trigger financial_reports_compliance_ins
+    after insert on public.financial_reports
+    referencing new table as new_rows
+    for each statement execute function public.osas_compliance_report_rows_trg();
+
+drop trigger if exists financial_reports_compliance_upd on public.financial_reports;
+create trigger financial_reports_compliance_upd
+    after update on public.financial_reports
+    referencing new table as new_rows
+    for each statement execute function public.osas_compliance_report_rows_trg();
+
+drop trigger if exists financial_reports_compliance_del on public.financial_reports;
+create trigger financial_reports_compliance_del
+    after delete on public.financial_reports
+    referencing old table as old_rows
+    for each statement execute function public.osas_compliance_report_rows_trg();
+
+
+-- bagong org: lahat missing hanggang may report
+create or replace function public.osas_compliance_org_rows_trg()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.refresh_osas_compliance(array(select n.id from new_rows n));
+    return null;
+end;
+$$;
+
+drop trigger if exists organizations_compliance_ins on public.organizations;
+create trigger organizations_compliance_ins
+    after insert on public.organizations
+    referencing new table as new_rows
+    for each statement execute function public.osas_compliance_org_rows_trg();
+
+
+-- Read side: active orgs + dept name + precomputed row (isang select)
+create or replace view public.osas_compliance_matrix
+with (security_invoker = true)
+as
+select o.id as organization_id,
+       o.org_name,
+       o.department_id,
+       d.dept_name,
+       c.report_id,
+       c.status,
+       c.months,
+       c.submitted_months,
+       c.received,
+       c.submitted,
+       c.missing
+from public.organizations o
+left join public.departments d on d.id = o.department_id
+left join public.osas_compliance c on c.organization_id = o.id
+where o.status = 'Active';
+
+
+-- Backfill
+select public.refresh_osas_compliance(array(select id from public.organizations));
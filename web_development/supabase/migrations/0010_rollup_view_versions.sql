@@ -0,0 +1,23 @@
+-- View versions para sa rollup writes (see view_versions.py, 0003).
+--
+-- Bump din kapag nagbago ang rollups mismo (rollup triggers ng 0001 at
+-- rebuild_wallet_ledger_rollups), para ang dashboard / overview ETag ay
+-- hindi nagka-cache ng lumang totals pagkatapos ng rebuild.
+
+drop trigger if exists wallet_ledger_rollups_vv_ins on public.wallet_ledger_rollups;
+create trigger wallet_ledger_rollups_vv_ins
+    after insert on public.wallet_ledger_rollups
+    referencing new table as new_rows
+    for each statement execute function public.view_versions_folder_rows_trg();
+
+drop trigger if exists wallet_ledger_rollups_vv_upd on public.wallet_ledger_rollups;
+create trigger wallet_ledger_rollups_vv_upd
+    after update on public.wallet_ledger_rollups
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.view_versions_folder_rows_trg();
+
+drop trigger if exists wallet_ledger_rollups_vv_del on public.wallet_ledger_rollups;
+create trigger wallet_ledger_rollups_vv_del
+    after delete on public.wallet_ledger_rollups
+    referencing old table as old_rows
+    for each statement execute function public.view_versions_folder_rows_trg();
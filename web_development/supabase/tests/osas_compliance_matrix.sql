@@ -0,0 +1,100 @@
+-- Local test harness para sa OSAS compliance matrix
+-- (supabase/migrations/0009_osas_compliance_matrix.sql).
+--
+-- Tumatakbo sa loob ng isang transaction na naka-rollback sa dulo:
+--
+--     psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f supabase/tests/osas_compliance_matrix.sql
+--
+-- Pumapalya (non-zero exit) kapag may mali; "osas_compliance_matrix: OK"
+-- kapag pasado lahat.
+
+begin;
+
+do $$
+declare
+    v_org    bigint;
+    v_month  bigint;
+    v_wallet bigint;
+    v_b1     bigint;
+    v_b2     bigint;
+    v_b3     bigint;
+    v_row    public.osas_compliance;
+    v_n      integer;
+begin
+    -- bagong org: row agad, lahat missing
+    insert into public.organizations (org_name, status)
+    values ('Harness Org', 'Active')
+    returning id into v_org;
+
+    select * into v_row from public.osas_compliance where organization_id = v_org;
+    assert found, 'row created on org insert';
+    assert v_row.missing = 10 and v_row.received = 0,
+        format('new org counts: %s/%s', v_row.received, v_row.missing);
+
+    insert into public.months (month_name, month_order)
+    values ('September', 9) returning id into v_month;
+    insert into public.wallets (organization_id, name)
+    values (v_org, 'Harness Wallet') returning id into v_wallet;
+    insert into public.wallet_budgets (wallet_id, amount, year, month_id)
+    values (v_wallet, 1000, 2025, v_month) returning id into v_b1;
+    insert into public.wallet_budgets (wallet_id, amount, year, month_id)
+    values (v_wallet, 1000, 2025, v_month) returning id into v_b2;
+    insert into public.wallet_budgets (wallet_id, amount, year, month_id)
+    values (v_wallet, 1000, 2025, v_month) returning id into v_b3;
+
+    -- OSAS master row (checklist) + PRES rows (report_month)
+    insert into public.financial_reports (organization_id, status, checklist)
+    values (v_org, 'In Review', '{"august": true, "september": false}');
+    insert into public.financial_reports
+        (organization_id, wallet_id, budget_id, status, report_month)
+    values (v_org, v_wallet, v_b1, 'Submitted', 'September'),
+           (v_org, v_wallet, v_b2, 'Submitted', 'august'),
+           (v_org, v_wallet, v_b3, 'Pending Review', 'October');
+
+    select * into v_row from public.osas_compliance where organization_id = v_org;
+    assert v_row.months ->> 'august' = 'received', format('august: %s', v_row.months);
+    assert v_row.months ->> 'september' = 'submitted', format('september: %s', v_row.months);
+    assert v_row.months ->> 'october' = 'missing', format('october: %s', v_row.months);
+    assert (v_row.received, v_row.submitted, v_row.missing) = (1, 1, 8),
+        format('counts: %s/%s/%s', v_row.received, v_row.submitted, v_row.missing);
+    assert v_row.status = 'In Review', format('status: %s', v_row.status);
+    assert not ('october' = any (v_row.submitted_months)),
+        format('pending review not submitted: %s', v_row.submitted_months);
+
+    -- Pending Review -> Submitted (submit_financial_report)
+    update public.financial_reports set status = 'Submitted' where budget_id = v_b3;
+    select * into v_row from public.osas_compliance where organization_id = v_org;
+    assert v_row.months ->> 'october' = 'submitted', format('october: %s', v_row.months);
+    update public.financial_reports set status = 'Pending Review' where budget_id = v_b3;
+
+    -- checklist update (update_financial_report / submit_financial_report)
+    update public.financial_reports
+    set checklist = checklist || '{"september": true}', status = 'In Review'
+    where organization_id = v_org and wallet_id is null;
+
+    select * into v_row from public.osas_compliance where organization_id = v_org;
+    assert (v_row.received, v_row.submitted, v_row.missing) = (2, 0, 8),
+        format('after receive: %s/%s/%s', v_row.received, v_row.submitted, v_row.missing);
+
+    -- PRES row deleted -> back to missing
+    delete from public.financial_reports
+    where organization_id = v_org and wallet_id is not null;
+    update public.financial_reports
+    set checklist = '{}'
+    where organization_id = v_org and wallet_id is null;
+
+    select * into v_row from public.osas_compliance where organization_id = v_org;
+    assert v_row.missing = 10, format('after delete: %s', v_row.months);
+
+    -- read side: active orgs lang
+    select count(*) into v_n from public.osas_compliance_matrix where organization_id = v_org;
+    assert v_n = 1, 'active org in matrix view';
+    update public.organizations set status = 'Archived' where id = v_org;
+    select count(*) into v_n from public.osas_compliance_matrix where organization_id = v_org;
+    assert v_n = 0, 'archived org hidden from matrix view';
+
+    raise notice 'osas_compliance_matrix: OK';
+end;
+$$;
+
+rollback;
@@ -0,0 +1,129 @@
+-- Local test harness para sa public.submit_financial_report
+-- (supabase/migrations/0006_submit_financial_report.sql).
+--
+-- Tumatakbo sa loob ng isang transaction na naka-rollback sa dulo, kaya
+-- pwedeng patakbuhin sa local / branch database na may app schema:
+--
+--     psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f supabase/tests/submit_financial_report.sql
+--
+-- Pumapalya (non-zero exit) kapag may mali; "submit_financial_report: OK"
+-- kapag pasado lahat.
+
+begin;
+
+create temp table t_ids (name text primary key, id bigint) on commit drop;
+
+with o as (
+    insert into public.organizations (org_name) values ('Harness Org') returning id
+)
+insert into t_ids select 'org', id from o;
+
+with m as (
+    insert into public.months (month_name, month_order) values ('November', 11) returning id
+)
+insert into t_ids select 'month', id from m;
+
+with w as (
+    insert into public.wallets (organization_id, name)
+    select id, 'Harness Wallet' from t_ids where name = 'org'
+    returning id
+)
+insert into t_ids select 'wallet', id from w;
+
+with b as (
+    insert into public.wallet_budgets (wallet_id, amount, year, month_id)
+    select (select id from t_ids where name = 'wallet'), 1000, 2025,
+           (select id from t_ids where name = 'month')
+    returning id
+)
+insert into t_ids select 'budget', id from b;
+
+insert into public.wallet_transactions
+    (wallet_id, budget_id, kind, date_issued, quantity, price, income_type,
+     particulars, description)
+select w.id, b.id, v.kind, date '2025-11-03', v.qty, v.price, v.income_type,
+       v.particulars, v.description
+from (select id from t_ids where name = 'wallet') w,
+     (select id from t_ids where name = 'budget') b,
+     (values ('income', 2, 150.00, 'Dues', null, 'membership'),
+             ('expense', 1, 80.50, null, 'Food', 'snacks'),
+             ('expense', 3, 10.00, null, 'Supplies', 'pens')) as
+         v(kind, qty, price, income_type, particulars, description);
+
+insert into public.wallet_receipts (wallet_id, budget_id, file_url, description, receipt_date)
+select (select id from t_ids where name = 'wallet'), (select id from t_ids where name = 'budget'),
+       'https://example.test/r1.jpg', 'snacks receipt', date '2025-11-03';
+
+-- pending report ng folder + OSAS master row (walang wallet / budget)
+insert into public.financial_reports
+    (organization_id, wallet_id, budget_id, status, report_no, budget,
+     total_expense, reimbursement, previous_fund, report_month)
+select (select id from t_ids where name = 'org'), (select id from t_ids where name = 'wallet'),
+       (select id from t_ids where name = 'budget'), 'Pending Review', 'R-001',
+       1000, 110.50, 0, 50, 'november';
+
+insert into public.financial_reports (organization_id, status, checklist)
+select id, 'Pending Review', '{"august": true}'::jsonb from t_ids where name = 'org';
+
+
+do $$
+declare
+    v_org     bigint := (select id from t_ids where name = 'org');
+    v_wallet  bigint := (select id from t_ids where name = 'wallet');
+    v_result  jsonb;
+    v_archive public.financial_report_archives;
+    v_master  public.financial_reports;
+    v_n       integer;
+begin
+    v_result := public.submit_financial_report(v_org, v_wallet);
+
+    select * into v_archive
+    from public.financial_report_archives
+    where id = (v_result ->> 'archive_id')::bigint;
+    assert found, 'archive row created';
+    assert v_archive.remaining = 939.50, format('remaining: %s', v_archive.remaining);
+    assert v_archive.report_no = 'R-001', 'report_no copied';
+
+    select count(*) into v_n
+    from public.financial_report_archive_transactions where archive_id = v_archive.id;
+    assert v_n = 3, format('archived transactions: %s', v_n);
+    assert (v_result ->> 'transactions')::int = 3, 'transactions count in result';
+
+    select count(*) into v_n
+    from public.financial_report_archive_receipts where archive_id = v_archive.id;
+    assert v_n = 1, format('archived receipts: %s', v_n);
+
+    select count(*) into v_n
+    from public.financial_reports
+    where organization_id = v_org and wallet_id = v_wallet and status = 'Submitted'
+      and submission_date is not null;
+    assert v_n = 1, 'report marked Submitted';
+
+    select count(*) into v_n
+    from public.osas_notifications
+    where org_id = v_org and message = 'has a report "Pending Review for November"';
+    assert v_n = 1, 'OSAS notification inserted';
+
+    select * into v_master
+    from public.financial_reports
+    where organization_id = v_org and wallet_id is null and budget_id is null;
+    assert v_master.checklist = '{"august": true, "november": true}'::jsonb,
+        format('checklist: %s', v_master.checklist);
+    assert v_master.status = 'In Review', format('master status: %s', v_master.status);
+
+    -- walang pending na -> P0002, at walang bagong archive
+    begin
+        perform public.submit_financial_report(v_org, v_wallet);
+        assert false, 'second submit should fail';
+    exception when sqlstate 'P0002' then
+        null;
+    end;
+    select count(*) into v_n
+    from public.financial_report_archives where organization_id = v_org;
+    assert v_n = 1, format('archives after failed submit: %s', v_n);
+
+    raise notice 'submit_financial_report: OK';
+end;
+$$;
+
+rollback;
@@ -0,0 +1,173 @@
+"""
+mail_outbox laban sa local SMTP sink (walang totoong SMTP server).
+
+    cd web_development
+    python -m unittest tests.test_mail_outbox      # o: python -m pytest tests
+
+Sinusubukan: delivery (isang connection para sa ilang mensahe), retry na
+may backoff hanggang failed/, reconnect kapag na-drop ang connection,
+private (0700 / 0600) na outbox files at purge ng lumang failed/ entries.
+Ang sender ay dine-drive nang direkta (_drain) para deterministic.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from mail_outbox import MailOutbox, SMTPSink
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class MailOutboxSinkTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = SMTPSink("127.0.0.1", 0)
+        threading.Thread(target=self.sink.serve_forever, daemon=True).start()
+        self.addCleanup(self.sink.server_close)
+        self.addCleanup(self.sink.shutdown)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        env = mock.patch.dict(
+            os.environ,
+            {"MAIL_OUTBOX_DIR": tmp.name, "MAIL_MAX_ATTEMPTS": "3", "MAIL_RETRY_BASE": "10"},
+        )
+        env.start()
+        self.addCleanup(env.stop)
+
+        app = Flask(__name__)
+        app.config.update(
+            MAIL_SERVER="127.0.0.1",
+            MAIL_PORT=self.sink.server_address[1],
+            MAIL_DEFAULT_SENDER="noreply@pockitrack.test",
+        )
+        self.outbox = MailOutbox()
+        self.outbox.init_app(app)
+        # walang background thread: tinatawag ang _drain() sa test mismo
+        self.outbox._ensure_sender = lambda: None
+        self.addCleanup(lambda: self.outbox._smtp and self.outbox._close())
+
+    def _pending_item(self):
+        (name,) = self.outbox._pending_files()
+        with open(os.path.join(self.outbox.root, name), encoding="utf-8") as f:
+            return name, json.load(f)
+
+    def _make_due(self, name, item):
+        item["next_attempt_at"] = 0
+        self.outbox._write(os.path.join(self.outbox.root, name), item)
+
+    def test_delivers_over_one_connection(self):
+        self.outbox.enqueue("Reset", ["a@example.com"], body="code 123")
+        self.outbox.enqueue("Reset", ["b@example.com"], body="code 456", html="<b>456</b>")
+        self.outbox._drain()
+
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual([m[1] for m in self.sink.messages], [["a@example.com"], ["b@example.com"]])
+        self.assertEqual(self.sink.messages[0][0], "noreply@pockitrack.test")
+        self.assertIn(b"code 123", self.sink.messages[0][2])
+        self.assertIn(b"text/html", self.sink.messages[1][2])
+        self.assertEqual(self.sink.connections, 1)
+
+    def test_retries_with_backoff_then_delivers(self):
+        self.outbox.config["port"] = _free_port()  # walang nakikinig
+        self.outbox.enqueue("Reset", ["a@example.com"], body="x")
+
+        before = time.time()
+        self.outbox._drain()
+        name, item = self._pending_item()
+        self.assertEqual(item["attempts"], 1)
+        self.assertTrue(item["last_error"])
+        self.assertGreaterEqual(item["next_attempt_at"], before + 10)
+
+        # hindi pa due: hindi ginagalaw
+        self.outbox._drain()
+        self.assertEqual(self._pending_item()[1]["attempts"], 1)
+
+        # pangalawang failure: doble ang delay
+        self._make_due(name, item)
+        before = time.time()
+        self.outbox._drain()
+        name, item = self._pending_item()
+        self.assertEqual(item["attempts"], 2)
+        self.assertGreaterEqual(item["next_attempt_at"], before + 20)
+
+        # bumalik ang server
+        self.outbox.config["port"] = self.sink.server_address[1]
+        self._make_due(name, item)
+        self.outbox._drain()
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(len(self.sink.messages), 1)
+
+    def test_moves_to_failed_after_max_attempts(self):
+        self.outbox.config["port"] = _free_port()
+        self.outbox.enqueue("Reset", ["a@example.com"], body="x")
+        for _ in range(3):
+            self.outbox._drain()
+            if self.outbox.pending_count():
+                self._make_due(*self._pending_item())
+
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(self.outbox.failed_count(), 1)
+        self.assertEqual(self.sink.messages, [])
+
+    def test_reconnects_when_connection_dropped(self):
+        self.outbox.enqueue("One", ["a@example.com"], body="1")
+        self.outbox._drain()
+        self.assertEqual(self.sink.connections, 1)
+
+        # patay na ang reused connection (hal. server idle timeout)
+        self.outbox._smtp.sock.shutdown(socket.SHUT_RDWR)
+        self.outbox.enqueue("Two", ["b@example.com"], body="2")
+        self.outbox._drain()
+
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(len(self.sink.messages), 2)
+        self.assertEqual(self.sink.connections, 2)
+
+    def test_outbox_files_are_private(self):
+        self.outbox.enqueue("Reset", ["a@example.com"], body="link")
+        name, _ = self._pending_item()
+
+        self.assertEqual(os.stat(self.outbox.root).st_mode & 0o777, 0o700)
+        self.assertEqual(
+            os.stat(os.path.join(self.outbox.root, "failed")).st_mode & 0o777, 0o700
+        )
+        self.assertEqual(
+            os.stat(os.path.join(self.outbox.root, name)).st_mode & 0o777, 0o600
+        )
+
+    def test_purges_old_failed_entries(self):
+        failed_dir = os.path.join(self.outbox.root, "failed")
+        old, fresh = (os.path.join(failed_dir, n) for n in ("old.json", "fresh.json"))
+        for path in (old, fresh):
+            self.outbox._write(path, {"id": path})
+        stale = time.time() - self.outbox.failed_ttl - 60
+        os.utime(old, (stale, stale))
+
+        self.assertEqual(self.outbox.purge_failed(), 1)
+        self.assertEqual(os.listdir(failed_dir), ["fresh.json"])
+
+    def test_first_request_resumes_pending_mail(self):
+        self.outbox.enqueue("Left over", ["a@example.com"], body="x")
+        started = []
+        self.outbox._ensure_sender = lambda: started.append(True)
+        self.outbox._checked_pending = False
+
+        self.outbox._resume_pending()
+        self.outbox._resume_pending()
+        self.assertEqual(started, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
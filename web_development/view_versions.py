@@ -0,0 +1,102 @@
+"""
+ETag / conditional GET para sa ledger at report read endpoints.
+
+Ang ETag ay galing sa view_versions (isang counter per org at per folder,
+binu-bump ng triggers, see supabase/migrations/0003_view_versions.sql),
+kaya isang maliit na read lang ang kailangan para malaman kung 304:
+
+    etag = view_etag(supabase, "transactions", org_id, budget_id=folder_id)
+    if is_not_modified(etag):
+        return not_modified(etag)
+    ...
+    return with_etag(jsonify(rows), etag)
+
+Kapag wala pa ang table / may error, None ang etag at normal na 200.
+"""
+
+import hashlib
+
+from flask import make_response, request
+
+VERSIONS_TABLE = "view_versions"
+
+# i-bump kapag nagbago ang shape ng responses (invalidates client copies)
+ETAG_SCHEMA = "1"
+
+
+def version_stamp(client, org_id=None, budget_id=None):
+    """'org:<v>|folder:<v>' for the given scopes, or None on error."""
+    filters = []
+    if org_id is not None:
+        filters.append(f"and(scope.eq.org,scope_id.eq.{int(org_id)})")
+    if budget_id is not None:
+        filters.append(f"and(scope.eq.folder,scope_id.eq.{int(budget_id)})")
+    if not filters:
+        return None
+    try:
+        res = (
+            client.table(VERSIONS_TABLE)
+            .select("scope, scope_id, version")
+            .or_(",".join(filters))
+            .execute()
+        )
+    except Exception as e:
+        print("Error reading view versions:", e)
+        return None
+
+    found = {(r["scope"], r["scope_id"]): r["version"] for r in (res.data or [])}
+    parts = []
+    if org_id is not None:
+        parts.append(f"org:{found.get(('org', int(org_id)), 0)}")
+    if budget_id is not None:
+        parts.append(f"folder:{found.get(('folder', int(budget_id)), 0)}")
+    return "|".join(parts)
+
+
+def make_etag(view, org_id, stamp, *extra):
+    """Strong ETag value (unquoted) for one view + its version stamp."""
+    raw = "\n".join(
+        [ETAG_SCHEMA, view, str(org_id), stamp, request.query_string.decode()]
+        + [str(x) for x in extra]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def view_etag(client, view, org_id, budget_id=None, extra=()):
+    """
+    ETag for a view, or None kung hindi makuha ang version stamp.
+    May budget_id -> folder stamp lang (org-wide views: org stamp).
+    """
+    if budget_id is not None:
+        stamp = version_stamp(client, budget_id=budget_id)
+    else:
+        stamp = version_stamp(client, org_id=org_id)
+    if stamp is None:
+        return None
+    return make_etag(view, org_id, stamp, *extra)
+
+
+def is_not_modified(etag):
+    return bool(etag) and request.if_none_match.contains(etag)
+
+
+def _cache_headers(resp, etag):
+    resp.set_etag(etag)
+    # laging mag-revalidate; private kasi per-session ang data
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+def not_modified(etag):
+    resp = make_response("", 304)
+    return _cache_headers(resp, etag)
+
+
+def with_etag(resp, etag):
+    """Attach the ETag to a 200 response (no-op kung walang etag)."""
+    if not etag:
+        return resp
+    resp = make_response(resp)
+    if resp.status_code != 200:
+        return resp
+    return _cache_headers(resp, etag)